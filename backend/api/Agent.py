@@ -1,13 +1,19 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.http import StreamingHttpResponse
 import docx
+import copy
+import hashlib
 import json
 import os
 import logging
 import re
+import time
+import itertools
 from datetime import datetime
-from typing import TypedDict, List, Dict, Any
+from typing import TypedDict, List, Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
 import requests
 from urllib.parse import urlparse
@@ -73,7 +79,7 @@ try:
     LANGGRAPH_AVAILABLE = True
     logger.info("✅ LangGraph imported successfully")
 except ImportError as e:
-    logger.warning(f"LangGraph not available: {str(e)}. Using sequential processing.")
+    logger.warning(f"LangGraph not available: {str(e)}. Running agents with the built-in DAG workflow.")
     LANGGRAPH_AVAILABLE = False
 
 # Try to import MongoDB service
@@ -96,6 +102,14 @@ except ImportError as e:
     RAG_AVAILABLE = False
     internship_rag = None
 
+from utils.rag_skills import SkillIncidence, normalize_skill
+from utils.skill_ontology import skill_ontology
+from utils.analysis_jobs import JobQueueFull, default_analysis_job_queue
+from utils.cache import default_analysis_cache
+
+# Ontology categories reported as repository technologies
+GITHUB_TECHNOLOGY_CATEGORIES = ('language', 'framework', 'database', 'cloud', 'devops', 'data')
+
 # GitHub Analyzer for profile insights
 class GitHubAnalyzer:
     def __init__(self):
@@ -227,25 +241,12 @@ class GitHubAnalyzer:
             if language:
                 analysis['languages'][language] = analysis['languages'].get(language, 0) + 1
             
-            # Detect technologies from repo names and descriptions
+            # Detect technologies from repo names and descriptions, where "node" or "express" is not prose
             repo_text = f"{repo.get('name', '')} {repo.get('description', '')}".lower()
             
-            # Common technologies to detect
-            tech_keywords = {
-                'react': 'React', 'vue': 'Vue.js', 'angular': 'Angular',
-                'django': 'Django', 'flask': 'Flask', 'express': 'Express.js',
-                'node': 'Node.js', 'typescript': 'TypeScript',
-                'docker': 'Docker', 'kubernetes': 'Kubernetes',
-                'aws': 'AWS', 'azure': 'Azure', 'gcp': 'Google Cloud',
-                'mongodb': 'MongoDB', 'postgresql': 'PostgreSQL', 'mysql': 'MySQL',
-                'redis': 'Redis', 'elasticsearch': 'Elasticsearch',
-                'tensorflow': 'TensorFlow', 'pytorch': 'PyTorch',
-                'scikit': 'Scikit-learn', 'pandas': 'Pandas', 'numpy': 'NumPy'
-            }
-            
-            for keyword, tech in tech_keywords.items():
-                if keyword in repo_text:
-                    analysis['technologies'].add(tech)
+            analysis['technologies'].update(
+                skill_ontology.extract(repo_text, categories=GITHUB_TECHNOLOGY_CATEGORIES, match_ambiguous=True)
+            )
             
             # Determine project types
             if any(keyword in repo_text for keyword in ['web', 'frontend', 'react', 'vue', 'angular']):
@@ -309,6 +310,11 @@ class GitHubAnalyzer:
 # Initialize GitHub analyzer
 github_analyzer = GitHubAnalyzer()
 
+# Runs GitHub lookups alongside the LLM resume parse, which does not need them until enhancement
+profile_stage_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'PROFILE_STAGE_WORKERS', 8), thread_name_prefix='profile-stage'
+)
+
 # File Manager
 class FileManager:
     def save_resume(self, file, user_id=None):
@@ -370,29 +376,140 @@ class AnalysisState(TypedDict):
     step_progress: int
     detailed_extraction: Dict[str, Any]
     agent_communications: List[Dict]
+    agent_timings: Dict[str, Dict]
+
+# Keys every agent updates besides the ones it declares; the workflow merges these itself
+SHARED_STATE_KEYS = ('agent_communications', 'agent_timings', 'current_step', 'step_progress', 'error')
+
+
+class AgentNode:
+    """An agent with the state keys it reads and the keys it writes"""
+
+    def __init__(self, name: str, func, reads: List[str], writes: List[str]):
+        self.name = name
+        self.func = func
+        self.reads = set(reads)
+        self.writes = set(writes)
+
+
+# DAG workflow processor, used on its own or as the stages of a LangGraph graph
+class DAGWorkflow:
+    """Runs agents in dependency stages; agents in the same stage run in parallel on copies of the state.
+
+    A node depends on every earlier node that writes a key it reads, or that reads or writes a key it writes.
+    Results are merged back in declaration order, so the final state does not depend on thread timing.
+    """
+
+    def __init__(self, nodes: List[AgentNode], executor: ThreadPoolExecutor):
+        self.nodes = nodes
+        self.executor = executor
+        self.stages = self._plan()
+
+    def _plan(self) -> List[List[AgentNode]]:
+        stage_of = {}
+        for i, node in enumerate(self.nodes):
+            stage = 0
+            for earlier in self.nodes[:i]:
+                if earlier.writes & (node.reads | node.writes) or earlier.reads & node.writes:
+                    stage = max(stage, stage_of[earlier.name] + 1)
+            stage_of[node.name] = stage
+        stages = [[] for _ in range(max(stage_of.values()) + 1)]
+        for node in self.nodes:
+            stages[stage_of[node.name]].append(node)
+        return stages
+
+    def _node_state(self, state):
+        node_state = dict(state)
+        node_state['agent_communications'] = list(state.get('agent_communications') or [])
+        return node_state
+
+    def _run_node(self, node: AgentNode, node_state) -> Tuple[Dict, float]:
+        started = time.perf_counter()
+        try:
+            logger.info(f"🔄 Running agent: {node.name}")
+            result = node.func(node_state) or node_state
+        except Exception as e:
+            logger.error(f"❌ Agent {node.name} exception: {str(e)}")
+            result = node_state
+            result['error'] = f"Agent {node.name} failed: {str(e)}"
+        return result, time.perf_counter() - started
+
+    def _merge(self, state, stage_state, node: AgentNode, result, stage_index: int, elapsed: float):
+        for key in node.writes:
+            if key in result:
+                state[key] = result[key]
+        for key, value in result.items():
+            if key not in node.writes and key not in SHARED_STATE_KEYS and value is not stage_state.get(key):
+                logger.warning(f"⚠️ Agent {node.name} changed undeclared state key '{key}', change discarded")
+
+        communications_before = len(stage_state.get('agent_communications') or [])
+        state['agent_communications'].extend((result.get('agent_communications') or [])[communications_before:])
+        if result.get('step_progress', 0) >= state.get('step_progress', 0):
+            state['step_progress'] = result.get('step_progress', 0)
+            state['current_step'] = result.get('current_step', state.get('current_step'))
+        if result.get('error'):
+            logger.error(f"❌ Agent {node.name} failed: {result['error']}")
+            state['error'] = result['error']
+
+        state['agent_timings'][node.name] = {
+            'stage': stage_index,
+            'elapsed_seconds': round(elapsed, 3),
+            'status': 'failed' if result.get('error') else 'completed'
+        }
+
+    def iter_stage(self, state, stage_index: int):
+        """Run one stage, yielding (node, merged state) as each agent's result is merged in declaration order"""
+        if state.get('error'):
+            return
+        stage_state = state
+        state = dict(state)
+        state['agent_communications'] = list(state.get('agent_communications') or [])
+        state['agent_timings'] = dict(state.get('agent_timings') or {})
+
+        stage = self.stages[stage_index]
+        # Copy the state for every agent before any result is merged into it
+        node_states = [self._node_state(state) for _ in stage]
+        futures = [self.executor.submit(self._run_node, node, node_state)
+                   for node, node_state in zip(stage[1:], node_states[1:])]
+        outcomes = itertools.chain([self._run_node(stage[0], node_states[0])],
+                                   (future.result() for future in futures))
+        for node, (result, elapsed) in zip(stage, outcomes):
+            self._merge(state, stage_state, node, result, stage_index, elapsed)
+            yield node, state
+
+    def run_stage(self, state, stage_index: int):
+        """Run one stage and return the merged state; a state that already failed is passed through"""
+        for _, state in self.iter_stage(state, stage_index):
+            pass
+        return state
+
+    def stream(self, initial_state):
+        """Yield (node, merged state) after each agent, stopping after the stage in which an agent failed"""
+        state = initial_state
+        for stage_index in range(len(self.stages)):
+            for node, state in self.iter_stage(state, stage_index):
+                yield node, state
+            if state.get('error'):
+                return
 
-# Sequential workflow processor for when LangGraph is not available
-class SequentialWorkflow:
-    def __init__(self, agents):
-        self.agents = agents
-    
     def invoke(self, initial_state):
-        state = initial_state.copy()
-        
-        for agent_name, agent_func in self.agents:
-            try:
-                logger.info(f"🔄 Running agent: {agent_name}")
-                state = agent_func(state)
-                if state.get('error'):
-                    logger.error(f"❌ Agent {agent_name} failed: {state['error']}")
-                    break
-            except Exception as e:
-                state['error'] = f"Agent {agent_name} failed: {str(e)}"
-                logger.error(f"❌ Agent {agent_name} exception: {str(e)}")
-                break
-        
+        state = dict(initial_state)
+        for _, state in self.stream(initial_state):
+            pass
         return state
 
+    def to_langgraph(self):
+        """Compile the stages as a linear LangGraph graph, keeping this workflow's scheduling and merging"""
+        workflow = StateGraph(AnalysisState)
+        names = ['+'.join(node.name for node in stage) for stage in self.stages]
+        for stage_index, name in enumerate(names):
+            workflow.add_node(name, lambda state, stage_index=stage_index: self.run_stage(state, stage_index))
+        workflow.set_entry_point(names[0])
+        for name, next_name in zip(names, names[1:]):
+            workflow.add_edge(name, next_name)
+        workflow.add_edge(names[-1], END)
+        return workflow.compile()
+
 # Agent 1: Student Profile Analyzer
 def student_profile_analyzer(state: AnalysisState) -> AnalysisState:
     agent_name = "STUDENT_PROFILE_ANALYZER"
@@ -438,61 +555,10 @@ def student_profile_analyzer(state: AnalysisState) -> AnalysisState:
         detailed_extraction = extract_detailed_info(resume_text)
         state["detailed_extraction"] = detailed_extraction
         
-        # GitHub Analysis
-        github_insights = None
-        try:
-            comm_log = {
-                "agent": agent_name,
-                "step": "GITHUB_ANALYSIS",
-                "micro_goal": "Extract and analyze GitHub profile from resume and provided link",
-                "status": "processing",
-                "timestamp": datetime.utcnow().isoformat(),
-                "data": {}
-            }
-            state["agent_communications"].append(comm_log)
-            
-            # Use provided GitHub link or extract from resume
-            github_link = state.get("github_link", "")
-            github_insights = github_analyzer.get_github_insights(resume_text, github_link)
-            if github_insights:
-                logger.info(f"✅ GitHub analysis successful for {github_insights['username']}")
-                comm_log = {
-                    "agent": agent_name,
-                    "step": "GITHUB_ANALYSIS_SUCCESS",
-                    "micro_goal": "Successfully analyzed GitHub profile",
-                    "status": "success",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "data": {
-                        "github_username": github_insights['username'],
-                        "public_repos": github_insights['profile']['public_repos'],
-                        "github_score": github_insights['github_score'],
-                        "languages_found": len(github_insights['analysis']['languages']),
-                        "technologies_found": len(github_insights['analysis']['technologies'])
-                    }
-                }
-                state["agent_communications"].append(comm_log)
-            else:
-                logger.info("ℹ️ No GitHub profile found in resume")
-                comm_log = {
-                    "agent": agent_name,
-                    "step": "GITHUB_ANALYSIS_NO_PROFILE",
-                    "micro_goal": "No GitHub profile detected in resume",
-                    "status": "completed",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "data": {"github_found": False}
-                }
-                state["agent_communications"].append(comm_log)
-        except Exception as e:
-            logger.warning(f"GitHub analysis failed: {str(e)}")
-            comm_log = {
-                "agent": agent_name,
-                "step": "GITHUB_ANALYSIS_FAILED",
-                "micro_goal": "GitHub analysis encountered an error",
-                "status": "failed",
-                "timestamp": datetime.utcnow().isoformat(),
-                "data": {"error": str(e)}
-            }
-            state["agent_communications"].append(comm_log)
+        # GitHub analysis runs on a worker thread while the AI parses the resume
+        github_future = profile_stage_executor.submit(
+            analyze_github_profile, agent_name, resume_text, state.get("github_link", "")
+        )
         
         # AI Processing
         if llm:
@@ -505,6 +571,10 @@ def student_profile_analyzer(state: AnalysisState) -> AnalysisState:
             logger.warning("LLM not available, using fallback profile creation")
             profile = create_enhanced_fallback_profile(resume_text, state["preferences"])
         
+        # Join the GitHub analysis before enhancement
+        github_insights, github_communications = github_future.result()
+        state["agent_communications"].extend(github_communications)
+        
         # Enhance profile with GitHub data
         if github_insights:
             profile = enhance_profile_with_github(profile, github_insights)
@@ -559,6 +629,65 @@ def student_profile_analyzer(state: AnalysisState) -> AnalysisState:
         state["error"] = f"Profile analysis failed: {error_msg}"
         return state
 
+def analyze_github_profile(agent_name: str, resume_text: str, github_link: str) -> Tuple[Optional[Dict], List[Dict]]:
+    """GitHub insights for the resume plus the agent communications to log, safe to run on a worker thread"""
+    communications = []
+    github_insights = None
+    try:
+        comm_log = {
+            "agent": agent_name,
+            "step": "GITHUB_ANALYSIS",
+            "micro_goal": "Extract and analyze GitHub profile from resume and provided link",
+            "status": "processing",
+            "timestamp": datetime.utcnow().isoformat(),
+            "data": {}
+        }
+        communications.append(comm_log)
+        
+        # Use provided GitHub link or extract from resume
+        github_insights = github_analyzer.get_github_insights(resume_text, github_link)
+        if github_insights:
+            logger.info(f"✅ GitHub analysis successful for {github_insights['username']}")
+            comm_log = {
+                "agent": agent_name,
+                "step": "GITHUB_ANALYSIS_SUCCESS",
+                "micro_goal": "Successfully analyzed GitHub profile",
+                "status": "success",
+                "timestamp": datetime.utcnow().isoformat(),
+                "data": {
+                    "github_username": github_insights['username'],
+                    "public_repos": github_insights['profile']['public_repos'],
+                    "github_score": github_insights['github_score'],
+                    "languages_found": len(github_insights['analysis']['languages']),
+                    "technologies_found": len(github_insights['analysis']['technologies'])
+                }
+            }
+            communications.append(comm_log)
+        else:
+            logger.info("ℹ️ No GitHub profile found in resume")
+            comm_log = {
+                "agent": agent_name,
+                "step": "GITHUB_ANALYSIS_NO_PROFILE",
+                "micro_goal": "No GitHub profile detected in resume",
+                "status": "completed",
+                "timestamp": datetime.utcnow().isoformat(),
+                "data": {"github_found": False}
+            }
+            communications.append(comm_log)
+    except Exception as e:
+        logger.warning(f"GitHub analysis failed: {str(e)}")
+        comm_log = {
+            "agent": agent_name,
+            "step": "GITHUB_ANALYSIS_FAILED",
+            "micro_goal": "GitHub analysis encountered an error",
+            "status": "failed",
+            "timestamp": datetime.utcnow().isoformat(),
+            "data": {"error": str(e)}
+        }
+        communications.append(comm_log)
+    
+    return github_insights, communications
+
 def extract_detailed_info(resume_text):
     """Extract detailed information from resume text"""
     detailed_extraction = {
@@ -784,10 +913,7 @@ def internship_matcher(state: AnalysisState) -> AnalysisState:
         best_fit_internships = best_fit_internships[:6]
         
         # Enhance internships with additional matching data
-        enhanced_internships = []
-        for internship in best_fit_internships:
-            enhanced = enhance_internship_match(internship, profile)
-            enhanced_internships.append(enhanced)
+        enhanced_internships = enhance_internship_matches(best_fit_internships, profile)
         
         state["best_fit_internships"] = enhanced_internships
         
@@ -824,21 +950,29 @@ def internship_matcher(state: AnalysisState) -> AnalysisState:
         state["error"] = f"Internship matching failed: {error_msg}"
         return state
 
-def enhance_internship_match(internship, profile):
+def skill_overlaps(internships, student_skills):
+    """Skill overlap per internship, from the RAG skill index rows for listings it holds"""
+    if RAG_AVAILABLE and internship_rag:
+        return internship_rag.skill_overlaps(internships, student_skills)
+    return SkillIncidence.build(internships).overlap(student_skills)
+
+def enhance_internship_matches(internships, profile):
+    """Enhance a ranked list of internships, computing all skill overlaps in one sparse product"""
+    overlaps = skill_overlaps(internships, profile.get('skills', []))
+    return [
+        enhance_internship_match(internship, profile, overlap)
+        for internship, overlap in zip(internships, overlaps)
+    ]
+
+def enhance_internship_match(internship, profile, overlap=None):
     """Enhance internship with additional matching data"""
     enhanced = internship.copy()
     
     # Calculate detailed skill match
-    student_skills = set([s.lower() for s in profile.get('skills', [])])
-    required_skills = set([s.lower() for s in internship.get('requirements', [])])
-    preferred_skills = set([s.lower() for s in internship.get('preferred_skills', [])])
-    
-    skill_matches = student_skills.intersection(required_skills)
-    preferred_matches = student_skills.intersection(preferred_skills)
-    
-    # Calculate match percentages
-    required_match_percentage = (len(skill_matches) / len(required_skills)) * 100 if required_skills else 100
-    preferred_match_percentage = (len(preferred_matches) / len(preferred_skills)) * 100 if preferred_skills else 0
+    if overlap is None:
+        overlap = skill_overlaps([internship], profile.get('skills', []))[0]
+    required_match_percentage = overlap['required_match_percentage']
+    preferred_match_percentage = overlap['preferred_match_percentage']
     
     # Domain alignment
     student_domains = [d.lower() for d in profile.get('domains', [])]
@@ -850,8 +984,8 @@ def enhance_internship_match(internship, profile):
     
     # Add enhancement data
     enhanced.update({
-        'skill_matches': list(skill_matches),
-        'preferred_matches': list(preferred_matches),
+        'skill_matches': overlap['skill_matches'],
+        'preferred_matches': overlap['preferred_matches'],
         'required_match_percentage': round(required_match_percentage, 1),
         'preferred_match_percentage': round(preferred_match_percentage, 1),
         'domain_match': domain_match,
@@ -860,8 +994,8 @@ def enhance_internship_match(internship, profile):
             required_match_percentage, preferred_match_percentage, 
             domain_match, experience_match
         ),
-        'missing_required_skills': list(required_skills - student_skills),
-        'missing_preferred_skills': list(preferred_skills - student_skills)
+        'missing_required_skills': overlap['missing_required_skills'],
+        'missing_preferred_skills': overlap['missing_preferred_skills']
     })
     
     return enhanced
@@ -1159,26 +1293,22 @@ def rag_requirement_aligner(state: AnalysisState) -> AnalysisState:
                 total_alignment = 0
                 requirement_matches = []
                 skill_gaps_detailed = []
+                rag_matches_by_id = {r.get('id'): r for r in rag_matches}
+                overlaps = skill_overlaps(best_fit_internships, profile.get('skills', []))
                 
-                for internship in best_fit_internships:
+                for internship, overlap in zip(best_fit_internships, overlaps):
                     internship_id = internship.get('id')
                     
                     # Find corresponding RAG match
-                    rag_match = next((r for r in rag_matches if r.get('id') == internship_id), None)
+                    rag_match = rag_matches_by_id.get(internship_id)
                     
                     if rag_match:
-                        # Calculate detailed alignment
-                        student_skills = set([s.lower() for s in profile.get('skills', [])])
-                        required_skills = set([s.lower() for s in internship.get('requirements', [])])
-                        preferred_skills = set([s.lower() for s in internship.get('preferred_skills', [])])
-                        
-                        # Skill matching analysis
-                        required_match = student_skills.intersection(required_skills)
-                        preferred_match = student_skills.intersection(preferred_skills)
-                        missing_required = required_skills - student_skills
-                        missing_preferred = preferred_skills - student_skills
+                        # Skill matching analysis, on canonical skill names
+                        required_match = overlap['skill_matches']
+                        missing_required = overlap['missing_required_skills']
+                        missing_preferred = overlap['missing_preferred_skills']
                         
-                        alignment_score = len(required_match) / max(len(required_skills), 1)
+                        alignment_score = len(required_match) / max(len(required_match) + len(missing_required), 1)
                         total_alignment += alignment_score
                         
                         requirement_matches.append({
@@ -1186,10 +1316,10 @@ def rag_requirement_aligner(state: AnalysisState) -> AnalysisState:
                             "internship_title": internship.get('title'),
                             "company": internship.get('company'),
                             "alignment_score": alignment_score,
-                            "required_skills_matched": list(required_match),
-                            "preferred_skills_matched": list(preferred_match),
-                            "missing_required_skills": list(missing_required),
-                            "missing_preferred_skills": list(missing_preferred),
+                            "required_skills_matched": required_match,
+                            "preferred_skills_matched": overlap['preferred_matches'],
+                            "missing_required_skills": missing_required,
+                            "missing_preferred_skills": missing_preferred,
                             "justification": rag_match.get('justification', ''),
                             "rag_score": rag_match.get('matching_score', 0)
                         })
@@ -1459,264 +1589,473 @@ def generate_role_specific_steps(internship, profile):
     return steps
 
 # Main workflow setup - New Enhanced Flow
+# The gap detector and the requirement aligner only need the profile and the matches, so they share a stage
+analysis_nodes = [
+    AgentNode("student_profile_analyzer", student_profile_analyzer,
+              reads=["resume_text", "github_link", "preferences"],
+              writes=["student_profile", "extraction_info", "detailed_extraction"]),
+    AgentNode("internship_matcher", internship_matcher,
+              reads=["student_profile", "preferences"],
+              writes=["best_fit_internships"]),
+    AgentNode("portfolio_gap_detector", portfolio_gap_detector,
+              reads=["student_profile", "best_fit_internships"],
+              writes=["portfolio_gaps"]),
+    AgentNode("rag_requirement_aligner", rag_requirement_aligner,
+              reads=["student_profile", "best_fit_internships", "preferences"],
+              writes=["rag_aligned_requirements"]),
+    AgentNode("readiness_evaluator", readiness_evaluator,
+              reads=["student_profile", "best_fit_internships", "portfolio_gaps", "rag_aligned_requirements"],
+              writes=["readiness_evaluations", "processing_timestamp"])
+]
+
+# Runs the other agents of a parallel stage while the request thread runs the first one
+agent_node_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'AGENT_NODE_WORKERS', 8), thread_name_prefix='agent-node'
+)
+dag_workflow = DAGWorkflow(analysis_nodes, agent_node_executor)
+
 if LANGGRAPH_AVAILABLE:
     # Use LangGraph if available
-    from langgraph.graph import StateGraph, END
-    
-    workflow = StateGraph(AnalysisState)
-    workflow.add_node("student_profile_analyzer", student_profile_analyzer)
-    workflow.add_node("internship_matcher", internship_matcher)
-    workflow.add_node("portfolio_gap_detector", portfolio_gap_detector)
-    workflow.add_node("rag_requirement_aligner", rag_requirement_aligner)
-    workflow.add_node("readiness_evaluator", readiness_evaluator)
-    
-    # New Enhanced Flow
-    workflow.set_entry_point("student_profile_analyzer")
-    workflow.add_edge("student_profile_analyzer", "internship_matcher")
-    workflow.add_edge("internship_matcher", "portfolio_gap_detector")
-    workflow.add_edge("portfolio_gap_detector", "rag_requirement_aligner")
-    workflow.add_edge("rag_requirement_aligner", "readiness_evaluator")
-    workflow.add_edge("readiness_evaluator", END)
-    
-    graph = workflow.compile()
+    graph = dag_workflow.to_langgraph()
 else:
-    # Use sequential workflow - New Enhanced Flow
-    agents = [
-        ("student_profile_analyzer", student_profile_analyzer),
-        ("internship_matcher", internship_matcher),
-        ("portfolio_gap_detector", portfolio_gap_detector),
-        ("rag_requirement_aligner", rag_requirement_aligner),
-        ("readiness_evaluator", readiness_evaluator)
-    ]
-    graph = SequentialWorkflow(agents)
+    graph = dag_workflow
+
+def analysis_cache_key(state) -> str:
+    """SHA-256 of everything that determines an analysis: resume text, preferences, GitHub link and RAG index"""
+    preferences = sorted({str(preference).strip().lower() for preference in state["preferences"] if str(preference).strip()})
+    index_version = internship_rag.index_version if RAG_AVAILABLE and internship_rag else None
+    key = json.dumps({
+        "resume_text": state["resume_text"],
+        "preferences": preferences,
+        "github_link": (state.get("github_link") or "").strip().rstrip("/").lower(),
+        "rag_index_version": index_version or ""
+    }, sort_keys=True)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class AnalysisRequestError(Exception):
+    """A resume analysis request that cannot be run, with the response to send instead"""
+
+    def __init__(self, payload, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(payload.get("error"))
+        self.payload = payload
+        self.status_code = status_code
+
 
 class ResumeAnalysisView(APIView):
-    def post(self, request):
+    def prepare_analysis(self, request):
+        """Validate the upload and extract the resume text; returns (initial_state, file_id)"""
+        if not llm:
+            raise AnalysisRequestError({
+                "error": "AI service not available. Please check configuration.",
+                "fallback_available": True
+            }, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        # Get request data
+        resume_file = request.FILES.get("resume")
+        preferences = json.loads(request.data.get("preferences", "[]"))
+        github_link = request.data.get("github_link", "")  # Get GitHub link if provided
+
+        if not resume_file:
+            raise AnalysisRequestError({
+                "error": "Resume file is required"
+            })
+
+        # Save file
         try:
-            logger.info("🚀 STARTING RESUME ANALYSIS WORKFLOW")
+            file_path, file_id, file_info = file_manager.save_resume(resume_file)
+        except Exception as e:
+            raise AnalysisRequestError({
+                "error": f"Failed to save resume: {str(e)}"
+            })
+
+        # Extract text; the file is not needed once the text is out
+        try:
+            doc = docx.Document(file_path)
+            resume_text = "\n".join([p.text for p in doc.paragraphs if p.text.strip()])
+
+            # Extract from tables too
+            for table in doc.tables:
+                for row in table.rows:
+                    for cell in row.cells:
+                        if cell.text.strip():
+                            resume_text += "\n" + cell.text
+        except Exception as e:
+            raise AnalysisRequestError({
+                "error": f"Failed to process document: {str(e)}"
+            })
+        finally:
+            file_manager.delete_file(file_path)
+
+        if not resume_text.strip():
+            raise AnalysisRequestError({
+                "error": "Could not extract text from document"
+            })
+
+        # Initialize state
+        initial_state = {
+            "resume_text": resume_text,
+            "github_link": github_link,
+            "preferences": preferences,
+            "student_profile": {},
+            "best_fit_internships": [],
+            "portfolio_gaps": [],
+            "rag_aligned_requirements": {},
+            "readiness_evaluations": [],
+            "extraction_info": {},
+            "processing_timestamp": "",
+            "error": "",
+            "current_step": "Starting analysis...",
+            "step_progress": 0,
+            "detailed_extraction": {},
+            "agent_communications": [],
+            "agent_timings": {}
+        }
+        return initial_state, file_id
+
+    def build_response_data(self, final_state, file_id):
+        resume_text = final_state["resume_text"]
+        return {
+            "student_profile": final_state["student_profile"],
+            "internship_recommendations": final_state.get("best_fit_internships", []),
+            "portfolio_gaps": final_state["portfolio_gaps"],
+            "rag_aligned_requirements": final_state.get("rag_aligned_requirements", {}),
+            "readiness_evaluations": final_state["readiness_evaluations"],
+            "extraction_info": final_state["extraction_info"],
+            "detailed_extraction": final_state["detailed_extraction"],
+            "processing_timestamp": final_state["processing_timestamp"],
+            "current_step": final_state["current_step"],
+            "step_progress": final_state["step_progress"],
+            "agent_communications": final_state["agent_communications"],
+            "agent_timings": final_state.get("agent_timings", {}),
+            "served_from_cache": False,
+            "file_info": {
+                "file_id": file_id,
+                "processed": True,
+                "chars_extracted": len(resume_text),
+                "resume_text": resume_text[:3000] + "..." if len(resume_text) > 3000 else resume_text
+            }
+        }
+
+    def cached_response(self, cache_key, file_id):
+        """Response data of an identical earlier analysis, flagged as served from cache, or None"""
+        cached = default_analysis_cache().get(cache_key)
+        if cached is None:
+            return None
+        logger.info(f"⚡ Serving resume analysis {cache_key[:12]} from cache")
+        # Deep copy so neither the caller nor the MongoDB save can change the cached entry
+        response_data = copy.deepcopy(cached)
+        response_data["file_info"]["file_id"] = file_id
+        response_data["served_from_cache"] = True
+        return response_data
+
+    def cache_response(self, cache_key, response_data):
+        try:
+            # Copy so later changes to the response (e.g. by the MongoDB save) never reach the cache
+            default_analysis_cache().set(cache_key, copy.deepcopy(response_data))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not cache analysis result: {str(e)}")
+
+    def record_cached_analysis(self, response_data, user_id="anonymous"):
+        """Count a cache hit on the dashboard and add it to the user's history like a fresh analysis"""
+        final_state = dict(response_data, best_fit_internships=response_data.get("internship_recommendations", []))
+        self.record_analysis(final_state, response_data, user_id)
+
+    def record_analysis(self, final_state, response_data, user_id="anonymous"):
+        """Update the dashboard cache now and save the analysis to MongoDB in the background"""
+        # ⚡ IMMEDIATELY UPDATE CACHE FOR REAL-TIME DASHBOARD STATS ⚡
+        # Update cache immediately so frontend gets real-time data, not just after DB save
+        try:
+            readiness_score = 0
+            if final_state.get("readiness_evaluations"):
+                # Calculate average readiness score - try multiple score fields
+                scores = []
+                for eval in final_state["readiness_evaluations"]:
+                    if isinstance(eval, dict):
+                        score = (eval.get("readiness_score") or 
+                               eval.get("overall_score") or 
+                               eval.get("score") or 
+                               eval.get("internship_readiness_score", 0))
+                        if score:
+                            # Convert to percentage if needed
+                            if isinstance(score, (int, float)):
+                                scores.append(float(score) * 100 if score <= 1 else float(score))
+                
+                readiness_score = round(sum(scores) / len(scores)) if scores else 0
             
-            if not llm:
-                return Response({
-                    "error": "AI service not available. Please check configuration.",
-                    "fallback_available": True
-                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            internship_matches = len(final_state.get("best_fit_internships", []))
+            gaps_detected = len(final_state.get("portfolio_gaps", []))
             
-            # Get request data
-            resume_file = request.FILES.get("resume")
-            preferences = json.loads(request.data.get("preferences", "[]"))
-            github_link = request.data.get("github_link", "")  # Get GitHub link if provided
+            # Import and call the cache update function immediately
+            from .views import update_analysis_cache
+            update_analysis_cache(readiness_score, internship_matches, gaps_detected)
+            logger.info(f"⚡ IMMEDIATE cache update: score={readiness_score}, matches={internship_matches}, gaps={gaps_detected}")
             
-            if not resume_file:
-                return Response({
-                    "error": "Resume file is required"
-                }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as cache_error:
+            logger.warning(f"⚠️ Immediate cache update failed: {str(cache_error)}")
+        
+        # Schedule MongoDB save for 2 seconds later (async to avoid blocking response)
+        import threading
+        
+        def delayed_save_to_mongodb():
+            """Save analysis to MongoDB after a 2-second delay"""
+            import time
+            time.sleep(2)  # Wait 2 seconds
             
-            # Save file
-            try:
-                file_path, file_id, file_info = file_manager.save_resume(resume_file)
-            except Exception as e:
-                return Response({
-                    "error": f"Failed to save resume: {str(e)}"
-                }, status=status.HTTP_400_BAD_REQUEST)
+            logger.info("🚀 Starting delayed MongoDB save process...")
+            
+            if not MONGODB_AVAILABLE or not mongodb_service:
+                logger.warning("⚠️ MongoDB service not available - analysis not saved (delayed save)")
+                return
             
-            # Extract text
             try:
-                doc = docx.Document(file_path)
-                resume_text = "\n".join([p.text for p in doc.paragraphs if p.text.strip()])
+                # First, test the connection
+                logger.info("🔍 Testing MongoDB connection...")
+                if not mongodb_service.is_connected():
+                    logger.info("🔄 MongoDB not connected, attempting to reconnect...")
+                    connection_success = mongodb_service.connect()
+                    if not connection_success:
+                        logger.error("❌ MongoDB reconnection failed - cannot save analysis")
+                        return
                 
-                # Extract from tables too
-                for table in doc.tables:
-                    for row in table.rows:
-                        for cell in row.cells:
-                            if cell.text.strip():
-                                resume_text += "\n" + cell.text
-                
-                if not resume_text.strip():
-                    file_manager.delete_file(file_path)
-                    return Response({
-                        "error": "Could not extract text from document"
-                    }, status=status.HTTP_400_BAD_REQUEST)
+                # Verify connection is working
+                if mongodb_service.is_connected():
+                    logger.info(f"💾 Saving analysis to MongoDB for user: {user_id}")
+                    analysis_id = mongodb_service.save_analysis_result(response_data, user_id)
+                    
+                    if analysis_id:
+                        logger.info(f"✅ Analysis saved to MongoDB with ID: {analysis_id} (delayed save)")
+                        
+                        # Update dashboard cache with new analysis results
+                        readiness_score = 0
+                        if final_state.get("readiness_evaluations"):
+                            # Calculate average readiness score - try multiple score fields
+                            scores = []
+                            for eval in final_state["readiness_evaluations"]:
+                                if isinstance(eval, dict):
+                                    score = (eval.get("readiness_score") or 
+                                           eval.get("overall_score") or 
+                                           eval.get("score") or 
+                                           eval.get("internship_readiness_score", 0))
+                                    if score:
+                                        # Convert to percentage if needed
+                                        if isinstance(score, (int, float)):
+                                            scores.append(float(score) * 100 if score <= 1 else float(score))
+                            
+                            readiness_score = round(sum(scores) / len(scores)) if scores else 0
+                        
+                        internship_matches = len(final_state.get("internship_recommendations", []))
+                        gaps_detected = len(final_state.get("portfolio_gaps", []))
+                        
+                        # Import the cache update function
+                        try:
+                            from .views import update_analysis_cache
+                            update_analysis_cache(readiness_score, internship_matches, gaps_detected)
+                            logger.info(f"✅ Dashboard cache updated: score={readiness_score}, matches={internship_matches}, gaps={gaps_detected}")
+                        except Exception as cache_error:
+                            logger.warning(f"⚠️ Cache update failed: {str(cache_error)}")
+                        
+                    else:
+                        logger.warning("⚠️ Failed to save analysis to MongoDB - no ID returned (delayed save)")
+                else:
+                    logger.warning("⚠️ MongoDB connection verification failed")
                     
             except Exception as e:
-                file_manager.delete_file(file_path)
-                return Response({
-                    "error": f"Failed to process document: {str(e)}"
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Initialize state
-            initial_state = {
-                "resume_text": resume_text,
-                "github_link": github_link,
-                "preferences": preferences,
-                "student_profile": {},
-                "best_fit_internships": [],
-                "portfolio_gaps": [],
-                "rag_aligned_requirements": {},
-                "readiness_evaluations": [],
-                "extraction_info": {},
-                "processing_timestamp": "",
-                "error": "",
-                "current_step": "Starting analysis...",
-                "step_progress": 0,
-                "detailed_extraction": {},
-                "agent_communications": []
-            }
-            
+                logger.error(f"❌ MongoDB delayed save error: {str(e)}")
+                # Try to get connection diagnostics
+                try:
+                    diagnostics = mongodb_service.test_connection()
+                    logger.error(f"📊 Connection diagnostics: {diagnostics}")
+                except Exception:
+                    logger.error("📊 Could not retrieve connection diagnostics")
+        
+        # Start the delayed save in a background thread
+        if MONGODB_AVAILABLE and mongodb_service:
+            save_thread = threading.Thread(target=delayed_save_to_mongodb, daemon=True)
+            save_thread.start()
+            logger.info("� Scheduled MongoDB save for 2 seconds later (background thread started)")
+        else:
+            logger.warning("⚠️ MongoDB service not available - skipping delayed save")
+
+    def post(self, request):
+        try:
+            logger.info("🚀 STARTING RESUME ANALYSIS WORKFLOW")
+
+            try:
+                initial_state, file_id = self.prepare_analysis(request)
+            except AnalysisRequestError as e:
+                return Response(e.payload, status=e.status_code)
+
+            # Identical resubmissions are answered from the cache without rerunning the agents
+            cache_key = analysis_cache_key(initial_state)
+            response_data = self.cached_response(cache_key, file_id)
+            if response_data is not None:
+                self.record_cached_analysis(response_data, request.data.get("user_id", "anonymous"))
+                return Response(response_data, status=status.HTTP_200_OK)
+
             # Run workflow
             final_state = graph.invoke(initial_state)
-            
-            # Clean up
-            file_manager.delete_file(file_path)
-            
+
             if final_state.get("error"):
                 return Response({
                     "error": final_state["error"]
                 }, status=status.HTTP_400_BAD_REQUEST)
-            
+
             # Prepare response
-            response_data = {
-                "student_profile": final_state["student_profile"],
-                "internship_recommendations": final_state.get("best_fit_internships", []),
-                "portfolio_gaps": final_state["portfolio_gaps"],
-                "rag_aligned_requirements": final_state.get("rag_aligned_requirements", {}),
-                "readiness_evaluations": final_state["readiness_evaluations"],
-                "extraction_info": final_state["extraction_info"],
-                "detailed_extraction": final_state["detailed_extraction"],
-                "processing_timestamp": final_state["processing_timestamp"],
-                "current_step": final_state["current_step"],
-                "step_progress": final_state["step_progress"],
-                "agent_communications": final_state["agent_communications"],
-                "file_info": {
-                    "file_id": file_id,
-                    "processed": True,
-                    "chars_extracted": len(resume_text),
-                    "resume_text": resume_text[:3000] + "..." if len(resume_text) > 3000 else resume_text                }
-            }
-            
-            # ⚡ IMMEDIATELY UPDATE CACHE FOR REAL-TIME DASHBOARD STATS ⚡
-            # Update cache immediately so frontend gets real-time data, not just after DB save
-            try:
-                readiness_score = 0
-                if final_state.get("readiness_evaluations"):
-                    # Calculate average readiness score - try multiple score fields
-                    scores = []
-                    for eval in final_state["readiness_evaluations"]:
-                        if isinstance(eval, dict):
-                            score = (eval.get("readiness_score") or 
-                                   eval.get("overall_score") or 
-                                   eval.get("score") or 
-                                   eval.get("internship_readiness_score", 0))
-                            if score:
-                                # Convert to percentage if needed
-                                if isinstance(score, (int, float)):
-                                    scores.append(float(score) * 100 if score <= 1 else float(score))
-                    
-                    readiness_score = round(sum(scores) / len(scores)) if scores else 0
-                
-                internship_matches = len(final_state.get("best_fit_internships", []))
-                gaps_detected = len(final_state.get("portfolio_gaps", []))
-                
-                # Import and call the cache update function immediately
-                from .views import update_analysis_cache
-                update_analysis_cache(readiness_score, internship_matches, gaps_detected)
-                logger.info(f"⚡ IMMEDIATE cache update: score={readiness_score}, matches={internship_matches}, gaps={gaps_detected}")
-                
-            except Exception as cache_error:
-                logger.warning(f"⚠️ Immediate cache update failed: {str(cache_error)}")
-            
-            # Schedule MongoDB save for 2 seconds later (async to avoid blocking response)
-            import threading
-            
-            def delayed_save_to_mongodb():
-                """Save analysis to MongoDB after a 2-second delay"""
-                import time
-                time.sleep(2)  # Wait 2 seconds
-                
-                logger.info("🚀 Starting delayed MongoDB save process...")
-                
-                if not MONGODB_AVAILABLE or not mongodb_service:
-                    logger.warning("⚠️ MongoDB service not available - analysis not saved (delayed save)")
-                    return
-                
-                try:
-                    # First, test the connection
-                    logger.info("🔍 Testing MongoDB connection...")
-                    if not mongodb_service.is_connected():
-                        logger.info("🔄 MongoDB not connected, attempting to reconnect...")
-                        connection_success = mongodb_service.connect()
-                        if not connection_success:
-                            logger.error("❌ MongoDB reconnection failed - cannot save analysis")
-                            return
-                    
-                    # Verify connection is working
-                    if mongodb_service.is_connected():
-                        # Extract user_id from request
-                        user_id = request.data.get("user_id", "anonymous")
-                        
-                        logger.info(f"💾 Saving analysis to MongoDB for user: {user_id}")
-                        analysis_id = mongodb_service.save_analysis_result(response_data, user_id)
-                        
-                        if analysis_id:
-                            logger.info(f"✅ Analysis saved to MongoDB with ID: {analysis_id} (delayed save)")
-                            
-                            # Update dashboard cache with new analysis results
-                            readiness_score = 0
-                            if final_state.get("readiness_evaluations"):
-                                # Calculate average readiness score - try multiple score fields
-                                scores = []
-                                for eval in final_state["readiness_evaluations"]:
-                                    if isinstance(eval, dict):
-                                        score = (eval.get("readiness_score") or 
-                                               eval.get("overall_score") or 
-                                               eval.get("score") or 
-                                               eval.get("internship_readiness_score", 0))
-                                        if score:
-                                            # Convert to percentage if needed
-                                            if isinstance(score, (int, float)):
-                                                scores.append(float(score) * 100 if score <= 1 else float(score))
-                                
-                                readiness_score = round(sum(scores) / len(scores)) if scores else 0
-                            
-                            internship_matches = len(final_state.get("internship_recommendations", []))
-                            gaps_detected = len(final_state.get("portfolio_gaps", []))
-                            
-                            # Import the cache update function
-                            try:
-                                from .views import update_analysis_cache
-                                update_analysis_cache(readiness_score, internship_matches, gaps_detected)
-                                logger.info(f"✅ Dashboard cache updated: score={readiness_score}, matches={internship_matches}, gaps={gaps_detected}")
-                            except Exception as cache_error:
-                                logger.warning(f"⚠️ Cache update failed: {str(cache_error)}")
-                            
-                        else:
-                            logger.warning("⚠️ Failed to save analysis to MongoDB - no ID returned (delayed save)")
-                    else:
-                        logger.warning("⚠️ MongoDB connection verification failed")
-                        
-                except Exception as e:
-                    logger.error(f"❌ MongoDB delayed save error: {str(e)}")
-                    # Try to get connection diagnostics
-                    try:
-                        diagnostics = mongodb_service.test_connection()
-                        logger.error(f"📊 Connection diagnostics: {diagnostics}")
-                    except Exception:
-                        logger.error("📊 Could not retrieve connection diagnostics")
-            
-            # Start the delayed save in a background thread
-            if MONGODB_AVAILABLE and mongodb_service:
-                save_thread = threading.Thread(target=delayed_save_to_mongodb, daemon=True)
-                save_thread.start()
-                logger.info("� Scheduled MongoDB save for 2 seconds later (background thread started)")
-            else:
-                logger.warning("⚠️ MongoDB service not available - skipping delayed save")
-            
+            response_data = self.build_response_data(final_state, file_id)
+            self.cache_response(cache_key, response_data)
+            self.record_analysis(final_state, response_data, request.data.get("user_id", "anonymous"))
+
             return Response(response_data, status=status.HTTP_200_OK)
-            
+
+        except Exception as e:
+            logger.error(f"💥 CRITICAL WORKFLOW FAILURE: {str(e)}")
+            return Response({
+                "error": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def server_sent_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class ResumeAnalysisStreamView(ResumeAnalysisView):
+    """Resume analysis streamed as server-sent events: a `progress` event, one `agent` event per finished
+    agent with the state keys it wrote, then `complete` with the same payload as ResumeAnalysisView (or `error`)"""
+
+    def post(self, request):
+        logger.info("🚀 STARTING STREAMED RESUME ANALYSIS WORKFLOW")
+        try:
+            initial_state, file_id = self.prepare_analysis(request)
+        except AnalysisRequestError as e:
+            return Response(e.payload, status=e.status_code)
+        except Exception as e:
+            logger.error(f"💥 CRITICAL WORKFLOW FAILURE: {str(e)}")
+            return Response({
+                "error": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        response = StreamingHttpResponse(
+            self.stream_events(initial_state, file_id, request.data.get("user_id", "anonymous")),
+            content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # Keep nginx from buffering the events
+        return response
+
+    def stream_events(self, initial_state, file_id, user_id):
+        yield server_sent_event("progress", {
+            "current_step": initial_state["current_step"],
+            "step_progress": initial_state["step_progress"]
+        })
+
+        try:
+            cache_key = analysis_cache_key(initial_state)
+            response_data = self.cached_response(cache_key, file_id)
+            if response_data is not None:
+                yield server_sent_event("complete", response_data)
+                self.record_cached_analysis(response_data, user_id)
+                return
+
+            # The DAG workflow runs the same stages as the LangGraph graph, reporting each agent as it finishes
+            final_state = initial_state
+            communications_sent = 0
+            for node, final_state in dag_workflow.stream(initial_state):
+                communications = final_state["agent_communications"]
+                timing = final_state["agent_timings"].get(node.name, {})
+                yield server_sent_event("agent", {
+                    "agent": node.name,
+                    "status": timing.get("status"),
+                    "elapsed_seconds": timing.get("elapsed_seconds"),
+                    "current_step": final_state["current_step"],
+                    "step_progress": final_state["step_progress"],
+                    "result": {key: final_state.get(key) for key in sorted(node.writes)},
+                    "agent_communications": communications[communications_sent:]
+                })
+                communications_sent = len(communications)
+
+            if final_state.get("error"):
+                yield server_sent_event("error", {"error": final_state["error"]})
+                return
+
+            response_data = self.build_response_data(final_state, file_id)
+            self.cache_response(cache_key, response_data)
+            yield server_sent_event("complete", response_data)
+            self.record_analysis(final_state, response_data, user_id)
+
+        except Exception as e:
+            logger.error(f"💥 CRITICAL WORKFLOW FAILURE: {str(e)}")
+            yield server_sent_event("error", {"error": str(e)})
+
+class ResumeAnalysisJobView(ResumeAnalysisView):
+    """Queue a resume analysis and answer 202 with its job id; the result is polled from ResumeAnalysisJobStatusView"""
+
+    def post(self, request):
+        try:
+            try:
+                initial_state, file_id = self.prepare_analysis(request)
+            except AnalysisRequestError as e:
+                return Response(e.payload, status=e.status_code)
+
+            try:
+                job_id = default_analysis_job_queue().submit(
+                    self.run_job, initial_state, file_id, request.data.get("user_id", "anonymous")
+                )
+            except JobQueueFull as e:
+                logger.warning(f"⚠️ Rejected resume analysis: {str(e)}")
+                return Response({
+                    "error": "Too many analyses in progress. Please try again shortly."
+                }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+
+            logger.info(f"📥 Queued resume analysis job {job_id}")
+            return Response({
+                "job_id": job_id,
+                "status": "queued"
+            }, status=status.HTTP_202_ACCEPTED)
+
         except Exception as e:
             logger.error(f"💥 CRITICAL WORKFLOW FAILURE: {str(e)}")
             return Response({
                 "error": str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def run_job(self, job, initial_state, file_id, user_id):
+        """Run the analysis on a job worker, reporting progress and honouring the timeout between agents"""
+        cache_key = analysis_cache_key(initial_state)
+        response_data = self.cached_response(cache_key, file_id)
+        if response_data is not None:
+            self.record_cached_analysis(response_data, user_id)
+            return response_data
+
+        final_state = initial_state
+        for node, final_state in dag_workflow.stream(initial_state):
+            job.progress(final_state["current_step"], final_state["step_progress"])
+            job.check_timeout()
+
+        if final_state.get("error"):
+            raise RuntimeError(final_state["error"])
+
+        response_data = self.build_response_data(final_state, file_id)
+        self.cache_response(cache_key, response_data)
+        self.record_analysis(final_state, response_data, user_id)
+        return response_data
+
+
+class ResumeAnalysisJobStatusView(APIView):
+    def get(self, request, job_id):
+        try:
+            job = default_analysis_job_queue().status(job_id)
+            if job is None:
+                return Response({
+                    "error": "Analysis job not found"
+                }, status=status.HTTP_404_NOT_FOUND)
+            return Response(job, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.error(f"❌ Failed to read analysis job {job_id}: {str(e)}")
+            return Response({
+                "error": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 def enhance_profile_with_github(profile, github_insights):
     """Enhance profile with GitHub data"""
     if not github_insights:
@@ -1781,11 +2120,11 @@ def calculate_skill_match(student_skills, required_skills):
     if not student_skills or not required_skills:
         return 0
     
-    student_skills_lower = [skill.lower() for skill in student_skills]
-    required_skills_lower = [skill.lower() for skill in required_skills]
+    student_skill_keys = set(normalize_skill(skill) for skill in student_skills)
+    required_skill_keys = [normalize_skill(skill) for skill in required_skills]
     
-    matches = sum(1 for req_skill in required_skills_lower if req_skill in student_skills_lower)
-    return (matches / len(required_skills_lower)) * 100
+    matches = sum(1 for req_skill in required_skill_keys if req_skill in student_skill_keys)
+    return (matches / len(required_skill_keys)) * 100
 
 def calculate_readiness_score(profile, gaps):
     """Calculate readiness score"""
@@ -2009,25 +2348,7 @@ def enhance_extracted_profile(profile, resume_text, preferences):
 
 def extract_comprehensive_skills(text):
     """Extract skills from text"""
-    skill_database = [
-        'Python', 'JavaScript', 'Java', 'C++', 'C#', 'HTML', 'CSS', 'React', 
-        'Angular', 'Vue', 'Node.js', 'Django', 'Flask', 'Spring', 'MySQL', 
- 
-        'PostgreSQL', 'MongoDB', 'Git', 'Docker', 'AWS', 'Azure', 'TypeScript',
-        'PHP', 'Ruby', 'Go', 'Rust', 'Swift', 'Kotlin', 'Flutter', 'React Native',
-        'TensorFlow', 'PyTorch', 'Scikit-learn', 'Pandas', 'NumPy', 'Matplotlib',
-        'Kubernetes', 'Jenkins', 'CI/CD', 'Redis', 'Elasticsearch', 'GraphQL',
-        'REST', 'API', 'Microservices', 'DevOps', 'Linux', 'Unix', 'Bash'
-    ]
-    
-    found_skills = []
-    text_lower = text.lower()
-    
-    for skill in skill_database:
-        if skill.lower() in text_lower:
-            found_skills.append(skill)
-    
-    return found_skills
+    return skill_ontology.extract(text)
 
 def validate_and_enhance_profile(profile, preferences):
     """Validate and enhance profile"""
@@ -0,0 +1,85 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from utils.rag_system import InternshipRAG
+
+DEFAULT_QUERIES = [
+    'ML engineer intern python tensorflow',
+    'machine learning internship pytorch',
+    'React.js frontend developer',
+    'react javascript web development',
+    'data science sql statistics',
+    'backend django rest api',
+    'devops docker kubernetes aws',
+    'ui ux design figma',
+]
+
+class Command(BaseCommand):
+    help = 'Benchmark TF-IDF and hybrid dense retrieval latency and overlap on the persisted internships'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modes',
+            nargs='+',
+            choices=['tfidf', 'hybrid'],
+            default=['tfidf', 'hybrid'],
+            help='Retrieval modes to benchmark'
+        )
+        parser.add_argument(
+            '--query',
+            action='append',
+            dest='queries',
+            help='Query to run (repeatable, defaults to a built-in sample)'
+        )
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=10,
+            help='Results per query (default: 10)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timed runs per query (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        queries = options['queries'] or DEFAULT_QUERIES
+        top_k = options['top_k']
+        results = {}
+
+        for mode in options['modes']:
+            # Warm start only, so the benchmark never triggers a live scrape
+            rag = InternshipRAG(warm_start=True, embedding_mode=mode)
+            if not rag.internships:
+                raise CommandError('No persisted internships to benchmark, run scrape_internships first')
+            if mode == 'hybrid' and rag.dense_vectors is None:
+                self.stdout.write(self.style.WARNING('Hybrid mode unavailable (sentence-transformers missing), skipping'))
+                continue
+
+            rag.search_internships(queries[0], limit=top_k)  # Load models and page in the vectors
+            latencies = []
+            ranked_ids = []
+            for query in queries:
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    matches = rag.search_internships(query, limit=top_k)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                ranked_ids.append([match.get('id') for match in matches])
+
+            results[mode] = ranked_ids
+            self.stdout.write(
+                f'{mode}: {len(rag.get_all_internships())} internships, '
+                f'p50 {np.percentile(latencies, 50):.2f} ms, p95 {np.percentile(latencies, 95):.2f} ms, '
+                f'avg {np.mean([len(ids) for ids in ranked_ids]):.1f} results/query'
+            )
+
+        if len(results) == 2:
+            overlaps = [
+                len(set(tfidf_ids) & set(hybrid_ids)) / max(len(tfidf_ids), len(hybrid_ids), 1)
+                for tfidf_ids, hybrid_ids in zip(results['tfidf'], results['hybrid'])
+            ]
+            self.stdout.write(f'Top-{top_k} overlap between tfidf and hybrid: {np.mean(overlaps):.2%}')
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
@@ -1,8 +1,7 @@
-import json
-import os
 from datetime import datetime, timedelta
 from django.core.management.base import BaseCommand
-from django.conf import settings
+from utils.listing_store import default_listing_store
+from utils.listing_dedup import default_near_duplicate_index
 
 class Command(BaseCommand):
     help = 'Clean up expired internships and maintain data quality'
@@ -21,58 +20,37 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-        data_file_path = os.path.join(settings.BASE_DIR, 'data', 'internships.json')
+        store = default_listing_store()
         
-        if not os.path.exists(data_file_path):
+        found_count = store.count()
+        if not found_count:
             self.stdout.write(
-                self.style.WARNING('No internships data file found')
+                self.style.WARNING('No internships data found')
             )
             return
         
         try:
-            # Load existing data
-            with open(data_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            existing_internships = data.get("internships", [])
-            self.stdout.write(f'Found {len(existing_internships)} internships')
-            
-            # Filter internships
+            # Expiry is answered by the store (an indexed range query with the SQLite backend)
             current_date = datetime.now()
             cutoff_date = current_date + timedelta(days=options['days_ahead'])
             
-            active_internships = []
-            expired_count = 0
+            expired_ids = store.expired_ids(current_date)
+            removed_ids = list(expired_ids)
             soon_to_expire_count = 0
-            
-            for internship in existing_internships:
-                deadline_str = internship.get('application_deadline')
-                
-                if deadline_str:
-                    try:
-                        deadline = datetime.strptime(deadline_str, '%Y-%m-%d')
-                        
-                        if deadline < current_date:
-                            expired_count += 1
-                            continue
-                        elif deadline < cutoff_date:
-                            soon_to_expire_count += 1
-                            if options['days_ahead'] > 0:
-                                continue
-                        
-                        active_internships.append(internship)
-                    except ValueError:
-                        # Keep internships with invalid date formats
-                        active_internships.append(internship)
-                else:
-                    # Keep internships without deadlines
-                    active_internships.append(internship)
+            if options['days_ahead'] > 0:
+                expired = set(expired_ids)
+                soon_ids = [listing_id for listing_id in store.expired_ids(cutoff_date) if listing_id not in expired]
+                soon_to_expire_count = len(soon_ids)
+                removed_ids.extend(soon_ids)
+            expired_count = len(expired_ids)
+            remaining_count = found_count - len(removed_ids)
             
             # Report what would be done
+            self.stdout.write(f'Found {found_count} internships')
             self.stdout.write(f'Expired internships: {expired_count}')
             if options['days_ahead'] > 0:
                 self.stdout.write(f'Expiring within {options["days_ahead"]} days: {soon_to_expire_count}')
-            self.stdout.write(f'Active internships remaining: {len(active_internships)}')
+            self.stdout.write(f'Active internships remaining: {remaining_count}')
             
             if options['dry_run']:
                 self.stdout.write(
@@ -80,31 +58,23 @@ class Command(BaseCommand):
                 )
                 return
             
-            # Save cleaned data
-            cleaned_data = {"internships": active_internships}
-            with open(data_file_path, 'w', encoding='utf-8') as f:
-                json.dump(cleaned_data, f, indent=2, ensure_ascii=False)
+            # Removal is a tombstone in the segment manifest, or a DELETE with the SQLite backend
+            store.tombstone(removed_ids)
+            default_near_duplicate_index().remove(removed_ids)
             
             total_removed = expired_count + (soon_to_expire_count if options['days_ahead'] > 0 else 0)
             self.stdout.write(
                 self.style.SUCCESS(
                     f'Cleanup completed successfully!\n'
                     f'Removed: {total_removed} internships\n'
-                    f'Remaining: {len(active_internships)} internships'
+                    f'Remaining: {remaining_count} internships'
                 )
             )
             
             # Additional cleanup statistics
-            if active_internships:
-                sources = {}
-                domains = {}
-                for internship in active_internships:
-                    source = internship.get('source', 'Unknown')
-                    sources[source] = sources.get(source, 0) + 1
-                    
-                    domain = internship.get('domain', 'Unknown')
-                    domains[domain] = domains.get(domain, 0) + 1
-                
+            if remaining_count:
+                sources = store.count_by('source')
+                domains = store.count_by('domain')
                 self.stdout.write('\nRemaining internships by source:')
                 for source, count in sources.items():
                     self.stdout.write(f'  {source}: {count}')
@@ -1,7 +1,6 @@
-import asyncio
 import logging
 from django.core.management.base import BaseCommand, CommandError
-from api.scrap import InternshipScraper
+from api.scrap import scraper, scraping_orchestrator
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +33,12 @@ class Command(BaseCommand):
             default=2,
             help='Number of pages to scrape per source (default: 2)'
         )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=None,
+            help='Seconds before unfinished sources are stopped, keeping what they found (default: SCRAPING_TIMEOUT)'
+        )
         parser.add_argument(
             '--clean-expired',
             action='store_true',
@@ -41,42 +46,14 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-        scraper = InternshipScraper()
-        
         # Clean expired internships if requested
         if options['clean_expired']:
             self.stdout.write('Cleaning expired internships...')
             try:
-                existing_data = scraper.load_existing_internships()
-                existing_internships = existing_data.get("internships", [])
-                
-                from datetime import datetime
-                current_date = datetime.now()
-                active_internships = []
-                expired_count = 0
-                
-                for internship in existing_internships:
-                    deadline_str = internship.get('application_deadline')
-                    if deadline_str:
-                        try:
-                            deadline = datetime.strptime(deadline_str, '%Y-%m-%d')
-                            if deadline >= current_date:
-                                active_internships.append(internship)
-                            else:
-                                expired_count += 1
-                        except ValueError:
-                            active_internships.append(internship)
-                    else:
-                        active_internships.append(internship)
-                
-                # Save cleaned data
-                import json
-                cleaned_data = {"internships": active_internships}
-                with open(scraper.data_file_path, 'w', encoding='utf-8') as f:
-                    json.dump(cleaned_data, f, indent=2, ensure_ascii=False)
+                cleanup = scraper.remove_expired_internships()
                 
                 self.stdout.write(
-                    self.style.SUCCESS(f'Removed {expired_count} expired internships')
+                    self.style.SUCCESS(f'Removed {cleanup["expired_count"]} expired internships')
                 )
             except Exception as e:
                 self.stdout.write(
@@ -89,17 +66,15 @@ class Command(BaseCommand):
         location = options['location']
         max_pages = min(options['pages'], 5)  # Limit to 5 pages max
         
-        self.stdout.write(f'Starting internship scraping...')
+        self.stdout.write('Starting internship scraping...')
         self.stdout.write(f'Sources: {", ".join(sources)}')
         self.stdout.write(f'Keyword: {keyword}')
         self.stdout.write(f'Location: {location}')
         self.stdout.write(f'Pages per source: {max_pages}')
         
         try:
-            # Run the scraping
-            all_internships = asyncio.run(self._scrape_all(
-                scraper, sources, keyword, location, max_pages
-            ))
+            # Run the sources concurrently
+            all_internships = self._scrape_all(sources, keyword, location, max_pages, options['timeout'])
             
             # Save the results
             saved_count = scraper.save_internships(all_internships)
@@ -116,63 +91,16 @@ class Command(BaseCommand):
             logger.error(f"Scraping failed: {e}")
             raise CommandError(f'Scraping failed: {e}')
 
-    async def _scrape_all(self, scraper, sources, keyword, location, max_pages):
-        """Scrape from all specified sources"""
-        all_internships = []
+    def _scrape_all(self, sources, keyword, location, max_pages, timeout):
+        """Scrape from all specified sources concurrently, keeping partial results of slow sources"""
+        self.stdout.write(f'Scraping {", ".join(sources)} concurrently...')
+        scrape_result = scraping_orchestrator.run(sources, keyword, location, max_pages, timeout=timeout)
         
-        if 'indeed' in sources:
-            self.stdout.write('Scraping Indeed...')
-            try:
-                indeed_results = await scraper.scrape_indeed(keyword, location, max_pages)
-                all_internships.extend(indeed_results)
-                self.stdout.write(f'Indeed: {len(indeed_results)} internships found')
-            except Exception as e:
-                self.stdout.write(
-                    self.style.WARNING(f'Indeed scraping failed: {e}')
-                )
-
-        if 'linkedin' in sources:
-            self.stdout.write('Scraping LinkedIn...')
-            try:
-                linkedin_results = await scraper.scrape_linkedin(keyword, location, max_pages)
-                all_internships.extend(linkedin_results)
-                self.stdout.write(f'LinkedIn: {len(linkedin_results)} internships found')
-            except Exception as e:
-                self.stdout.write(
-                    self.style.WARNING(f'LinkedIn scraping failed: {e}')
-                )
-
-        if 'naukri' in sources:
-            self.stdout.write('Scraping Naukri...')
-            try:
-                naukri_results = await scraper.scrape_naukri(keyword, location, max_pages)
-                all_internships.extend(naukri_results)
-                self.stdout.write(f'Naukri: {len(naukri_results)} internships found')
-            except Exception as e:
-                self.stdout.write(
-                    self.style.WARNING(f'Naukri scraping failed: {e}')
-                )
-
-        if 'internshala' in sources:
-            self.stdout.write('Scraping Internshala...')
-            try:
-                internshala_results = await scraper.scrape_internshala(keyword, location, max_pages)
-                all_internships.extend(internshala_results)
-                self.stdout.write(f'Internshala: {len(internshala_results)} internships found')
-            except Exception as e:
-                self.stdout.write(
-                    self.style.WARNING(f'Internshala scraping failed: {e}')
-                )
-
-        if 'letsintern' in sources:
-            self.stdout.write('Scraping LetsIntern...')
-            try:
-                letsintern_results = await scraper.scrape_letsintern(keyword, location, max_pages)
-                all_internships.extend(letsintern_results)
-                self.stdout.write(f'LetsIntern: {len(letsintern_results)} internships found')
-            except Exception as e:
-                self.stdout.write(
-                    self.style.WARNING(f'LetsIntern scraping failed: {e}')
-                )
-
-        return all_internships
+        for source, result in scrape_result['sources'].items():
+            line = f'{source}: {result["count"]} internships found in {result["elapsed_seconds"]}s'
+            if result['error']:
+                self.stdout.write(self.style.WARNING(f'{line} ({result["status"]}: {result["error"]})'))
+            else:
+                self.stdout.write(line)
+        
+        return scrape_result['internships']
@@ -1,8 +1,8 @@
-import json
 import asyncio
 import logging
 import random
 import os
+import sys
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from django.conf import settings
@@ -13,7 +13,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from pathlib import Path
 import threading
 from concurrent.futures import ThreadPoolExecutor
@@ -26,10 +26,88 @@ except ImportError:
     GEMINI_AVAILABLE = False
     gemini_service = None
 
+from utils.skill_ontology import skill_ontology
+from utils.listing_store import default_listing_store
+from utils.listing_dedup import content_hash, default_near_duplicate_index
+from utils.browser_pool import BrowserPool
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Card fields per source: CSS selectors tried in order, the attribute to read (inner text otherwise),
+# the value when no selector matches, and 'all' for a list of every match
+CARD_FIELDS = {
+    'indeed': {
+        'title': {'selectors': ['h2 a span'], 'default': 'N/A'},
+        'company': {'selectors': ['[data-testid="company-name"]'], 'default': 'N/A'},
+        'location': {'selectors': ['[data-testid="job-location"]'], 'default': 'N/A'},
+        'summary': {'selectors': ['.slider_container .slider_item'], 'default': 'N/A'},
+        'link': {'selectors': ['h2 a'], 'attribute': 'href', 'default': ''},
+        'salary': {'selectors': ['[data-testid="salary-snippet"]'], 'default': 'Not specified'},
+    },
+    'linkedin': {
+        'title': {'selectors': ['.base-search-card__title'], 'default': 'N/A'},
+        'company': {'selectors': ['.base-search-card__subtitle'], 'default': 'N/A'},
+        'location': {'selectors': ['.job-search-card__location'], 'default': 'N/A'},
+        'link': {'selectors': ['.base-card__full-link'], 'attribute': 'href', 'default': ''},
+    },
+    'naukri': {
+        'title': {'selectors': ['.title'], 'default': 'N/A'},
+        'company': {'selectors': ['.comp-name'], 'default': 'N/A'},
+        'location': {'selectors': ['.locWdth'], 'default': 'N/A'},
+        'summary': {'selectors': ['.job-desc'], 'default': 'N/A'},
+        'link': {'selectors': ['.title'], 'attribute': 'href', 'default': ''},
+        'experience': {'selectors': ['.expwdth'], 'default': 'Fresher'},
+    },
+    'internshala': {
+        'title': {'selectors': ['.heading .job-internship-name', '.profile h3 a', '.heading a'], 'default': 'N/A'},
+        'company': {'selectors': ['.company-name', '.company_name'], 'default': 'N/A'},
+        'location': {'selectors': ['.location_link'], 'default': 'N/A'},
+        'duration': {'selectors': ['.internship_duration'], 'default': 'N/A'},
+        'stipend': {'selectors': ['.stipend'], 'default': 'N/A'},
+        'link': {
+            'selectors': ['.heading .job-internship-name', '.profile h3 a', '.heading a'],
+            'attribute': 'href', 'default': ''
+        },
+        'skills': {'selectors': ['.round_tabs a', '.skill-tag', '.tags a'], 'all': True},
+    },
+    'letsintern': {
+        'title': {'selectors': ['.internship-title', '.job-title', 'h3'], 'default': 'N/A'},
+        'company': {'selectors': ['.company-name', '.company'], 'default': 'N/A'},
+        'location': {'selectors': ['.location'], 'default': 'N/A'},
+        'duration': {'selectors': ['.duration'], 'default': 'N/A'},
+        'stipend': {'selectors': ['.stipend'], 'default': 'N/A'},
+        'link': {'selectors': ['a', '.internship-title'], 'attribute': 'href', 'default': ''},
+        'description': {'selectors': ['.description', '.job-description'], 'default': 'N/A'},
+    },
+}
+
+# Runs in the page over all matched cards and returns their CARD_FIELDS values as one JSON array
+EXTRACT_CARDS_JS = """
+(cards, {fields, limit}) => cards.slice(0, limit === null ? cards.length : limit).map(card => {
+    const row = {};
+    for (const [name, spec] of Object.entries(fields)) {
+        if (spec.all) {
+            row[name] = Array.from(card.querySelectorAll(spec.selectors.join(', ')))
+                .map(element => (element.innerText || '').trim());
+            continue;
+        }
+        row[name] = spec.default;
+        for (const selector of spec.selectors) {
+            const element = card.querySelector(selector);
+            if (!element) continue;
+            const value = spec.attribute ? element.getAttribute(spec.attribute) : (element.innerText || '').trim();
+            if (value) {
+                row[name] = value;
+                break;
+            }
+        }
+    }
+    return row;
+})
+"""
+
 class InternshipScraper:
     def __init__(self):
         self.timeout = 30000  # 30 seconds
@@ -37,6 +115,15 @@ class InternshipScraper:
         self.retry_delay = 2000  # 2 seconds
         self.data_file_path = os.path.join(settings.BASE_DIR, 'data', 'internships.json')
         self.ensure_data_directory()
+        self.listing_store = default_listing_store()
+        self.extraction_executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'SCRAPING_EXTRACTION_WORKERS', 4), thread_name_prefix='card-extraction'
+        )
+        self.browser_pool = BrowserPool(
+            contexts=getattr(settings, 'SCRAPING_BROWSER_CONTEXTS', 3),
+            pages_per_context=getattr(settings, 'SCRAPING_PAGES_PER_CONTEXT', 2),
+            max_navigations=getattr(settings, 'SCRAPING_CONTEXT_MAX_NAVIGATIONS', 50)
+        )
         
         # Platform configurations
         self.platforms = {
@@ -78,428 +165,207 @@ class InternshipScraper:
         os.makedirs(data_dir, exist_ok=True)
 
     def load_existing_internships(self) -> Dict:
-        """Load existing internships from JSON file"""
+        """Load existing internships from the listing store"""
         try:
-            if os.path.exists(self.data_file_path):
-                with open(self.data_file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {"internships": []}
+            return {"internships": list(self.iter_internships())}
         except Exception as e:
             logger.error(f"Error loading existing internships: {e}")
             return {"internships": []}
 
+    def iter_internships(self):
+        """Stream persisted internships one at a time from the listing store"""
+        return self.listing_store.iter_listings()
+
+    def remove_expired_internships(self) -> Dict:
+        """Remove expired internships from the listing store without rewriting it"""
+        expired_ids = self.listing_store.expire(datetime.now())
+        default_near_duplicate_index().remove(expired_ids)
+        return {
+            "active_count": self.listing_store.count(),
+            "expired_ids": expired_ids,
+            "expired_count": len(expired_ids)
+        }
+
     def save_internships(self, internships: List[Dict]):
-        """Save internships to JSON file with comprehensive validation and duplicate checking"""
+        """Append new internships to the listing store with comprehensive validation and duplicate checking"""
         try:
             # First validate and filter internships
             valid_internships = self.filter_and_validate_internships(internships)
             logger.info(f"Validated {len(valid_internships)} out of {len(internships)} scraped internships")
             
-            # Load existing data
-            existing_data = self.load_existing_internships()
-            existing_internships = existing_data.get("internships", [])
-            
-            # Filter out expired internships
+            # Remove expired internships first so duplicates are only checked against active ones
             current_date = datetime.now()
-            active_internships = []
+            expired_ids = self.listing_store.expire(current_date)
+            near_duplicates = default_near_duplicate_index()
+            near_duplicates.remove(expired_ids)
             
-            for internship in existing_internships:
-                deadline_str = internship.get('application_deadline')
-                if deadline_str:
-                    try:
-                        deadline = datetime.strptime(deadline_str, '%Y-%m-%d')
-                        if deadline >= current_date:
-                            active_internships.append(internship)
-                    except ValueError:
-                        # Keep internships with invalid date formats
-                        active_internships.append(internship)
-                else:
-                    # Keep internships without deadlines
-                    active_internships.append(internship)
+            # Drop exact and near duplicates of stored listings and of each other via the LSH index
+            unique_internships, duplicate_count = near_duplicates.add_unique(
+                valid_internships, assign_id=self.generate_unique_id
+            )
             
-            # Add new valid internships (avoiding duplicates)
-            existing_ids = {internship.get('id') for internship in active_internships if internship.get('id')}
-            existing_titles_companies = {(internship.get('title', '').lower(), internship.get('company', '').lower()) 
-                                       for internship in active_internships}
-            
-            added_count = 0
-            for new_internship in valid_internships:
-                # Check for duplicates
-                new_id = new_internship.get('id')
-                new_title_company = (new_internship.get('title', '').lower(), new_internship.get('company', '').lower())
+            added_internships = []
+            for new_internship in unique_internships:
+                # Set default deadline if not present (30 days from now)
+                if not new_internship.get('application_deadline'):
+                    deadline = current_date + timedelta(days=30)
+                    new_internship['application_deadline'] = deadline.strftime('%Y-%m-%d')
                 
-                if new_id not in existing_ids and new_title_company not in existing_titles_companies:
-                    # Generate unique ID if not present
-                    if not new_id:
-                        new_internship['id'] = self.generate_unique_id(new_internship)
-                    
-                    # Set default deadline if not present (30 days from now)
-                    if not new_internship.get('application_deadline'):
-                        deadline = current_date + timedelta(days=30)
-                        new_internship['application_deadline'] = deadline.strftime('%Y-%m-%d')
-                    
-                    active_internships.append(new_internship)
-                    added_count += 1
+                added_internships.append(new_internship)
+            
+            self.listing_store.append(added_internships)
+            active_count = self.listing_store.count()
             
-            # Save updated data
-            updated_data = {"internships": active_internships}
-            with open(self.data_file_path, 'w', encoding='utf-8') as f:
-                json.dump(updated_data, f, indent=2, ensure_ascii=False)
+            logger.info(
+                f"Saved {active_count} total internships ({len(added_internships)} new, "
+                f"{duplicate_count} duplicates skipped, {len(expired_ids)} expired removed)"
+            )
             
-            logger.info(f"Saved {len(active_internships)} total internships ({added_count} new, {len(existing_internships) - len(active_internships)} expired removed)")
-            return len(active_internships)
+            self.sync_rag_index(added_internships, expired_ids)
+            return active_count
             
         except Exception as e:
             logger.error(f"Error saving internships: {e}")
             return 0
 
+    def sync_rag_index(self, added: List[Dict], removed_ids: List[str]):
+        """Fold saved and expired listings into the RAG index if it is already loaded in this process"""
+        # Importing the RAG module builds its index, so only update one that is already live
+        rag_module = sys.modules.get('utils.rag_system')
+        internship_rag = getattr(rag_module, 'internship_rag', None) if rag_module else None
+        if not internship_rag or (not added and not removed_ids):
+            return
+        
+        try:
+            internship_rag.apply_listing_updates(added=added, removed_ids=removed_ids)
+        except Exception as e:
+            logger.warning(f"Failed to update RAG index incrementally: {e}")
+
     def generate_unique_id(self, internship: Dict) -> str:
-        """Generate a unique ID for an internship"""
+        """Generate a deterministic ID for an internship from its content hash"""
         title = internship.get('title', '').upper()
         company = internship.get('company', '').upper()
         source = internship.get('source', 'SCRAPED').upper()
         
-        # Create a base ID from title and company
-        base_id = f"{source}_{title[:3]}_{company[:3]}_{random.randint(100, 999)}"
+        # Readable prefix from title and company; the content hash also covers the location, so the same role
+        # posted in two cities gets two IDs while the same posting always gets the same one
+        base_id = f"{source}_{title[:3]}_{company[:3]}_{content_hash(internship)[:10]}"
         return base_id.replace(' ', '_').replace('.', '').replace(',', '')
 
-    async def scrape_indeed(self, keyword="internship", location="India", max_pages=2):
+    async def scrape_indeed(self, keyword="internship", location="India", max_pages=2, collected=None):
         """Scrape internships from Indeed with improved robustness"""
-        internships = []
-        user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        pages = [
+            (page_num + 1, f"https://in.indeed.com/jobs?q={keyword}&l={location}&start={page_num * 10}")
+            for page_num in range(max_pages)
         ]
+        return await self._scrape_result_pages(
+            'Indeed', pages, '[data-jk]', CARD_FIELDS['indeed'], self._build_indeed_listing, collected
+        )
 
-        async with async_playwright() as p:
-            browser = None
-            try:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
-                )
-                page = await browser.new_page()
-
-                for page_num in range(max_pages):
-                    try:
-                        start = page_num * 10
-                        url = f"https://in.indeed.com/jobs?q={keyword}&l={location}&start={start}"
-
-                        logger.info(f"Scraping Indeed page {page_num + 1}: {url}")
-
-                        # Randomly select a user agent
-                        await page.set_extra_http_headers({
-                            'User-Agent': random.choice(user_agents)
-                        })
-
-                        # Try to load the page with retries
-                        await self._load_page_with_retry(page, url)
-
-                        # Wait for job cards to be present
-                        await page.wait_for_selector('[data-jk]', timeout=self.timeout)
-
-                        # Extract job listings
-                        job_cards = await page.query_selector_all('[data-jk]')
-
-                        if not job_cards:
-                            logger.warning(f"No job cards found on page {page_num + 1}")
-                            continue
-
-                        for card in job_cards:
-                            try:
-                                internship = await self._extract_indeed_job_data(card)
-                                if internship and self._is_internship_relevant(internship):
-                                    internships.append(internship)
-                            except Exception as e:
-                                logger.error(f"Error extracting job data: {str(e)}")
-                                continue
-
-                        logger.info(f"Scraped {len(job_cards)} job cards from page {page_num + 1}")
-
-                    except Exception as e:
-                        logger.error(f"Error scraping page {page_num + 1}: {str(e)}")
-                        continue
-
-            except Exception as e:
-                logger.error(f"Error scraping Indeed: {str(e)}")
-            finally:
-                if browser:
-                    await browser.close()
-
-        return internships
-
-    async def scrape_linkedin(self, keyword="internship", location="India", max_pages=2):
+    async def scrape_linkedin(self, keyword="internship", location="India", max_pages=2, collected=None):
         """Scrape internships from LinkedIn with improved robustness"""
-        internships = []
-        user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        pages = [
+            (page_num + 1,
+             f"https://www.linkedin.com/jobs/search?keywords={keyword}&location={location}&start={page_num * 25}&f_E=1")
+            for page_num in range(max_pages)
         ]
+        return await self._scrape_result_pages(
+            'LinkedIn', pages, '.job-search-card', CARD_FIELDS['linkedin'], self._build_linkedin_listing, collected
+        )
 
-        async with async_playwright() as p:
-            browser = None
-            try:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
-                )
-                page = await browser.new_page()
-
-                for page_num in range(max_pages):
-                    try:
-                        start = page_num * 25
-                        url = f"https://www.linkedin.com/jobs/search?keywords={keyword}&location={location}&start={start}&f_E=1"
-
-                        logger.info(f"Scraping LinkedIn page {page_num + 1}: {url}")
-
-                        # Randomly select a user agent
-                        await page.set_extra_http_headers({
-                            'User-Agent': random.choice(user_agents)
-                        })
-
-                        # Try to load the page with retries
-                        await self._load_page_with_retry(page, url)
-
-                        # Wait for job cards to be present
-                        await page.wait_for_selector('.job-search-card', timeout=self.timeout)
-
-                        # Extract job listings
-                        job_cards = await page.query_selector_all('.job-search-card')
-
-                        if not job_cards:
-                            logger.warning(f"No job cards found on page {page_num + 1}")
-                            continue
-
-                        for card in job_cards:
-                            try:
-                                internship = await self._extract_linkedin_job_data(card)
-                                if internship and self._is_internship_relevant(internship):
-                                    internships.append(internship)
-                            except Exception as e:
-                                logger.error(f"Error extracting LinkedIn job data: {str(e)}")
-                                continue
-
-                        logger.info(f"Scraped {len(job_cards)} job cards from page {page_num + 1}")
-
-                    except Exception as e:
-                        logger.error(f"Error scraping LinkedIn page {page_num + 1}: {str(e)}")
-                        continue
-
-            except Exception as e:
-                logger.error(f"Error scraping LinkedIn: {str(e)}")
-            finally:
-                if browser:
-                    await browser.close()
-
-        return internships
-
-    async def scrape_naukri(self, keyword="internship", location="India", max_pages=2):
+    async def scrape_naukri(self, keyword="internship", location="India", max_pages=2, collected=None):
         """Scrape internships from Naukri.com with improved robustness"""
-        internships = []
-        user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        # URL encode the parameters
+        encoded_keyword = keyword.replace(' ', '%20')
+        encoded_location = location.replace(' ', '%20').replace(',', '%2C')
+        pages = [
+            (page_num, f"https://www.naukri.com/{encoded_keyword}-jobs-in-{encoded_location}-{page_num}")
+            for page_num in range(1, max_pages + 1)
         ]
+        return await self._scrape_result_pages(
+            'Naukri', pages, '.jobTuple', CARD_FIELDS['naukri'], self._build_naukri_listing, collected,
+            cards_per_page=10  # Limit to first 10 per page
+        )
 
-        async with async_playwright() as p:
-            browser = None
-            try:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
-                )
-                page = await browser.new_page()
-
-                for page_num in range(1, max_pages + 1):
-                    try:
-                        # URL encode the parameters
-                        encoded_keyword = keyword.replace(' ', '%20')
-                        encoded_location = location.replace(' ', '%20').replace(',', '%2C')
-                        url = f"https://www.naukri.com/{encoded_keyword}-jobs-in-{encoded_location}-{page_num}"
-
-                        logger.info(f"Scraping Naukri page {page_num}: {url}")
-
-                        # Randomly select a user agent
-                        await page.set_extra_http_headers({
-                            'User-Agent': random.choice(user_agents)
-                        })
-
-                        # Try to load the page with retries
-                        await self._load_page_with_retry(page, url)
-
-                        # Wait for job cards to be present
-                        await page.wait_for_selector('.jobTuple', timeout=self.timeout)
-
-                        # Extract job listings
-                        job_cards = await page.query_selector_all('.jobTuple')
-
-                        if not job_cards:
-                            logger.warning(f"No job cards found on page {page_num}")
-                            continue
-
-                        for card in job_cards[:10]:  # Limit to first 10 per page
-                            try:
-                                internship = await self._extract_naukri_job_data(card)
-                                if internship and self._is_internship_relevant(internship):
-                                    internships.append(internship)
-                            except Exception as e:
-                                logger.error(f"Error extracting Naukri job data: {str(e)}")
-                                continue
-
-                        logger.info(f"Scraped {len(job_cards)} job cards from page {page_num}")
-
-                    except Exception as e:
-                        logger.error(f"Error scraping Naukri page {page_num}: {str(e)}")
-                        continue
-
-            except Exception as e:
-                logger.error(f"Error scraping Naukri: {str(e)}")
-            finally:
-                if browser:
-                    await browser.close()
-
-        return internships
-
-    async def scrape_internshala(self, keyword="internship", location="India", max_pages=2):
+    async def scrape_internshala(self, keyword="internship", location="India", max_pages=2, collected=None):
         """Scrape internships from Internshala with improved robustness"""
-        internships = []
-        user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        ]
-
-        async with async_playwright() as p:
-            browser = None
+        # Internshala URL structure; keyword searches have a single results page
+        if keyword.lower() != "internship":
+            pages = [(1, f"https://internshala.com/internships/{keyword.replace(' ', '-')}-internships/")]
+        else:
+            pages = [
+                (page_num, f"https://internshala.com/internships/page-{page_num}/")
+                for page_num in range(1, max_pages + 1)
+            ]
+        return await self._scrape_result_pages(
+            'Internshala', pages, '.internship_meta', CARD_FIELDS['internshala'], self._build_internshala_listing, collected,
+            cards_per_page=15, check_relevance=False
+        )
+
+    async def scrape_letsintern(self, keyword="internship", location="India", max_pages=2, collected=None):
+        """Scrape internships from LetsIntern with improved robustness"""
+        # LetsIntern URL structure
+        base_url = "https://www.letsintern.com/internships"
+        if keyword.lower() != "internship":
+            search = f"search={keyword.replace(' ', '+')}&"
+        else:
+            search = ""
+        pages = [(page_num, f"{base_url}?{search}page={page_num}") for page_num in range(1, max_pages + 1)]
+        return await self._scrape_result_pages(
+            'LetsIntern', pages, '.card-content', CARD_FIELDS['letsintern'], self._build_letsintern_listing, collected,
+            cards_per_page=15, check_relevance=False
+        )
+
+    async def _scrape_result_pages(self, source_name: str, pages: List, card_selector: str, fields: Dict, build,
+                                   collected: Optional[List[Dict]] = None, cards_per_page: Optional[int] = None,
+                                   check_relevance: bool = True) -> List[Dict]:
+        """Fetch a source's result pages in parallel on pooled browser pages and extract every card"""
+        # Append into the caller's list when given, so a timed-out scrape still yields what it found
+        internships = [] if collected is None else collected
+        loop = asyncio.get_running_loop()
+
+        async def scrape_page(page_num: int, url: str):
             try:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
-                )
-                page = await browser.new_page()
-
-                for page_num in range(1, max_pages + 1):
-                    try:
-                        # Internshala URL structure
-                        if keyword.lower() != "internship":
-                            url = f"https://internshala.com/internships/{keyword.replace(' ', '-')}-internships/"
-                        else:
-                            url = f"https://internshala.com/internships/page-{page_num}/"
+                async with self.browser_pool.page() as page:
+                    logger.info(f"Scraping {source_name} page {page_num}: {url}")
 
-                        logger.info(f"Scraping Internshala page {page_num}: {url}")
+                    # Try to load the page with retries
+                    await self._load_page_with_retry(page, url)
 
-                        # Set random user agent
-                        await page.set_extra_http_headers({
-                            'User-Agent': random.choice(user_agents)
-                        })
-
-                        # Load page with retries
-                        await self._load_page_with_retry(page, url)
-
-                        # Wait for internship cards
-                        await page.wait_for_selector('.internship_meta', timeout=self.timeout)
-
-                        # Extract internship listings
-                        internship_cards = await page.query_selector_all('.internship_meta')
-
-                        if not internship_cards:
-                            logger.warning(f"No internship cards found on page {page_num}")
-                            continue
-
-                        for card in internship_cards[:15]:  # Limit per page
-                            try:
-                                internship = await self._extract_internshala_data(card)
-                                if internship:
-                                    internships.append(internship)
-                            except Exception as e:
-                                logger.error(f"Error extracting Internshala data: {str(e)}")
-                                continue
-
-                        logger.info(f"Scraped {len(internship_cards)} internship cards from page {page_num}")
+                    # Wait for job cards to be present
+                    await page.wait_for_selector(card_selector, timeout=self.timeout)
 
+                    # Read every card's fields in one round-trip to the browser
+                    try:
+                        raw_cards = await page.eval_on_selector_all(
+                            card_selector, EXTRACT_CARDS_JS, {'fields': fields, 'limit': cards_per_page}
+                        )
                     except Exception as e:
-                        logger.error(f"Error scraping Internshala page {page_num}: {str(e)}")
-                        continue
-
-            except Exception as e:
-                logger.error(f"Error scraping Internshala: {str(e)}")
-            finally:
-                if browser:
-                    await browser.close()
-
-        return internships
-
-    async def scrape_letsintern(self, keyword="internship", location="India", max_pages=2):
-        """Scrape internships from LetsIntern with improved robustness"""
-        internships = []
-        user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        ]
-
-        async with async_playwright() as p:
-            browser = None
-            try:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
+                        logger.warning(f"Bulk extraction failed on {source_name} page {page_num}, reading cards one by one: {e}")
+                        job_cards = await page.query_selector_all(card_selector)
+                        raw_cards = [await self._read_card_fields(card, fields) for card in job_cards[:cards_per_page]]
+
+                if not raw_cards:
+                    logger.warning(f"No job cards found on {source_name} page {page_num}")
+                    return
+
+                # Cleaning (and Gemini calls, when enabled) run off the event loop, all cards at once
+                listings = await asyncio.gather(
+                    *(loop.run_in_executor(self.extraction_executor, build, raw) for raw in raw_cards),
+                    return_exceptions=True
                 )
-                page = await browser.new_page()
-
-                for page_num in range(1, max_pages + 1):
-                    try:
-                        # LetsIntern URL structure
-                        base_url = "https://www.letsintern.com/internships"
-                        if keyword.lower() != "internship":
-                            url = f"{base_url}?search={keyword.replace(' ', '+')}&page={page_num}"
-                        else:
-                            url = f"{base_url}?page={page_num}"
-
-                        logger.info(f"Scraping LetsIntern page {page_num}: {url}")
-
-                        # Set random user agent
-                        await page.set_extra_http_headers({
-                            'User-Agent': random.choice(user_agents)
-                        })
-
-                        # Load page with retries
-                        await self._load_page_with_retry(page, url)
-
-                        # Wait for internship cards
-                        await page.wait_for_selector('.card-content', timeout=self.timeout)
-
-                        # Extract internship listings
-                        internship_cards = await page.query_selector_all('.card-content')
-
-                        if not internship_cards:
-                            logger.warning(f"No internship cards found on page {page_num}")
-                            continue
+                for internship in listings:
+                    if isinstance(internship, Exception):
+                        logger.error(f"Error extracting {source_name} job data: {str(internship)}")
+                    elif internship and (not check_relevance or self._is_internship_relevant(internship)):
+                        internships.append(internship)
 
-                        for card in internship_cards[:15]:  # Limit per page
-                            try:
-                                internship = await self._extract_letsintern_data(card)
-                                if internship:
-                                    internships.append(internship)
-                            except Exception as e:
-                                logger.error(f"Error extracting LetsIntern data: {str(e)}")
-                                continue
-
-                        logger.info(f"Scraped {len(internship_cards)} internship cards from page {page_num}")
-
-                    except Exception as e:
-                        logger.error(f"Error scraping LetsIntern page {page_num}: {str(e)}")
-                        continue
+                logger.info(f"Scraped {len(raw_cards)} job cards from {source_name} page {page_num}")
 
             except Exception as e:
-                logger.error(f"Error scraping LetsIntern: {str(e)}")
-            finally:
-                if browser:
-                    await browser.close()
+                logger.error(f"Error scraping {source_name} page {page_num}: {str(e)}")
 
+        await asyncio.gather(*(scrape_page(page_num, url) for page_num, url in pages))
         return internships
 
     def _is_internship_relevant(self, internship: Dict) -> bool:
@@ -526,43 +392,36 @@ class InternshipScraper:
                 logger.warning(f"Error loading page (attempt {attempt + 1}): {e}")
                 await page.wait_for_timeout(self.retry_delay * (attempt + 1))
 
-    async def _get_inner_text(self, element, selector):
-        """Helper method to get inner text of an element with retries"""
-        for attempt in range(self.max_retries):
-            try:
-                elem = await element.query_selector(selector)
-                if elem:
-                    text = await elem.inner_text()
-                    return text.strip() if text else "N/A"
-                return "N/A"
-            except Exception as e:
-                if attempt == self.max_retries - 1:
-                    logger.error(f"Failed to get inner text after {self.max_retries} attempts: {e}")
-                    return "N/A"
-                await asyncio.sleep(0.5)
-
-    async def _get_attribute(self, element, selector, attribute):
-        """Helper method to get attribute of an element with retries"""
-        for attempt in range(self.max_retries):
-            try:
-                elem = await element.query_selector(selector)
-                if elem:
-                    return await elem.get_attribute(attribute)
-                return ""
-            except Exception as e:
-                if attempt == self.max_retries - 1:
-                    logger.error(f"Failed to get attribute after {self.max_retries} attempts: {e}")
-                    return ""
-                await asyncio.sleep(0.5)
-
-    async def _extract_indeed_job_data(self, card):
-        """Extract job data from Indeed job card with improved cleaning using Gemini AI"""
+    async def _read_card_fields(self, card, fields: Dict) -> Dict:
+        """Per-card fallback for EXTRACT_CARDS_JS, reading the same field specs through element handles"""
+        row = {}
+        for name, spec in fields.items():
+            if spec.get('all'):
+                elements = await card.query_selector_all(', '.join(spec['selectors']))
+                row[name] = [(await element.inner_text()).strip() for element in elements]
+                continue
+            row[name] = spec.get('default')
+            for selector in spec['selectors']:
+                element = await card.query_selector(selector)
+                if not element:
+                    continue
+                if spec.get('attribute'):
+                    value = await element.get_attribute(spec['attribute'])
+                else:
+                    value = (await element.inner_text() or '').strip()
+                if value:
+                    row[name] = value
+                    break
+        return row
+
+    def _build_indeed_listing(self, raw: Dict):
+        """Build a listing from the raw fields of an Indeed job card with improved cleaning using Gemini AI"""
         try:
-            title = await self._get_inner_text(card, 'h2 a span')
-            company = await self._get_inner_text(card, '[data-testid="company-name"]')
-            location_text = await self._get_inner_text(card, '[data-testid="job-location"]')
-            summary = await self._get_inner_text(card, '.slider_container .slider_item')
-            link = await self._get_attribute(card, 'h2 a', 'href')
+            title = raw['title']
+            company = raw['company']
+            location_text = raw['location']
+            summary = raw['summary']
+            link = raw['link']
 
             if not title or self._clean_text(title) == "N/A":
                 return None
@@ -572,9 +431,7 @@ class InternshipScraper:
                 link = f"https://in.indeed.com{link}"
             link = self._validate_url(link)
 
-            # Extract salary if available
-            salary_elem = await card.query_selector('[data-testid="salary-snippet"]')
-            salary = await salary_elem.inner_text() if salary_elem else "Not specified"
+            salary = raw['salary']
 
             # Create raw data for Gemini processing
             raw_data = {
@@ -617,8 +474,7 @@ class InternshipScraper:
                 skills = self._extract_skills_from_text(summary_clean)
                 internship_type = 'Not specified'
 
-            return {
-                'id': self.generate_unique_id({'title': title_clean, 'company': company_clean, 'source': 'Indeed'}),
+            listing = {
                 'title': title_clean,
                 'company': company_clean,
                 'location': location_clean,
@@ -638,17 +494,18 @@ class InternshipScraper:
                 'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'application_deadline': (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
             }
+            return {'id': self.generate_unique_id(listing), **listing}
         except Exception as e:
             logger.error(f"Error extracting Indeed job data: {str(e)}")
             return None
 
-    async def _extract_linkedin_job_data(self, card):
-        """Extract job data from LinkedIn job card with improved cleaning using Gemini AI"""
+    def _build_linkedin_listing(self, raw: Dict):
+        """Build a listing from the raw fields of a LinkedIn job card with improved cleaning using Gemini AI"""
         try:
-            title = await self._get_inner_text(card, '.base-search-card__title')
-            company = await self._get_inner_text(card, '.base-search-card__subtitle')
-            location_text = await self._get_inner_text(card, '.job-search-card__location')
-            link = await self._get_attribute(card, '.base-card__full-link', 'href')
+            title = raw['title']
+            company = raw['company']
+            location_text = raw['location']
+            link = raw['link']
 
             if not title or self._clean_text(title) == "N/A":
                 return None
@@ -688,8 +545,7 @@ class InternshipScraper:
                 skills = self._extract_skills_from_text(title_clean)
                 internship_type = 'Not specified'
 
-            return {
-                'id': self.generate_unique_id({'title': title_clean, 'company': company_clean, 'source': 'LinkedIn'}),
+            listing = {
                 'title': title_clean,
                 'company': company_clean,
                 'location': location_clean,
@@ -709,18 +565,19 @@ class InternshipScraper:
                 'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'application_deadline': (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
             }
+            return {'id': self.generate_unique_id(listing), **listing}
         except Exception as e:
             logger.error(f"Error extracting LinkedIn job data: {str(e)}")
             return None
 
-    async def _extract_naukri_job_data(self, card):
-        """Extract job data from Naukri job card with improved cleaning"""
+    def _build_naukri_listing(self, raw: Dict):
+        """Build a listing from the raw fields of a Naukri job card with improved cleaning"""
         try:
-            title = await self._get_inner_text(card, '.title')
-            company = await self._get_inner_text(card, '.comp-name')
-            location_text = await self._get_inner_text(card, '.locWdth')
-            summary = await self._get_inner_text(card, '.job-desc')
-            link = await self._get_attribute(card, '.title', 'href')
+            title = raw['title']
+            company = raw['company']
+            location_text = raw['location']
+            summary = raw['summary']
+            link = raw['link']
 
             # Clean all text fields
             title_clean = self._clean_text(title)
@@ -736,13 +593,10 @@ class InternshipScraper:
                 link = f"https://www.naukri.com{link}"
             link = self._validate_url(link)
 
-            # Extract experience if available
-            exp_elem = await card.query_selector('.expwdth')
-            experience = await exp_elem.inner_text() if exp_elem else "Fresher"
+            experience = raw['experience']
             experience_clean = self._clean_text(experience)
 
-            return {
-                'id': self.generate_unique_id({'title': title_clean, 'company': company_clean, 'source': 'Naukri'}),
+            listing = {
                 'title': title_clean,
                 'company': company_clean,
                 'location': location_clean,
@@ -761,34 +615,20 @@ class InternshipScraper:
                 'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'application_deadline': (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
             }
+            return {'id': self.generate_unique_id(listing), **listing}
         except Exception as e:
             logger.error(f"Error extracting Naukri job data: {str(e)}")
             return None
 
-    async def _extract_internshala_data(self, card):
-        """Extract internship data from Internshala card with improved cleaning"""
+    def _build_internshala_listing(self, raw: Dict):
+        """Build a listing from the raw fields of an Internshala card with improved cleaning"""
         try:
-            # Use more specific selectors for Internshala
-            title = await self._get_inner_text(card, '.heading .job-internship-name')
-            if not title:
-                title = await self._get_inner_text(card, '.profile h3 a')
-            if not title:
-                title = await self._get_inner_text(card, '.heading a')
-                
-            company = await self._get_inner_text(card, '.company-name')
-            if not company:
-                company = await self._get_inner_text(card, '.company_name')
-                
-            location_text = await self._get_inner_text(card, '.location_link')
-            duration = await self._get_inner_text(card, '.internship_duration')
-            stipend = await self._get_inner_text(card, '.stipend')
-            
-            # Get link with multiple selectors
-            link = await self._get_attribute(card, '.heading .job-internship-name', 'href')
-            if not link:
-                link = await self._get_attribute(card, '.profile h3 a', 'href')
-            if not link:
-                link = await self._get_attribute(card, '.heading a', 'href')
+            title = raw['title']
+            company = raw['company']
+            location_text = raw['location']
+            duration = raw['duration']
+            stipend = raw['stipend']
+            link = raw['link']
 
             # Clean all text fields
             title_clean = self._clean_text(title)
@@ -807,16 +647,13 @@ class InternshipScraper:
 
             # Extract skills/tags
             skills = []
-            skill_elements = await card.query_selector_all('.round_tabs a, .skill-tag, .tags a')
-            for skill_elem in skill_elements[:5]:  # Limit to 5 skills
-                skill_text = await skill_elem.inner_text()
+            for skill_text in raw['skills'][:5]:  # Limit to 5 skills
                 if skill_text and skill_text.strip():
                     skill_clean = self._clean_text(skill_text)
                     if skill_clean != "N/A":
-                        skills.append(skill_clean)
+                        skills.append(skill_ontology.canonical(skill_clean))
 
-            return {
-                'id': self.generate_unique_id({'title': title_clean, 'company': company_clean, 'source': 'Internshala'}),
+            listing = {
                 'title': title_clean,
                 'company': company_clean,
                 'location': location_clean,
@@ -835,32 +672,20 @@ class InternshipScraper:
                 'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'application_deadline': (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
             }
+            return {'id': self.generate_unique_id(listing), **listing}
         except Exception as e:
             logger.error(f"Error extracting Internshala data: {str(e)}")
             return None
 
-    async def _extract_letsintern_data(self, card):
-        """Extract internship data from LetsIntern card with improved cleaning"""
+    def _build_letsintern_listing(self, raw: Dict):
+        """Build a listing from the raw fields of a LetsIntern card with improved cleaning"""
         try:
-            # Use multiple selectors for LetsIntern
-            title = await self._get_inner_text(card, '.internship-title')
-            if not title:
-                title = await self._get_inner_text(card, '.job-title')
-            if not title:
-                title = await self._get_inner_text(card, 'h3')
-                
-            company = await self._get_inner_text(card, '.company-name')
-            if not company:
-                company = await self._get_inner_text(card, '.company')
-                
-            location_text = await self._get_inner_text(card, '.location')
-            duration = await self._get_inner_text(card, '.duration')
-            stipend = await self._get_inner_text(card, '.stipend')
-            
-            # Get link with multiple selectors
-            link = await self._get_attribute(card, 'a', 'href')
-            if not link:
-                link = await self._get_attribute(card, '.internship-title', 'href')
+            title = raw['title']
+            company = raw['company']
+            location_text = raw['location']
+            duration = raw['duration']
+            stipend = raw['stipend']
+            link = raw['link']
 
             # Clean all text fields
             title_clean = self._clean_text(title)
@@ -878,16 +703,13 @@ class InternshipScraper:
             link = self._validate_url(link)
 
             # Extract description/requirements
-            description = await self._get_inner_text(card, '.description')
-            if not description:
-                description = await self._get_inner_text(card, '.job-description')
+            description = raw['description']
             description_clean = self._clean_text(description)
             
             # Extract skills from description
             skills = self._extract_skills_from_text(description_clean)
 
-            return {
-                'id': self.generate_unique_id({'title': title_clean, 'company': company_clean, 'source': 'LetsIntern'}),
+            listing = {
                 'title': title_clean,
                 'company': company_clean,
                 'location': location_clean,
@@ -906,6 +728,7 @@ class InternshipScraper:
                 'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'application_deadline': (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
             }
+            return {'id': self.generate_unique_id(listing), **listing}
         except Exception as e:
             logger.error(f"Error extracting LetsIntern data: {str(e)}")
             return None
@@ -945,14 +768,13 @@ class InternshipScraper:
         if not text or self._clean_text(text) == "N/A":
             return []
         
-        text_clean = self._clean_text(text).lower()
-        
-        # Enhanced skills list with more comprehensive coverage
-        
-        
+        text_clean = self._clean_text(text)
         
+        # Single pass over the text against the shared skill ontology
+        skills = skill_ontology.extract(text_clean)
         
         # Return top 6 skills to avoid overwhelming
+        return skills[:6]
 
     def _clean_text(self, text):
         """Helper method to clean text and remove invalid characters using Gemini AI"""
@@ -1125,8 +947,117 @@ class InternshipScraper:
         
         return None
 
+class ScrapingOrchestrator:
+    """Scrapes sources concurrently on one long-lived event loop, with per-source limits and a shared deadline"""
+
+    SOURCE_SCRAPERS = {
+        'indeed': 'scrape_indeed',
+        'linkedin': 'scrape_linkedin',
+        'naukri': 'scrape_naukri',
+        'internshala': 'scrape_internshala',
+        'letsintern': 'scrape_letsintern',
+    }
+
+    def __init__(self, scraper: InternshipScraper, timeout: float = 300, source_concurrency: int = 1,
+                 max_concurrent_sources: int = 5):
+        self.scraper = scraper
+        self.timeout = timeout
+        self.source_concurrency = source_concurrency
+        self.max_concurrent_sources = max_concurrent_sources
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._source_semaphores = {}
+        self._sources_semaphore = None
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the scraping event loop thread on first use; semaphores only work within one loop"""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='scraping-loop', daemon=True).start()
+                # The scraper's pooled browser lives on this loop for the life of the process
+                self.scraper.browser_pool.bind(loop)
+                self._loop = loop
+            return self._loop
+
+    def _semaphores(self, source: str):
+        if self._sources_semaphore is None:
+            self._sources_semaphore = asyncio.Semaphore(self.max_concurrent_sources)
+        if source not in self._source_semaphores:
+            self._source_semaphores[source] = asyncio.Semaphore(self.source_concurrency)
+        return self._source_semaphores[source], self._sources_semaphore
+
+    async def _scrape_source(self, source: str, keyword: str, location: str, max_pages: int, collected: List[Dict]):
+        source_semaphore, sources_semaphore = self._semaphores(source)
+        # Runs of the same source from concurrent requests queue up instead of hitting the site together
+        async with source_semaphore, sources_semaphore:
+            scrape = getattr(self.scraper, self.SOURCE_SCRAPERS[source])
+            await scrape(keyword, location, max_pages, collected=collected)
+
+    async def scrape(self, sources: List[str], keyword: str, location: str, max_pages: int,
+                     timeout: Optional[float] = None) -> Dict:
+        """Run all sources under asyncio.gather; sources still running at the deadline keep what they found"""
+        timeout = self.timeout if timeout is None else timeout
+        sources = [source for source in dict.fromkeys(sources) if source in self.SOURCE_SCRAPERS]
+        collected = {source: [] for source in sources}
+        started = {source: datetime.now() for source in sources}
+        elapsed = {}
+
+        async def run(source):
+            try:
+                await self._scrape_source(source, keyword, location, max_pages, collected[source])
+            finally:
+                elapsed[source] = (datetime.now() - started[source]).total_seconds()
+
+        tasks = {source: asyncio.ensure_future(run(source)) for source in sources}
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*tasks.values(), return_exceptions=True), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            # wait_for cancelled the unfinished sources; their browsers were closed in their finally blocks
+            logger.warning(f"Scraping deadline of {timeout}s reached, keeping partial results")
+
+        all_internships = []
+        source_results = {}
+        for source, task in tasks.items():
+            if task.cancelled():
+                source_status, error = 'timeout', f'Timed out after {timeout}s'
+            elif task.exception():
+                source_status, error = 'failed', str(task.exception())
+            else:
+                source_status, error = 'completed', None
+
+            all_internships.extend(collected[source])
+            source_results[source] = {
+                'status': source_status,
+                'count': len(collected[source]),
+                'elapsed_seconds': round(elapsed.get(source, timeout), 2),
+                'error': error
+            }
+            if error:
+                logger.error(f"{source} scraping {source_status}: {error} ({len(collected[source])} jobs kept)")
+            else:
+                logger.info(f"{source} scraped: {len(collected[source])} jobs")
+
+        return {'internships': all_internships, 'sources': source_results}
+
+    def run(self, sources: List[str], keyword: str, location: str, max_pages: int,
+            timeout: Optional[float] = None) -> Dict:
+        """Blocking entry point for views, commands and worker threads"""
+        future = asyncio.run_coroutine_threadsafe(
+            self.scrape(sources, keyword, location, max_pages, timeout), self._get_loop()
+        )
+        return future.result()
+
 # Initialize scraper
 scraper = InternshipScraper()
+scraping_orchestrator = ScrapingOrchestrator(
+    scraper,
+    timeout=getattr(settings, 'SCRAPING_TIMEOUT', 300),
+    source_concurrency=getattr(settings, 'SCRAPING_SOURCE_CONCURRENCY', 1),
+    max_concurrent_sources=getattr(settings, 'SCRAPING_MAX_CONCURRENT_SOURCES', 5)
+)
 
 # Background task manager
 class BackgroundTaskManager:
@@ -1136,58 +1067,15 @@ class BackgroundTaskManager:
 
     def run_scraping_task(self, task_id: str, sources: List[str], keyword: str, location: str, max_pages: int):
         """Run scraping task in background"""
-        future = self.executor.submit(self._async_scraping_wrapper, sources, keyword, location, max_pages)
+        future = self.executor.submit(self._scrape_all_sources, sources, keyword, location, max_pages)
         self.running_tasks[task_id] = {'future': future, 'status': 'running'}
         return task_id
 
-    def _async_scraping_wrapper(self, sources: List[str], keyword: str, location: str, max_pages: int):
-        """Wrapper to run async scraping in thread"""
-        return asyncio.run(self._scrape_all_sources(sources, keyword, location, max_pages))
-
-    async def _scrape_all_sources(self, sources: List[str], keyword: str, location: str, max_pages: int):
-        """Scrape from all specified sources"""
-        all_internships = []
+    def _scrape_all_sources(self, sources: List[str], keyword: str, location: str, max_pages: int):
+        """Scrape from all specified sources concurrently on the orchestrator's event loop"""
+        scrape_result = scraping_orchestrator.run(sources, keyword, location, max_pages)
+        all_internships = scrape_result['internships']
         
-        if 'indeed' in sources:
-            try:
-                indeed_results = await scraper.scrape_indeed(keyword, location, max_pages)
-                all_internships.extend(indeed_results)
-                logger.info(f"Indeed scraped: {len(indeed_results)} jobs")
-            except Exception as e:
-                logger.error(f"Indeed scraping failed: {e}")
-
-        if 'linkedin' in sources:
-            try:
-                linkedin_results = await scraper.scrape_linkedin(keyword, location, max_pages)
-                all_internships.extend(linkedin_results)
-                logger.info(f"LinkedIn scraped: {len(linkedin_results)} jobs")
-            except Exception as e:
-                logger.error(f"LinkedIn scraping failed: {e}")
-
-        if 'naukri' in sources:
-            try:
-                naukri_results = await scraper.scrape_naukri(keyword, location, max_pages)
-                all_internships.extend(naukri_results)
-                logger.info(f"Naukri scraped: {len(naukri_results)} jobs")
-            except Exception as e:
-                logger.error(f"Naukri scraping failed: {e}")
-
-        if 'internshala' in sources:
-            try:
-                internshala_results = await scraper.scrape_internshala(keyword, location, max_pages)
-                all_internships.extend(internshala_results)
-                logger.info(f"Internshala scraped: {len(internshala_results)} jobs")
-            except Exception as e:
-                logger.error(f"Internshala scraping failed: {e}")
-
-        if 'letsintern' in sources:
-            try:
-                letsintern_results = await scraper.scrape_letsintern(keyword, location, max_pages)
-                all_internships.extend(letsintern_results)
-                logger.info(f"LetsIntern scraped: {len(letsintern_results)} jobs")
-            except Exception as e:
-                logger.error(f"LetsIntern scraping failed: {e}")
-
         # Save scraped internships
         saved_count = scraper.save_internships(all_internships)
         
@@ -1195,7 +1083,8 @@ class BackgroundTaskManager:
             'success': True,
             'internships_scraped': len(all_internships),
             'internships_saved': saved_count,
-            'sources': sources
+            'sources': sources,
+            'source_results': scrape_result['sources']
         }
 
     def get_task_status(self, task_id: str):
@@ -1246,62 +1135,20 @@ def scrape_internships(request):
                 'task_id': task_id
             })
         else:
-            # Run synchronously
-            async def scrape_sync():
-                all_internships = []
-
-                if 'indeed' in sources:
-                    try:
-                        indeed_results = await scraper.scrape_indeed(keyword, location, max_pages)
-                        all_internships.extend(indeed_results)
-                        logger.info(f"Indeed scraped: {len(indeed_results)} jobs")
-                    except Exception as e:
-                        logger.error(f"Indeed scraping failed: {e}")
-
-                if 'linkedin' in sources:
-                    try:
-                        linkedin_results = await scraper.scrape_linkedin(keyword, location, max_pages)
-                        all_internships.extend(linkedin_results)
-                        logger.info(f"LinkedIn scraped: {len(linkedin_results)} jobs")
-                    except Exception as e:
-                        logger.error(f"LinkedIn scraping failed: {e}")
-
-                if 'naukri' in sources:
-                    try:
-                        naukri_results = await scraper.scrape_naukri(keyword, location, max_pages)
-                        all_internships.extend(naukri_results)
-                        logger.info(f"Naukri scraped: {len(naukri_results)} jobs")
-                    except Exception as e:
-                        logger.error(f"Naukri scraping failed: {e}")
-
-                if 'internshala' in sources:
-                    try:
-                        internshala_results = await scraper.scrape_internshala(keyword, location, max_pages)
-                        all_internships.extend(internshala_results)
-                        logger.info(f"Internshala scraped: {len(internshala_results)} jobs")
-                    except Exception as e:
-                        logger.error(f"Internshala scraping failed: {e}")
-
-                if 'letsintern' in sources:
-                    try:
-                        letsintern_results = await scraper.scrape_letsintern(keyword, location, max_pages)
-                        all_internships.extend(letsintern_results)
-                        logger.info(f"LetsIntern scraped: {len(letsintern_results)} jobs")
-                    except Exception as e:
-                        logger.error(f"LetsIntern scraping failed: {e}")
-
-                # Save scraped internships
-                saved_count = scraper.save_internships(all_internships)
-
-                return {
-                    'success': True,
-                    'internships_scraped': len(all_internships),
-                    'internships_saved': saved_count,
-                    'internships': all_internships
-                }
-
-            # Run async function in current thread
-            result = asyncio.run(scrape_sync())
+            # Run synchronously, all sources at once
+            scrape_result = scraping_orchestrator.run(sources, keyword, location, max_pages)
+            all_internships = scrape_result['internships']
+            
+            # Save scraped internships
+            saved_count = scraper.save_internships(all_internships)
+            
+            result = {
+                'success': True,
+                'internships_scraped': len(all_internships),
+                'internships_saved': saved_count,
+                'source_results': scrape_result['sources'],
+                'internships': all_internships
+            }
             return Response(result)
 
     except Exception as e:
@@ -1329,40 +1176,16 @@ def get_scraping_task_status(request, task_id):
 def clean_expired_internships(request):
     """Remove expired internships from the database"""
     try:
-        # Load existing data
-        existing_data = scraper.load_existing_internships()
-        existing_internships = existing_data.get("internships", [])
-        
-        # Filter out expired internships
-        current_date = datetime.now()
-        active_internships = []
-        expired_count = 0
-        
-        for internship in existing_internships:
-            deadline_str = internship.get('application_deadline')
-            if deadline_str:
-                try:
-                    deadline = datetime.strptime(deadline_str, '%Y-%m-%d')
-                    if deadline >= current_date:
-                        active_internships.append(internship)
-                    else:
-                        expired_count += 1
-                except ValueError:
-                    # Keep internships with invalid date formats
-                    active_internships.append(internship)
-            else:
-                # Keep internships without deadlines
-                active_internships.append(internship)
+        # Expired listings become tombstones in the store manifest
+        cleanup = scraper.remove_expired_internships()
+        expired_count = cleanup["expired_count"]
         
-        # Save cleaned data
-        cleaned_data = {"internships": active_internships}
-        with open(scraper.data_file_path, 'w', encoding='utf-8') as f:
-            json.dump(cleaned_data, f, indent=2, ensure_ascii=False)
+        scraper.sync_rag_index([], cleanup["expired_ids"])
         
         return Response({
             'success': True,
             'message': f'Removed {expired_count} expired internships',
-            'active_internships': len(active_internships),
+            'active_internships': cleanup["active_count"],
             'removed_count': expired_count
         })
         
@@ -1378,39 +1201,15 @@ def clean_expired_internships(request):
 def get_scraping_stats(request):
     """Get statistics about scraped internships"""
     try:
-        data = scraper.load_existing_internships()
-        internships = data.get("internships", [])
+        # Aggregations run in the listing store (grouped SQL with the SQLite backend)
+        store = scraper.listing_store
+        total_internships = store.count()
+        sources = store.count_by('source')
+        domains = store.count_by('domain')
+        experience_levels = store.count_by('experience_level')
         
-        # Calculate statistics
-        total_internships = len(internships)
-        sources = {}
-        domains = {}
-        experience_levels = {}
-        recent_scrapes = 0
-        
-        current_date = datetime.now()
-        for internship in internships:
-            # Count by source
-            source = internship.get('source', 'Unknown')
-            sources[source] = sources.get(source, 0) + 1
-            
-            # Count by domain
-            domain = internship.get('domain', 'Unknown')
-            domains[domain] = domains.get(domain, 0) + 1
-            
-            # Count by experience level
-            exp_level = internship.get('experience_level', 'Unknown')
-            experience_levels[exp_level] = experience_levels.get(exp_level, 0) + 1
-            
-            # Count recent scrapes (last 24 hours)
-            scraped_at = internship.get('scraped_at')
-            if scraped_at:
-                try:
-                    scraped_date = datetime.strptime(scraped_at, '%Y-%m-%d %H:%M:%S')
-                    if (current_date - scraped_date).days < 1:
-                        recent_scrapes += 1
-                except ValueError:
-                    pass
+        # Count recent scrapes (last 24 hours)
+        recent_scrapes = store.count_scraped_since(datetime.now() - timedelta(days=1))
         
         return Response({
             'success': True,
@@ -1,3 +1,1337 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import scipy.sparse as sp
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from api import Agent, scrap, views
+from api.Agent import (
+    AgentNode, DAGWorkflow, GitHubAnalyzer, ResumeAnalysisJobStatusView, ResumeAnalysisJobView, ResumeAnalysisStreamView,
+    analysis_nodes
+)
+from utils.analysis_jobs import AnalysisJobQueue, InMemoryJobStore, JobQueueFull, SQLiteJobStore
+from utils.cache import FileCache, LRUCache, SQLiteCache
+from utils import internship_stream
+from utils.internship_stream import iter_internships
+from utils.listing_dedup import NearDuplicateIndex, content_hash
+from utils.listing_repository import SQLiteListingRepository
+from utils.listing_store import ListingQueries, ListingStore
+from utils.rag_index import TfidfIndexSnapshot
+from utils.rag_bm25 import BM25FIndex, listing_fields
+from utils.rag_skills import SkillIncidence
+from utils.rag_retrieval import ExactRetriever, top_k_indices
+from utils.rag_system import InternshipRAG
+from utils.skill_ontology import skill_ontology
+
+
+def make_listing(listing_id, title, company='Acme Technologies', location='Bangalore', **fields):
+    listing = {
+        'id': listing_id,
+        'title': title,
+        'company': company,
+        'location': location,
+        'domain': 'Software Engineering',
+        'source': 'linkedin',
+        'description': f'{title} at {company}',
+        'requirements': ['Python', 'SQL'],
+        'preferred_skills': ['Git'],
+        'application_deadline': '2030-01-01',
+        'scraped_at': '2026-10-01 10:00:00'
+    }
+    listing.update(fields)
+    return listing
+
+
+DOMAINS = ['Software Engineering', 'Data Science', 'Web Development', 'Machine Learning', 'DevOps', 'UI/UX Design']
+SKILLS = ['Python', 'Java', 'SQL', 'React', 'Docker', 'AWS', 'Statistics', 'Figma', 'Git', 'JavaScript']
+
+
+def make_corpus(count, prefix='listing'):
+    """Deterministic listings spread over a few domains, companies and skill sets"""
+    listings = []
+    for number in range(count):
+        domain = DOMAINS[number % len(DOMAINS)]
+        skills = [SKILLS[(number + offset) % len(SKILLS)] for offset in (0, 3, 7)]
+        listings.append(make_listing(
+            f'{prefix}_{number}', f'{domain} Intern {number}',
+            company=f'Company {number % 17}',
+            location=['Bangalore', 'Remote', 'Delhi'][number % 3],
+            domain=domain,
+            description=f'Work on {domain.lower()} projects using {" and ".join(skills)}',
+            requirements=skills,
+            tags=[domain.lower().replace(' ', '_'), 'internship']
+        ))
+    return listings
+
+
+class TempDirMixin:
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+
+
+class RAGTestMixin(TempDirMixin):
+    """Builds InternshipRAG instances over given listings with their snapshots in a temp dir"""
+
+    def make_rag(self, listings, **settings_overrides):
+        settings_overrides.setdefault('RAG_INDEX_DIR', os.path.join(self.tmp_dir, 'rag_index'))
+        settings_overrides.setdefault('RAG_PERSIST_DELAY', 0)
+        with override_settings(**settings_overrides), \
+                mock.patch.object(InternshipRAG, '_load_persisted_internships', return_value=list(listings)), \
+                mock.patch.object(InternshipRAG, '_generate_real_time_internships', return_value=[]):
+            rag = InternshipRAG(warm_start=False)
+        self.addCleanup(rag._cancel_persist)
+        return rag
+
+
+class NearDuplicateIndexTests(TempDirMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.index = NearDuplicateIndex(os.path.join(self.tmp_dir, 'near_duplicates.jsonl'))
+        self.index.bootstrap(lambda: [])
+
+    def add(self, *listings):
+        return self.index.add_unique(list(listings), assign_id=content_hash)
+
+    def test_distinct_roles_at_same_company_are_kept(self):
+        pairs = [
+            ('Android Developer Intern', 'iOS Developer Intern'),
+            ('Marketing Intern', 'Sales Intern'),
+            ('Frontend Developer Intern', 'Backend Developer Intern'),
+            ('Java Developer Intern', 'JavaScript Developer Intern'),
+            ('Data Analyst Intern', 'Data Analytics Intern'),
+        ]
+        for first, second in pairs:
+            with self.subTest(first=first, second=second):
+                fresh, duplicates = self.add(make_listing(None, first), make_listing(None, second))
+                self.assertEqual([listing['title'] for listing in fresh], [first, second])
+                self.assertEqual(duplicates, 0)
+
+    def test_exact_duplicate_is_dropped(self):
+        self.add(make_listing(None, 'Data Science Intern', company='Acme Pvt Ltd'))
+        fresh, duplicates = self.add(make_listing(None, 'Data Science Intern.', company='ACME'))
+        self.assertEqual(fresh, [])
+        self.assertEqual(duplicates, 1)
+
+    def test_near_identical_title_is_dropped(self):
+        self.add(make_listing(None, 'Software Engineering Intern'))
+        fresh, duplicates = self.add(make_listing(None, 'Software Engineering Interns'))
+        self.assertEqual(fresh, [])
+        self.assertEqual(duplicates, 1)
+
+    def test_same_title_elsewhere_or_with_other_numbers_is_kept(self):
+        self.add(make_listing(None, 'Software Engineer Intern 2025'))
+        fresh, _ = self.add(
+            make_listing(None, 'Software Engineer Intern 2025', location='Remote'),
+            make_listing(None, 'Software Engineer Intern 2025', company='Globex'),
+            make_listing(None, 'Software Engineer Intern 2026'),
+        )
+        self.assertEqual(len(fresh), 3)
+
+    def test_removed_listing_can_be_posted_again(self):
+        fresh, _ = self.add(make_listing(None, 'DevOps Intern'))
+        self.index.remove([fresh[0]['id']])
+        fresh, duplicates = self.add(make_listing(None, 'DevOps Intern'))
+        self.assertEqual(len(fresh), 1)
+        self.assertEqual(duplicates, 0)
+
+    def test_log_is_replayed_by_another_instance(self):
+        self.add(make_listing(None, 'Cloud Engineer Intern'))
+        other = NearDuplicateIndex(self.index.path)
+        other.bootstrap(lambda: [])
+        self.assertIsNotNone(other.find_duplicate(make_listing(None, 'Cloud Engineer Intern')))
+
+    def test_outdated_log_is_reindexed_from_listings(self):
+        with open(self.index.path, 'w') as f:
+            f.write(json.dumps({'id': 'old', 'key': 'k', 'num_perm': 64, 'sig': [0] * 64}) + '\n')
+        stored = make_listing('stored_1', 'UI/UX Design Intern')
+        index = NearDuplicateIndex(self.index.path)
+        index.bootstrap(lambda: [stored])
+        self.assertEqual(index.stats()['indexed'], 1)
+        self.assertEqual(index.find_duplicate(make_listing(None, 'UI/UX Design Intern')), 'stored_1')
+
+
+class SaveInternshipsTests(TempDirMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.store = ListingStore(os.path.join(self.tmp_dir, 'listings'), max_segments=100, tombstone_ratio=100)
+        near_duplicates = NearDuplicateIndex(os.path.join(self.tmp_dir, 'near_duplicates.jsonl'))
+        near_duplicates.bootstrap(lambda: [])
+        for patcher in [
+            mock.patch.object(scrap.scraper, 'listing_store', self.store),
+            mock.patch.object(scrap, 'default_near_duplicate_index', lambda: near_duplicates),
+            mock.patch.object(scrap.scraper, 'sync_rag_index'),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def internshala_listing(self, location):
+        return scrap.scraper._build_internshala_listing({
+            'title': 'Software Developer Intern', 'company': 'Acme Technologies', 'location': location,
+            'duration': '3 Months', 'stipend': '₹ 15,000 /month', 'link': '/internship/detail/software-developer',
+            'skills': ['Python', 'Django']
+        })
+
+    def test_same_role_in_two_locations_is_saved_twice(self):
+        bangalore, pune = self.internshala_listing('Bangalore'), self.internshala_listing('Pune')
+        self.assertNotEqual(bangalore['id'], pune['id'])
+        self.assertEqual(bangalore['id'], self.internshala_listing('Bangalore')['id'])
+
+        self.assertEqual(scrap.scraper.save_internships([bangalore, pune]), 2)
+        self.assertEqual(sorted(listing['location'] for listing in self.store.iter_listings()), ['Bangalore', 'Pune'])
+
+        # Rescraping the same postings adds nothing
+        self.assertEqual(scrap.scraper.save_internships([self.internshala_listing('Pune')]), 2)
+
+
+class IndexStateTests(RAGTestMixin, SimpleTestCase):
+    def test_update_publishes_a_new_state_and_leaves_the_old_one_intact(self):
+        rag = self.make_rag(make_corpus(60))
+        before = rag._state
+        self.assertTrue(rag.apply_listing_updates(added=make_corpus(5, prefix='new'), removed_ids=['listing_0']))
+
+        after = rag._state
+        self.assertIsNot(after, before)
+        self.assertNotEqual(after.version, before.version)
+        self.assertEqual(len(before.internships), 60)
+        self.assertEqual(before.vectors.shape[0], 60)
+        self.assertEqual(len(before.active_mask), 60)
+        self.assertTrue(before.active_mask[0])
+        self.assertIn('listing_0', before.row_by_id)
+        self.assertEqual(len(after.internships), after.vectors.shape[0])
+        self.assertEqual(len(after.active_mask), 65)
+        self.assertFalse(after.active_mask[0])
+        self.assertEqual(rag.get_internship_by_id('listing_0'), {})
+        self.assertEqual(rag.get_internship_by_id('new_2')['id'], 'new_2')
+
+    def test_update_builds_new_sub_indexes_instead_of_editing_the_served_ones(self):
+        rag = self.make_rag(
+            make_corpus(60), RAG_SEARCH_SCORER='bm25f', RAG_RETRIEVAL_BACKEND='ivf',
+            RAG_RETRIEVAL_PARAMS={'n_lists': 4, 'exact_below': 10}
+        )
+        before = rag._state
+        rag.apply_listing_updates(added=make_corpus(5, prefix='new'))
+
+        after = rag._state
+        for name in ('retriever', 'attribute_index', 'skill_index', 'bm25_index'):
+            self.assertIsNot(getattr(after, name), getattr(before, name), name)
+        self.assertEqual(before.retriever.indexed_rows, 60)
+        self.assertEqual(sum(len(rows) for rows in before.retriever.lists), 60)
+        self.assertEqual(sum(len(rows) for rows in after.retriever.lists), 65)
+        self.assertEqual(before.attribute_index.indexed_rows, 60)
+        self.assertEqual(before.skill_index.rows, 60)
+        self.assertEqual(before.bm25_index.rows, 60)
+        self.assertEqual(after.skill_index.rows, 65)
+        self.assertEqual(after.bm25_index.rows, 65)
+
+    def test_incremental_updates_are_written_once_after_the_persist_delay(self):
+        rag = self.make_rag(make_corpus(60), RAG_PERSIST_DELAY=60)
+        published = rag.index_snapshot.current_hash()
+        self.assertEqual(published, rag.index_version)
+
+        rag.apply_listing_updates(added=make_corpus(3, prefix='first'))
+        rag.apply_listing_updates(added=make_corpus(3, prefix='second'), removed_ids=['listing_1'])
+        self.assertEqual(rag.index_snapshot.current_hash(), published)
+        self.assertFalse(rag._adopt_published_snapshot())
+        self.assertEqual(len(rag.internships), 66)
+
+        self.assertTrue(rag.flush_index())
+        self.assertFalse(rag.flush_index())
+        self.assertEqual(rag.index_snapshot.current_hash(), rag.index_version)
+        snapshot = rag.index_snapshot.load(rag.index_version)
+        self.assertEqual(len(snapshot.listings), 65)
+        self.assertNotIn('listing_1', snapshot.ids)
+
+
+class IVFSnapshotTests(RAGTestMixin, SimpleTestCase):
+    IVF_SETTINGS = {
+        'RAG_RETRIEVAL_BACKEND': 'ivf',
+        'RAG_RETRIEVAL_PARAMS': {'n_lists': 4, 'n_probe': 2, 'min_candidates': 1, 'exact_below': 10}
+    }
+
+    def test_lists_are_loaded_from_the_snapshot_instead_of_retrained(self):
+        listings = make_corpus(80)
+        built = self.make_rag(listings, **self.IVF_SETTINGS)
+        with mock.patch('utils.rag_retrieval.MiniBatchKMeans') as kmeans:
+            loaded = self.make_rag(listings, **self.IVF_SETTINGS)
+        kmeans.assert_not_called()
+
+        self.assertIsInstance(loaded.retriever.centroids, np.memmap)
+        self.assertEqual(loaded.retriever.indexed_rows, 80)
+        for built_rows, loaded_rows in zip(built.retriever.lists, loaded.retriever.lists):
+            np.testing.assert_array_equal(built_rows, loaded_rows)
+
+    def test_persisted_lists_are_renumbered_to_the_active_rows(self):
+        rag = self.make_rag(make_corpus(80), **self.IVF_SETTINGS)
+        rag.apply_listing_updates(added=make_corpus(4, prefix='new'), removed_ids=['listing_0', 'listing_5'])
+
+        snapshot = rag.index_snapshot.load(rag.index_version)
+        self.assertEqual(snapshot.retrieval['rows'], 82)
+        list_rows = np.sort(np.asarray(snapshot.retrieval['arrays']['list_rows']))
+        np.testing.assert_array_equal(list_rows, np.arange(82))
+
+        with mock.patch('utils.rag_retrieval.MiniBatchKMeans') as kmeans:
+            restarted = self.make_rag(list(snapshot.listings), **self.IVF_SETTINGS)
+        kmeans.assert_not_called()
+        self.assertEqual(restarted.index_version, rag.index_version)
+        self.assertEqual(restarted.get_internship_by_id('new_3')['id'], 'new_3')
+
+    def test_other_build_params_retrain_the_lists(self):
+        listings = make_corpus(80)
+        self.make_rag(listings, **self.IVF_SETTINGS)
+        settings_overrides = dict(self.IVF_SETTINGS, RAG_RETRIEVAL_PARAMS={'n_lists': 6, 'exact_below': 10})
+        rag = self.make_rag(listings, **settings_overrides)
+        self.assertEqual(len(rag.retriever.lists), 6)
+
+
+class SkillOntologyTests(SimpleTestCase):
+    def test_capitalised_ambiguous_names_are_extracted(self):
+        self.assertEqual(
+            skill_ontology.extract('Go, Swift, TypeScript, Node.js, Express, C++, R, C'),
+            ['Go', 'Swift', 'TypeScript', 'Node.js', 'Express.js', 'C++', 'R', 'C']
+        )
+
+    def test_ambiguous_words_in_lowercase_prose_are_ignored(self):
+        self.assertEqual(
+            skill_ontology.extract('Ready to go the extra mile, a swift learner who can rest easy with c++'),
+            ['C++']
+        )
+
+    def test_aliases_extract_as_canonical_names(self):
+        self.assertEqual(
+            skill_ontology.extract('js, sklearn, k8s and react native on postgres'),
+            ['JavaScript', 'Scikit-learn', 'Kubernetes', 'React Native', 'PostgreSQL']
+        )
+        self.assertEqual(skill_ontology.canonical('golang'), 'Go')
+        self.assertEqual(skill_ontology.canonical(' node '), 'Node.js')
+
+    def test_github_repositories_report_languages_and_frameworks(self):
+        analysis = GitHubAnalyzer()._analyze_github_data({}, [
+            {'name': 'shop-api', 'description': 'typescript react express node', 'language': 'TypeScript'},
+            {'name': 'go-crawler', 'description': 'Crawler written in go with redis'},
+        ])
+        self.assertTrue(
+            {'TypeScript', 'React', 'Express.js', 'Node.js', 'Go', 'Redis'} <= set(analysis['technologies']),
+            analysis['technologies']
+        )
+
+
+class BM25FIndexTests(RAGTestMixin, SimpleTestCase):
+    def test_missing_or_null_list_fields_are_empty_text(self):
+        fields = listing_fields({'title': 'QA Intern', 'requirements': None, 'tags': None, 'responsibilities': None})
+        self.assertEqual(fields['title'], 'QA Intern')
+        self.assertEqual(fields['skills'], '')
+        self.assertEqual(fields['tags'], '')
+        self.assertEqual(fields['responsibilities'], '')
+
+    def test_title_matches_outrank_description_matches(self):
+        listings = [
+            make_listing('described', 'Backend Intern', description='Some kubernetes exposure helps'),
+            make_listing('titled', 'Kubernetes Intern', description='Operate clusters'),
+            make_listing('unrelated', 'Design Intern', description='Create wireframes'),
+        ]
+        index = BM25FIndex()
+        index.build(listings)
+        rows, scores = index.search('kubernetes', 3, np.ones(3, dtype=bool))
+        self.assertEqual([listings[row]['id'] for row in rows], ['titled', 'described'])
+        self.assertTrue(0 < scores[1] < scores[0] < 1)
+
+    def test_tombstoned_and_filtered_rows_are_skipped(self):
+        listings = [make_listing(f'k{number}', 'Kubernetes Intern') for number in range(3)]
+        index = BM25FIndex()
+        index.build(listings)
+        rows, _ = index.search('kubernetes', 3, np.array([True, False, True]), candidate_rows=np.array([1, 2]))
+        self.assertEqual(list(rows), [2])
+
+    def test_search_scorer_is_tfidf_unless_bm25f_is_configured(self):
+        self.assertIsNone(self.make_rag(make_corpus(20)).bm25_index)
+        rag = self.make_rag(make_corpus(20), RAG_SEARCH_SCORER='bm25f')
+        self.assertIsNotNone(rag.bm25_index)
+        self.assertEqual(rag.get_stats()['search_scorer'], 'bm25f')
+        self.assertTrue(rag.search_internships('DevOps'))
+
+
+FILTER_LOOKUPS = {'domain': 'icontains', 'experience_level': 'iexact', 'location': 'icontains',
+                  'source': 'iexact', 'company': 'icontains'}
+
+
+def brute_force_filter(listings, **criteria):
+    """Listings matching every given criterion, scanned one by one"""
+    def matches(listing, field, value):
+        text = str(listing.get(field) or '').lower()
+        return value.lower() == text if FILTER_LOOKUPS[field] == 'iexact' else value.lower() in text
+    return [listing for listing in listings
+            if all(matches(listing, field, value) for field, value in criteria.items() if value)]
+
+
+class AttributeFilterTests(RAGTestMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.listings = make_corpus(60)
+        for number, listing in enumerate(self.listings):
+            listing['experience_level'] = ['entry-level', 'Intermediate', 'ENTRY-LEVEL'][number % 3]
+            listing['source'] = ['LinkedIn', 'indeed', 'Internshala', 'naukri'][number % 4]
+        self.listings[5]['domain'] = None
+        del self.listings[7]['location']
+        self.removed = ['listing_0', 'listing_13', 'listing_26']
+
+    def make_filtered_rag(self, **settings_overrides):
+        rag = self.make_rag(self.listings, **settings_overrides)
+        rag.apply_listing_updates(removed_ids=self.removed)
+        return rag
+
+    def active_listings(self):
+        return [listing for listing in self.listings if listing['id'] not in self.removed]
+
+    def test_filters_match_a_brute_force_scan(self):
+        rag = self.make_filtered_rag()
+        cases = [
+            {}, {'domain': 'data'}, {'domain': 'DATA SCIENCE'}, {'experience_level': 'entry-level'},
+            {'experience_level': 'entry'}, {'location': 'remote'}, {'source': 'INDEED'}, {'source': 'ind'},
+            {'company': 'company 1'}, {'domain': 'design', 'location': 'delhi', 'experience_level': 'intermediate'},
+            {'domain': 'science', 'source': 'linkedin', 'company': 'Company 3'}, {'domain': 'quantum'},
+            {'domain': '', 'location': None},
+        ]
+        for criteria in cases:
+            with self.subTest(criteria=criteria):
+                self.assertEqual(rag.filter_by_criteria(**criteria), brute_force_filter(self.active_listings(), **criteria))
+
+    def test_tombstoned_ids_are_not_found(self):
+        rag = self.make_filtered_rag()
+        self.assertEqual(rag.get_internship_by_id('listing_1'), self.listings[1])
+        self.assertEqual(rag.get_internship_by_id('listing_13'), {})
+        self.assertEqual(rag.get_internship_by_id('unknown'), {})
+
+        rag.apply_listing_updates(added=[make_listing('listing_13', 'Data Science Intern 13')])
+        self.assertEqual(rag.get_internship_by_id('listing_13')['title'], 'Data Science Intern 13')
+
+    def test_filtered_search_only_returns_matching_rows(self):
+        for scorer in ('tfidf', 'bm25f'):
+            rag = self.make_filtered_rag(RAG_SEARCH_SCORER=scorer)
+            for criteria in [{'domain': 'data'}, {'location': 'bangalore', 'source': 'linkedin'},
+                             {'experience_level': 'ENTRY-LEVEL', 'company': 'company 2'}]:
+                with self.subTest(scorer=scorer, criteria=criteria):
+                    allowed = {listing['id'] for listing in brute_force_filter(self.active_listings(), **criteria)}
+                    results = rag.search_internships('python sql data projects', limit=50, **criteria)
+                    self.assertTrue(results)
+                    self.assertLessEqual({result['id'] for result in results}, allowed)
+                    unfiltered = rag.search_internships('python sql data projects', limit=100)
+                    self.assertEqual([result['id'] for result in results],
+                                     [result['id'] for result in unfiltered if result['id'] in allowed][:50])
+
+    def test_internships_endpoint_applies_filters_to_search(self):
+        rag = self.make_filtered_rag()
+        request = RequestFactory().get('/api/internships/', {
+            'search': 'python projects', 'domain': 'web', 'experience': 'entry-level', 'sort_by': 'matching_score'
+        })
+        with mock.patch.object(views, 'internship_rag', rag), mock.patch.object(views, 'RAG_AVAILABLE', True), \
+                mock.patch.object(rag, 'refresh_data', return_value=False):
+            response = views.get_internships(request)
+
+        allowed = {listing['id'] for listing in brute_force_filter(
+            self.active_listings(), domain='web', experience_level='entry-level')}
+        ids = [internship['id'] for internship in response.data['internships']]
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(ids)
+        self.assertLessEqual(set(ids), allowed)
+
+
+PROFILE = {'skills': ['Python', 'SQL', 'Statistics'], 'domains': ['Data Science'], 'experience_level': 'entry-level'}
+
+
+class MatchCacheTests(RAGTestMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.rag = self.make_rag(make_corpus(40))
+
+    def ids(self, matches):
+        return [match['id'] for match in matches]
+
+    def count_transforms(self):
+        return mock.patch.object(self.rag._state.vectorizer, 'transform', wraps=self.rag._state.vectorizer.transform)
+
+    def test_repeated_query_is_served_from_the_cache(self):
+        first = self.rag.find_matching_internships(PROFILE, ['Data Science'], top_k=5)
+        hits = self.rag.match_cache.hits
+        with self.count_transforms() as transform:
+            second = self.rag.find_matching_internships(PROFILE, ['Data Science'], top_k=3)
+
+        transform.assert_not_called()
+        self.assertEqual(self.rag.match_cache.hits, hits + 1)
+        self.assertEqual(second, first[:3])
+
+    def test_larger_k_reuses_the_cached_query_vector(self):
+        self.rag.find_matching_internships(PROFILE, ['Data Science'], top_k=3)
+        with self.count_transforms() as transform:
+            larger = self.rag.find_matching_internships(PROFILE, ['Data Science'], top_k=10)
+        transform.assert_not_called()
+
+        fresh = self.make_rag(make_corpus(40)).find_matching_internships(PROFILE, ['Data Science'], top_k=10)
+        self.assertEqual(self.ids(larger), self.ids(fresh))
+        self.assertEqual(len(larger), 10)
+        # The deeper ranking replaced the shallow entry
+        hits = self.rag.match_cache.hits
+        self.rag.find_matching_internships(PROFILE, ['Data Science'], top_k=10)
+        self.assertEqual(self.rag.match_cache.hits, hits + 1)
+
+    def test_entries_are_not_served_after_the_index_changes(self):
+        before = self.rag.find_matching_internships(PROFILE, ['Data Science'], top_k=5)
+        version = self.rag.index_version
+        self.rag.apply_listing_updates(
+            added=[make_listing('perfect_fit', 'Data Science Intern', domain='Data Science',
+                                description='Python SQL statistics data science entry-level',
+                                requirements=['Python', 'SQL', 'Statistics'])],
+            removed_ids=[before[0]['id']]
+        )
+        self.assertNotEqual(self.rag.index_version, version)
+
+        misses = self.rag.match_cache.misses
+        after = self.rag.find_matching_internships(PROFILE, ['Data Science'], top_k=5)
+        self.assertEqual(self.rag.match_cache.misses, misses + 1)
+        self.assertIn('perfect_fit', self.ids(after))
+        self.assertNotIn(before[0]['id'], self.ids(after))
+
+
+class BatchMatchingTests(RAGTestMixin, SimpleTestCase):
+    def test_batch_matches_equal_per_profile_matches(self):
+        profiles = [
+            (PROFILE, ['Data Science']),
+            ({'skills': ['React', 'JavaScript'], 'domains': ['Web Development'], 'experience_level': 'entry-level'},
+             ['Web Development']),
+            ({'skills': ['Docker', 'AWS'], 'projects': [{'name': 'Cluster', 'technologies': ['Kubernetes']}]},
+             ['DevOps']),
+            (PROFILE, ['Data Science']),  # Repeated within the batch
+            ({'skills': []}, []),
+        ]
+        for backend in ('exact', 'ivf'):
+            with self.subTest(backend=backend):
+                settings_overrides = {'RAG_RETRIEVAL_BACKEND': backend, 'RAG_INDEX_DIR': os.path.join(self.tmp_dir, backend)}
+                if backend == 'ivf':
+                    settings_overrides['RAG_RETRIEVAL_PARAMS'] = {'n_lists': 8, 'n_probe': 3, 'exact_below': 50}
+                batch_rag = self.make_rag(make_corpus(200), **settings_overrides)
+                single_rag = self.make_rag(make_corpus(200), **settings_overrides)
+
+                with mock.patch.object(batch_rag._state.retriever, 'search_batch',
+                                       wraps=batch_rag._state.retriever.search_batch) as search_batch:
+                    batch = batch_rag.find_matching_internships_batch(
+                        [profile for profile, _ in profiles], [preferences for _, preferences in profiles], top_k=7
+                    )
+                search_batch.assert_called_once()
+                self.assertEqual(batch_rag._state.retriever.name, backend)
+
+                expected = [single_rag.find_matching_internships(profile, preferences, top_k=7)
+                            for profile, preferences in profiles]
+                self.assertEqual(batch, expected)
+                self.assertEqual(batch[0], batch[3])
+                self.assertTrue(all(batch[:4]))
+
+
+class SkillOverlapTests(RAGTestMixin, SimpleTestCase):
+    def test_indexed_listings_use_the_skill_index_and_only_others_are_encoded(self):
+        corpus = make_corpus(30)
+        rag = self.make_rag(corpus)
+        unknown = make_listing('unknown', 'Rust Intern', requirements=['Rust', 'Git'], preferred_skills=None)
+        listings = [corpus[4], unknown, corpus[7]]
+        student_skills = ['python', 'Git', 'SQL']
+
+        build = SkillIncidence.build
+        with mock.patch('utils.rag_system.SkillIncidence.build', side_effect=build) as encode:
+            overlaps = rag.skill_overlaps(listings, student_skills)
+        encode.assert_called_once_with([unknown])
+
+        def ordered(overlap):
+            return {key: sorted(value) if isinstance(value, list) else value for key, value in overlap.items()}
+        expected = SkillIncidence.build(listings).overlap(student_skills)
+        self.assertEqual([ordered(overlap) for overlap in overlaps], [ordered(overlap) for overlap in expected])
+        self.assertEqual(overlaps[1]['skill_matches'], ['git'])
+        self.assertEqual(overlaps[1]['missing_required_skills'], ['rust'])
+
+
+class PlatformStatisticsViewTests(SimpleTestCase):
+    def test_statistics_use_the_shared_scraper(self):
+        store = mock.Mock()
+        store.count.return_value = 4
+        store.source_statistics.return_value = {
+            'linkedin': {'total_internships': 4, 'recent_24h': 1, 'unique_companies': 2, 'unique_domains': 1,
+                         'with_valid_links': 2}
+        }
+        request = RequestFactory().get('/api/scraping/platform-stats/')
+        with mock.patch.object(scrap.scraper, 'listing_store', store), \
+                mock.patch.object(scrap, 'InternshipScraper', side_effect=AssertionError('new scraper created')):
+            response = views.get_platform_statistics(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['platform_statistics']['linkedin']['link_percentage'], 50.0)
+
+
+class ListingStoreTests(TempDirMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        # Compaction only when a test asks for it, never on a background thread
+        self.store = ListingStore(os.path.join(self.tmp_dir, 'listings'), max_segments=100, tombstone_ratio=100)
+
+    def ids(self):
+        return [listing['id'] for listing in self.store.iter_listings()]
+
+    def test_listing_queries_require_iter_listings_and_tombstone(self):
+        with self.assertRaises(TypeError):
+            ListingQueries()
+
+    def test_tombstones_hide_earlier_rows_but_not_later_appends(self):
+        self.store.append([make_listing('a', 'Data Intern'), make_listing('b', 'Web Intern')])
+        self.store.tombstone(['a'])
+        self.assertEqual(self.ids(), ['b'])
+        self.store.append([make_listing('a', 'Data Intern', location='Remote')])
+        self.assertEqual(self.ids(), ['b', 'a'])
+
+    def test_compaction_keeps_the_last_live_row_per_id(self):
+        self.store.append([make_listing('a', 'Data Intern'), make_listing('b', 'Web Intern')])
+        self.store.append([make_listing('a', 'Data Intern', location='Remote'), make_listing('c', 'QA Intern')])
+        self.store.tombstone(['c'])
+        self.assertTrue(self.store.compact())
+
+        self.assertEqual(self.store.stats()['segments'], 1)
+        self.assertEqual(self.store.stats()['tombstones'], 0)
+        self.assertEqual(self.ids(), ['b', 'a'])
+        self.assertEqual(list(self.store.iter_listings())[1]['location'], 'Remote')
+
+    def test_expire_reads_only_segments_with_a_deadline_due(self):
+        self.store.append([make_listing('future', 'Data Intern', application_deadline='2030-01-01')])
+        self.store.append([
+            make_listing('past', 'Web Intern', application_deadline='2020-01-01'),
+            make_listing('later', 'QA Intern', application_deadline='2031-01-01'),
+            make_listing('undated', 'Ops Intern', application_deadline=None),
+        ])
+        segments = [segment['name'] for segment in self.store.read_manifest()['segments']]
+        now = datetime(2026, 10, 1)
+
+        with mock.patch.object(self.store, '_iter_segment', wraps=self.store._iter_segment) as read:
+            self.assertEqual(self.store.expire(now), ['past'])
+        self.assertEqual([call.args[0] for call in read.call_args_list], [segments[1]])
+        self.assertEqual(self.ids(), ['future', 'later', 'undated'])
+        self.assertEqual(self.store.read_manifest()['segments'][1]['next_expiry'], '2031-01-01')
+
+        with mock.patch.object(self.store, '_iter_segment', wraps=self.store._iter_segment) as read:
+            self.assertEqual(self.store.expire(now), [])
+        read.assert_not_called()
+        self.assertEqual(self.store.expire(datetime(2030, 6, 1)), ['future'])
+
+    def test_segments_without_next_expiry_are_checked_once(self):
+        self.store.append([make_listing('past', 'Web Intern', application_deadline='2020-01-01')])
+        manifest = self.store.read_manifest()
+        del manifest['segments'][0]['next_expiry']
+        self.store._write_manifest(manifest)
+
+        self.assertEqual(self.store.expire(datetime(2026, 10, 1)), ['past'])
+        self.assertIsNone(self.store.read_manifest()['segments'][0]['next_expiry'])
+
+
+class StreamingLoaderFallbackTests(TempDirMixin, SimpleTestCase):
+    """iter_internships without ijson, decoding with the stdlib decoder over a small sliding buffer"""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(internship_stream, 'IJSON_AVAILABLE', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, text):
+        path = os.path.join(self.tmp_dir, 'internships.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def assertStreamsLike(self, text, expected=None, chunk_sizes=(1, 2, 3, 7, 16, 1 << 20)):
+        path = self.write(text)
+        if expected is None:
+            with open(path, encoding='utf-8') as f:
+                expected = json.load(f).get('internships', [])
+        for chunk_size in chunk_sizes:
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(iter_internships(path, chunk_size=chunk_size)), expected)
+
+    def test_objects_split_across_chunk_boundaries(self):
+        listings = make_corpus(5)
+        listings[2]['stipend'] = 15000.5
+        listings[3]['openings'] = 12345678901234567890
+        self.assertStreamsLike(json.dumps({'internships': listings}, indent=2))
+        self.assertStreamsLike(json.dumps({'internships': listings}, separators=(',', ':')))
+
+    def test_strings_with_brackets_braces_and_escapes(self):
+        listings = [
+            make_listing('tricky_1', 'Intern ] } [ {', description='Quote \\" and backslash \\\\ and ]}, "x": 1'),
+            make_listing('tricky_2', 'Café “Analyst” – Intern \u2028', description='Tab\t newline\n ],[ {}'),
+        ]
+        self.assertStreamsLike(json.dumps({'internships': listings}))
+        self.assertStreamsLike(json.dumps({'internships': listings}, ensure_ascii=False))
+
+    def test_other_top_level_keys_before_and_after(self):
+        listings = make_corpus(3)
+        self.assertStreamsLike(json.dumps({
+            'metadata': {'internships': [{'id': 'not this one'}], 'note': '"internships": ['},
+            'internships': listings,
+            'sources': ['indeed', {'nested': [1, 2, {'internships': []}]}],
+            'total': 3
+        }, indent=1))
+
+    def test_empty_array_missing_key_and_empty_object(self):
+        self.assertStreamsLike('{"internships": [ ], "total": 0}', expected=[])
+        self.assertStreamsLike('{"metadata": {"total": 0}, "listings": [{"id": "other"}]}', expected=[])
+        self.assertStreamsLike(' { } ', expected=[])
+        self.assertEqual(list(iter_internships(os.path.join(self.tmp_dir, 'missing.json'))), [])
+
+    def test_truncated_file_raises(self):
+        path = self.write(json.dumps({'internships': make_corpus(2)})[:-20])
+        with self.assertRaises(ValueError):
+            list(iter_internships(path, chunk_size=8))
+
+
+class SQLiteListingRepositoryTests(TempDirMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.listings = [
+            make_listing('indeed_1', 'Data Science Intern', source='indeed', domain='Data Science',
+                         application_deadline='2026-10-16', scraped_at='2026-10-17 09:00:00'),
+            make_listing('indeed_2', 'Backend Developer Intern', company='Beta Labs', source='indeed',
+                         application_deadline='2026-10-17', link='https://example.com/2'),
+            make_listing('linkedin_1', 'Frontend Developer Intern', company='Beta Labs', location='Pune',
+                         requirements=None, preferred_skills=None, application_deadline='2026-1-5'),
+            make_listing('linkedin_2', 'React Web Intern', description='Build dashboards with React and Kubernetes',
+                         application_deadline='not announced'),
+        ]
+        legacy_path = os.path.join(self.tmp_dir, 'internships.json')
+        with open(legacy_path, 'w', encoding='utf-8') as f:
+            json.dump({'metadata': {'total': len(self.listings)}, 'internships': self.listings}, f)
+        self.db_path = os.path.join(self.tmp_dir, 'listings', 'listings.sqlite3')
+        self.repository = SQLiteListingRepository(self.db_path, seed_listings=lambda: iter_internships(legacy_path))
+
+    def ids(self, listings):
+        return [listing['id'] for listing in listings]
+
+    def test_seeding_imports_the_json_file_once(self):
+        self.assertEqual(list(self.repository.iter_listings()), self.listings)
+        self.assertTrue(self.repository.stats()['fts'])
+
+        self.repository.tombstone(['indeed_1'])
+        reopened = SQLiteListingRepository(self.db_path, seed_listings=lambda: self.listings)
+        self.assertEqual(self.ids(reopened.iter_listings()), ['indeed_2', 'linkedin_1', 'linkedin_2'])
+
+    def test_expired_ids_match_the_scanning_implementation(self):
+        for current_date in [datetime(2026, 1, 5), datetime(2026, 1, 5, 0, 0, 1), datetime(2026, 10, 17),
+                             datetime(2026, 10, 17, 12, 0), datetime(2030, 1, 1)]:
+            with self.subTest(current_date=current_date):
+                self.assertEqual(sorted(self.repository.expired_ids(current_date)),
+                                 sorted(ListingQueries.expired_ids(self.repository, current_date)))
+        self.assertEqual(sorted(self.repository.expired_ids(datetime(2026, 10, 17))), ['indeed_1', 'linkedin_1'])
+
+        self.assertEqual(sorted(self.repository.expire(datetime(2026, 10, 18))), ['indeed_1', 'indeed_2', 'linkedin_1'])
+        self.assertEqual(self.ids(self.repository.iter_listings()), ['linkedin_2'])
+        self.assertEqual(self.repository.count(), 1)
+
+    def test_append_replaces_listings_with_the_same_id(self):
+        self.repository.append([make_listing('indeed_2', 'Backend Engineer Intern', requirements=None)])
+        self.assertEqual(self.repository.count(), 4)
+        self.assertEqual(self.ids(self.repository.search('backend engineer')), ['indeed_2'])
+        self.assertEqual(self.ids(self.repository.search('developer')), ['linkedin_1'])  # The old title is gone
+        self.assertEqual(self.repository.new_listings([make_listing('new', None, company=None)]),
+                         [make_listing('new', None, company=None)])
+
+    def test_aggregates_match_the_scanning_implementation(self):
+        since = datetime(2026, 10, 17)
+        for field in ('source', 'company', 'location'):
+            self.assertEqual(self.repository.count_by(field), ListingQueries.count_by(self.repository, field))
+        self.assertEqual(self.repository.count_by('source'), {'indeed': 2, 'linkedin': 2})
+        self.assertEqual(self.repository.count_scraped_since(since), 1)
+        self.assertEqual(self.repository.source_statistics(since),
+                         ListingQueries.source_statistics(self.repository, since))
+        self.assertEqual(self.repository.source_statistics(since)['indeed']['recent_24h'], 1)
+
+    def test_full_text_search_covers_titles_descriptions_and_skills(self):
+        self.assertEqual(self.ids(self.repository.search('kubernetes')), ['linkedin_2'])
+        self.assertEqual(sorted(self.ids(self.repository.search('Beta labs'))), ['indeed_2', 'linkedin_1'])
+        self.assertEqual(sorted(self.ids(self.repository.search('sql'))), ['indeed_1', 'indeed_2', 'linkedin_2'])
+        self.assertEqual(self.repository.search('sql', limit=1), self.repository.search('sql')[:1])
+        self.assertEqual(self.repository.search('quantum'), [])
+
+        self.repository.tombstone(['linkedin_2'])
+        self.assertEqual(self.repository.search('kubernetes'), [])
+
+
+class TfidfIndexSnapshotTests(TempDirMixin, SimpleTestCase):
+    TEXTS = [
+        'python data pipelines with sql', 'react web frontend', 'python machine learning models',
+        'sql reporting dashboards', 'docker kubernetes deployments', 'python web backend with django',
+        'figma prototypes for web', 'statistics and python', 'aws cloud deployments with docker',
+        'java backend services', 'sql sql sql warehouse', 'web web accessibility audits',
+    ]
+
+    def snapshot(self, **vectorizer_params):
+        return TfidfIndexSnapshot(os.path.join(self.tmp_dir, 'rag_index'), vectorizer_params)
+
+    def test_chunked_fit_matches_fit_transform_for_every_parameter(self):
+        parameter_sets = [
+            {'stop_words': 'english', 'ngram_range': [1, 2], 'max_features': 1000},
+            {'max_features': 5},  # Ties on frequency at the cut-off
+            {'min_df': 2, 'max_df': 0.4},
+            {'sublinear_tf': True, 'smooth_idf': False, 'norm': 'l1'},
+        ]
+        for params in parameter_sets:
+            with self.subTest(params=params):
+                index_snapshot = self.snapshot(**params)
+                vectorizer, matrix = index_snapshot.fit_transform_chunked(self.TEXTS, chunk_size=5)
+                expected_vectorizer = index_snapshot.new_vectorizer()
+                expected = expected_vectorizer.fit_transform(self.TEXTS)
+                self.assertEqual(vectorizer.vocabulary_, expected_vectorizer.vocabulary_)
+                np.testing.assert_allclose(vectorizer.idf_, expected_vectorizer.idf_)
+                np.testing.assert_allclose(matrix.toarray(), expected.toarray())
+
+    def test_saved_snapshot_loads_memory_mapped(self):
+        index_snapshot = self.snapshot(stop_words='english')
+        listings = [make_listing(f'listing_{row}', text) for row, text in enumerate(self.TEXTS)]
+        vectorizer, matrix = index_snapshot.fit_transform_chunked(self.TEXTS)
+        digests = index_snapshot.digest_array(index_snapshot.text_digest(text) for text in self.TEXTS)
+        content_hash = index_snapshot.compute_content_hash(digests)
+        self.assertTrue(index_snapshot.save(content_hash, vectorizer, matrix, listings, digests))
+
+        loaded = index_snapshot.load(content_hash)
+        self.assertEqual(index_snapshot.current_hash(), content_hash)
+        self.assertFalse(loaded.matrix.data.flags.writeable)  # A view onto the read-only mmap
+        np.testing.assert_allclose(loaded.matrix.toarray(), matrix.toarray())
+        self.assertEqual(loaded.vectorizer.vocabulary_, vectorizer.vocabulary_)
+        np.testing.assert_allclose(loaded.vectorizer.transform(['python sql']).toarray(),
+                                   vectorizer.transform(['python sql']).toarray())
+        self.assertEqual(loaded.ids, [listing['id'] for listing in listings])
+        self.assertEqual(loaded.listings[3], listings[3])
+        self.assertEqual(list(loaded.listings), listings)
+        self.assertIsNone(loaded.retrieval)
+        self.assertIsNone(index_snapshot.load('another-hash'))
+
+    def test_content_hash_depends_on_rows_and_vectorizer_params(self):
+        index_snapshot = self.snapshot(stop_words='english')
+        digests = index_snapshot.digest_array(index_snapshot.text_digest(text) for text in self.TEXTS)
+        content_hash = index_snapshot.compute_content_hash(digests)
+        self.assertNotEqual(content_hash, index_snapshot.compute_content_hash(digests[::-1]))
+        self.assertNotEqual(content_hash, self.snapshot(stop_words=None).compute_content_hash(digests))
+
+
+class TopKTests(SimpleTestCase):
+    def test_ties_are_broken_by_lower_row(self):
+        scores = np.array([0.5, 0.9, 0.5, 0.9, 0.1, 0.5])
+        self.assertEqual(list(top_k_indices(scores, 3)), [1, 3, 0])
+        self.assertEqual(list(top_k_indices(scores, 4)), [1, 3, 0, 2])
+
+    def test_mask_and_min_score_apply_before_k(self):
+        scores = np.array([0.5, 0.9, 0.5, 0.9, 0.1, 0.5])
+        mask = np.array([True, False, True, True, True, True])
+        self.assertEqual(list(top_k_indices(scores, 3, mask=mask)), [3, 0, 2])
+        self.assertEqual(list(top_k_indices(scores, 10, min_score=0.5)), [1, 3])
+        self.assertEqual(len(top_k_indices(scores, 0)), 0)
+
+    def test_matches_a_full_sort_on_random_scores(self):
+        rng = np.random.default_rng(7)
+        for _ in range(200):
+            scores = rng.integers(0, 4, rng.integers(1, 30)) / 4
+            k = int(rng.integers(1, 10))
+            expected = sorted(range(len(scores)), key=lambda row: (-scores[row], row))[:k]
+            self.assertEqual(list(top_k_indices(scores, k)), expected)
+
+
+class IVFRecallTests(RAGTestMixin, SimpleTestCase):
+    def test_ivf_recall_against_exact_search(self):
+        rag = self.make_rag(make_corpus(600), RAG_RETRIEVAL_BACKEND='ivf', RAG_RETRIEVAL_PARAMS={
+            'n_lists': 12, 'n_probe': 4, 'min_candidates': 20, 'exact_below': 100
+        })
+        state = rag._state
+        queries = state.vectorizer.transform([
+            'python sql data science', 'react javascript web development', 'docker aws devops',
+            'figma ui ux design', 'machine learning statistics', 'java git software engineering',
+        ])
+        exact = ExactRetriever().search_batch(queries, state.vectors, state.active_mask, 10)
+        approximate = state.retriever.search_batch(queries, state.vectors, state.active_mask, 10)
+
+        self.assertIsNotNone(state.retriever.centroids)
+        recall = np.mean([
+            len(set(exact_rows) & set(ivf_rows)) / len(exact_rows)
+            for (exact_rows, _), (ivf_rows, _) in zip(exact, approximate)
+        ])
+        self.assertGreaterEqual(recall, 0.9)
+
+
+class FakeSourceScraper:
+    """Scraper whose sources each add one listing after a delay, recording how many ran at once"""
+
+    def __init__(self, delays, failing=()):
+        self.delays = delays
+        self.failing = failing
+        self.browser_pool = mock.Mock()
+        self.running = {}
+        self.max_running = {}
+        self.max_total_running = 0
+        for source, method in scrap.ScrapingOrchestrator.SOURCE_SCRAPERS.items():
+            setattr(self, method, self.make_scrape(source))
+
+    def make_scrape(self, source):
+        async def scrape(keyword, location, max_pages, collected):
+            self.running[source] = self.running.get(source, 0) + 1
+            self.max_running[source] = max(self.max_running.get(source, 0), self.running[source])
+            self.max_total_running = max(self.max_total_running, sum(self.running.values()))
+            try:
+                collected.append(make_listing(f'{source}_{len(collected)}', f'{keyword} intern'))
+                await asyncio.sleep(self.delays.get(source, 0))
+                if source in self.failing:
+                    raise RuntimeError(f'{source} blocked the request')
+                collected.append(make_listing(f'{source}_{len(collected)}', f'{keyword} intern'))
+            finally:
+                self.running[source] -= 1
+        return scrape
+
+
+class ScrapingOrchestratorTests(SimpleTestCase):
+    def make_orchestrator(self, delays, failing=(), **params):
+        orchestrator = scrap.ScrapingOrchestrator(FakeSourceScraper(delays, failing), **params)
+        self.addCleanup(lambda: orchestrator._loop and orchestrator._loop.call_soon_threadsafe(orchestrator._loop.stop))
+        return orchestrator
+
+    def test_sources_run_concurrently_and_report_per_source_results(self):
+        orchestrator = self.make_orchestrator({'indeed': 0.2, 'naukri': 0.2, 'linkedin': 0.2}, failing=('linkedin',))
+        result = orchestrator.run(['indeed', 'naukri', 'indeed', 'linkedin', 'unknown'], 'python', 'India', 1)
+
+        self.assertEqual(list(result['sources']), ['indeed', 'naukri', 'linkedin'])
+        self.assertEqual(orchestrator.scraper.max_total_running, 3)
+        self.assertEqual(result['sources']['indeed']['status'], 'completed')
+        self.assertEqual(result['sources']['linkedin']['status'], 'failed')
+        self.assertEqual(result['sources']['linkedin']['error'], 'linkedin blocked the request')
+        self.assertEqual(result['sources']['linkedin']['count'], 1)  # Found before failing
+        self.assertEqual(len(result['internships']), 5)
+
+    def test_deadline_keeps_partial_results_of_unfinished_sources(self):
+        orchestrator = self.make_orchestrator({'indeed': 0, 'naukri': 5})
+        result = orchestrator.run(['indeed', 'naukri'], 'python', 'India', 1, timeout=0.3)
+
+        self.assertEqual(result['sources']['indeed']['status'], 'completed')
+        self.assertEqual(result['sources']['naukri']['status'], 'timeout')
+        self.assertEqual(result['sources']['naukri']['count'], 1)
+        self.assertEqual(len(result['internships']), 3)
+
+    def test_concurrency_limits_apply_across_concurrent_runs(self):
+        orchestrator = self.make_orchestrator({'indeed': 0.1, 'naukri': 0.1, 'linkedin': 0.1},
+                                              source_concurrency=1, max_concurrent_sources=2)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                orchestrator.run(['indeed', 'naukri', 'linkedin'], 'python', 'India', 1)
+            ))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(max(orchestrator.scraper.max_running.values()), 1)
+        self.assertEqual(orchestrator.scraper.max_total_running, 2)
+        self.assertTrue(all(len(result['internships']) == 6 for result in results))
+
+
+def make_agent(name, writes, reads=(), delay=0, barrier=None, error=None, communicate=True):
+    """Agent that writes '<name>:<inputs>' to its keys, optionally waiting on a barrier shared with its stage"""
+    def agent(state):
+        if barrier:
+            barrier.wait(timeout=5)
+        time.sleep(delay)
+        inputs = ','.join(str(state.get(key)) for key in sorted(reads))
+        for key in writes:
+            state[key] = f'{name}:{inputs}'
+        if communicate:
+            state['agent_communications'].append({'agent': name})
+        state['current_step'] = f'{name} done'
+        if error:
+            raise RuntimeError(error)
+        return state
+    return AgentNode(name, agent, reads=list(reads), writes=list(writes))
+
+
+class DAGWorkflowTests(SimpleTestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.executor.shutdown)
+
+    def initial_state(self):
+        return {'resume': 'text', 'agent_communications': [], 'agent_timings': {}, 'error': '',
+                'current_step': 'Starting', 'step_progress': 0}
+
+    def test_analysis_agents_are_planned_in_dependency_stages(self):
+        stages = DAGWorkflow(analysis_nodes, self.executor).stages
+        self.assertEqual([[node.name for node in stage] for stage in stages], [
+            ['student_profile_analyzer'], ['internship_matcher'],
+            ['portfolio_gap_detector', 'rag_requirement_aligner'], ['readiness_evaluator']
+        ])
+
+    def test_stage_agents_run_in_parallel_and_merge_in_declaration_order(self):
+        barrier = threading.Barrier(3)
+        workflow = DAGWorkflow([
+            make_agent('profile', ['profile'], reads=['resume']),
+            make_agent('gaps', ['gaps'], reads=['profile'], delay=0.2, barrier=barrier),
+            make_agent('aligned', ['aligned'], reads=['profile'], barrier=barrier),
+            make_agent('links', ['links'], reads=['profile'], barrier=barrier),
+            make_agent('report', ['report'], reads=['gaps', 'aligned']),
+        ], self.executor)
+
+        streamed = [node.name for node, _ in workflow.stream(self.initial_state())]
+        state = workflow.invoke(self.initial_state())
+
+        # Each agent of the middle stage waits for the other two, so they can only finish if they run together
+        self.assertEqual(streamed, ['profile', 'gaps', 'aligned', 'links', 'report'])
+        self.assertEqual(state['report'], 'report:aligned:profile:text,gaps:profile:text')
+        self.assertEqual([message['agent'] for message in state['agent_communications']],
+                         ['profile', 'gaps', 'aligned', 'links', 'report'])
+        self.assertEqual(state['agent_timings']['links']['stage'], 1)
+        self.assertEqual(state['current_step'], 'report done')
+        self.assertEqual(state['error'], '')
+
+    def test_undeclared_writes_are_discarded(self):
+        def rogue(state):
+            state['profile'] = 'overwritten'
+            state['notes'] = 'rogue notes'
+            return state
+
+        workflow = DAGWorkflow([
+            make_agent('profile', ['profile']),
+            AgentNode('rogue', rogue, reads=['profile'], writes=['notes']),
+        ], self.executor)
+        state = workflow.invoke(self.initial_state())
+
+        self.assertEqual(state['profile'], 'profile:')
+        self.assertEqual(state['notes'], 'rogue notes')
+
+    def test_failed_agent_stops_the_workflow_after_its_stage(self):
+        workflow = DAGWorkflow([
+            make_agent('profile', ['profile']),
+            make_agent('gaps', ['gaps'], reads=['profile'], error='LLM unavailable'),
+            make_agent('aligned', ['aligned'], reads=['profile']),
+            make_agent('report', ['report'], reads=['gaps', 'aligned']),
+        ], self.executor)
+        state = workflow.invoke(self.initial_state())
+
+        self.assertEqual(state['error'], 'Agent gaps failed: LLM unavailable')
+        self.assertEqual(state['aligned'], 'aligned:profile:')
+        self.assertNotIn('report', state)
+        self.assertEqual(state['agent_timings']['gaps']['status'], 'failed')
+        self.assertEqual(state['agent_timings']['aligned']['status'], 'completed')
+
+
+def analysis_state(resume_text='Python developer with Django projects'):
+    return {
+        'resume_text': resume_text, 'github_link': '', 'preferences': ['Web'], 'student_profile': {},
+        'best_fit_internships': [], 'portfolio_gaps': [], 'rag_aligned_requirements': {},
+        'readiness_evaluations': [], 'extraction_info': {}, 'processing_timestamp': '', 'error': '',
+        'current_step': 'Starting analysis...', 'step_progress': 0, 'detailed_extraction': {},
+        'agent_communications': [], 'agent_timings': {}
+    }
+
+
+def parse_events(chunks):
+    events = []
+    for chunk in chunks:
+        chunk = chunk.decode('utf-8') if isinstance(chunk, bytes) else chunk
+        for message in filter(None, chunk.split('\n\n')):
+            event_line, data_line = message.split('\n')
+            events.append((event_line[len('event: '):], json.loads(data_line[len('data: '):])))
+    return events
+
+
+class AnalysisViewTestMixin:
+    """Runs the analysis views on stand-in agents with a private cache and no dashboard or MongoDB writes"""
+
+    def setUp(self):
+        super().setUp()
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.executor.shutdown)
+        self.cache = LRUCache(max_size=8)
+        self.workflow = self.make_workflow()
+        self.record_analysis = mock.Mock()
+        for target, value in [
+            ('dag_workflow', self.workflow),
+            ('default_analysis_cache', lambda: self.cache),
+            ('analysis_cache_key', lambda state: f"key:{state['resume_text']}"),
+        ]:
+            patcher = mock.patch.object(Agent, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(Agent.ResumeAnalysisView, 'record_analysis', self.record_analysis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_workflow(self, error=None):
+        return DAGWorkflow([
+            make_agent('student_profile_analyzer', ['student_profile'], reads=['resume_text']),
+            make_agent('internship_matcher', ['best_fit_internships'], reads=['student_profile']),
+            make_agent('portfolio_gap_detector', ['portfolio_gaps'], reads=['best_fit_internships'], error=error),
+            make_agent('rag_requirement_aligner', ['rag_aligned_requirements'], reads=['best_fit_internships']),
+            make_agent('readiness_evaluator', ['readiness_evaluations'], reads=['portfolio_gaps']),
+        ], self.executor)
+
+
+class AnalysisStreamTests(AnalysisViewTestMixin, SimpleTestCase):
+    def test_events_report_each_agent_then_the_full_response(self):
+        events = parse_events(ResumeAnalysisStreamView().stream_events(analysis_state(), 'file-1', 'student-1'))
+
+        self.assertEqual([event for event, _ in events], ['progress'] + ['agent'] * 5 + ['complete'])
+        self.assertEqual(events[0][1], {'current_step': 'Starting analysis...', 'step_progress': 0})
+        self.assertEqual([data['agent'] for _, data in events[1:6]],
+                         [node.name for node in self.workflow.nodes])
+        matcher = events[2][1]
+        self.assertEqual(matcher['status'], 'completed')
+        self.assertEqual(matcher['result'], {
+            'best_fit_internships': 'internship_matcher:student_profile_analyzer:Python developer with Django projects'
+        })
+        self.assertEqual(matcher['agent_communications'], [{'agent': 'internship_matcher'}])
+
+        complete = events[-1][1]
+        self.assertFalse(complete['served_from_cache'])
+        self.assertEqual(complete['file_info']['file_id'], 'file-1')
+        self.assertEqual(len(complete['agent_communications']), 5)
+        self.assertEqual(self.record_analysis.call_args.args[2], 'student-1')
+
+    def test_failed_agent_ends_the_stream_with_an_error_event(self):
+        self.workflow = self.make_workflow(error='LLM unavailable')
+        with mock.patch.object(Agent, 'dag_workflow', self.workflow):
+            events = parse_events(ResumeAnalysisStreamView().stream_events(analysis_state(), 'file-1', 'student-1'))
+
+        self.assertEqual([event for event, _ in events], ['progress'] + ['agent'] * 4 + ['error'])
+        self.assertEqual(events[-1][1], {'error': 'Agent portfolio_gap_detector failed: LLM unavailable'})
+        self.assertEqual(len(self.cache), 0)
+        self.record_analysis.assert_not_called()
+
+    def test_post_streams_events_without_buffering(self):
+        view = ResumeAnalysisStreamView.as_view()
+        with mock.patch.object(ResumeAnalysisStreamView, 'prepare_analysis', return_value=(analysis_state(), 'file-1')):
+            response = view(RequestFactory().post('/api/analyze/resume/stream/', {'user_id': 'student-1'}))
+            events = parse_events(response.streaming_content)
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertEqual(response['X-Accel-Buffering'], 'no')
+        self.assertEqual(events[-1][0], 'complete')
+
+
+def wait_for_job(queue, job_id, statuses=('completed', 'failed', 'timed_out')):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        job = queue.status(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f'Job {job_id} is still {job["status"]}')
+
+
+class AnalysisJobQueueTests(TempDirMixin, SimpleTestCase):
+    def make_queue(self, store=None, **params):
+        queue = AnalysisJobQueue(store or InMemoryJobStore(), **params)
+        self.addCleanup(queue.executor.shutdown)
+        return queue
+
+    def test_job_reports_progress_and_result(self):
+        queue = self.make_queue()
+        release = threading.Event()
+
+        def analysis(job, resume_text):
+            job.progress('Matching internships...', 40)
+            release.wait(timeout=5)
+            return {'resume_text': resume_text}
+
+        job_id = queue.submit(analysis, 'Python developer')
+        running = wait_for_job(queue, job_id, statuses=('running',))
+        while running['step_progress'] != 40:
+            running = queue.status(job_id)
+        self.assertEqual(running['current_step'], 'Matching internships...')
+        release.set()
+
+        job = wait_for_job(queue, job_id)
+        self.assertEqual(job['status'], 'completed')
+        self.assertEqual(job['job_id'], job_id)
+        self.assertEqual(job['result'], {'resume_text': 'Python developer'})
+        self.assertEqual(job['step_progress'], 100)
+        datetime.fromisoformat(job['finished_at'])
+        self.assertIsNone(queue.status('unknown'))
+
+    def test_submit_beyond_workers_and_queue_depth_is_rejected(self):
+        queue = self.make_queue(workers=1, max_queue_depth=1)
+        release = threading.Event()
+        job_ids = [queue.submit(lambda job: release.wait(timeout=5)) for _ in range(2)]
+
+        with self.assertRaises(JobQueueFull):
+            queue.submit(lambda job: None)
+        self.assertEqual(queue.stats()['in_flight'], 2)
+        release.set()
+        for job_id in job_ids:
+            wait_for_job(queue, job_id)
+        queue.submit(lambda job: None)  # Slots are released once jobs finish
+
+    def test_failed_and_overdue_jobs_are_reported(self):
+        queue = self.make_queue(job_timeout=0.2)
+        release = threading.Event()
+
+        def slow_analysis(job):
+            release.wait(timeout=5)
+            return {'late': True}
+
+        failed_id = queue.submit(lambda job: 1 / 0)
+        slow_id = queue.submit(slow_analysis)
+        self.assertEqual(wait_for_job(queue, failed_id)['status'], 'failed')
+        self.assertEqual(wait_for_job(queue, failed_id)['error'], 'division by zero')
+
+        time.sleep(0.3)
+        job = queue.status(slow_id)
+        self.assertEqual(job['status'], 'timed_out')
+        release.set()
+        queue.executor.shutdown(wait=True)
+        self.assertEqual(queue.status(slow_id)['status'], 'timed_out')  # The late result is not written
+        self.assertIsNone(queue.status(slow_id).get('result'))
+
+    def test_sqlite_jobs_are_visible_to_other_processes(self):
+        db_path = os.path.join(self.tmp_dir, 'jobs', 'analysis_jobs.sqlite3')
+        queue = self.make_queue(SQLiteJobStore(db_path))
+        job_id = queue.submit(lambda job: {'matches': [1, 2]})
+        wait_for_job(queue, job_id)
+
+        other_worker = self.make_queue(SQLiteJobStore(db_path))
+        job = other_worker.status(job_id)
+        self.assertEqual(job['status'], 'completed')
+        self.assertEqual(job['result'], {'matches': [1, 2]})
+
+
+class AnalysisJobViewTests(AnalysisViewTestMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.queue = AnalysisJobQueue(InMemoryJobStore(), workers=1, max_queue_depth=0)
+        self.addCleanup(self.queue.executor.shutdown)
+        patcher = mock.patch.object(Agent, 'default_analysis_job_queue', lambda: self.queue)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def submit(self):
+        with mock.patch.object(ResumeAnalysisJobView, 'prepare_analysis', return_value=(analysis_state(), 'file-1')):
+            return ResumeAnalysisJobView.as_view()(RequestFactory().post('/api/analyze/resume/jobs/', {}))
+
+    def test_submitted_analysis_is_polled_until_complete(self):
+        response = self.submit()
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data['job_id']
+        wait_for_job(self.queue, job_id)
+
+        status_response = ResumeAnalysisJobStatusView.as_view()(RequestFactory().get('/'), job_id=job_id)
+        self.assertEqual(status_response.status_code, 200)
+        self.assertEqual(status_response.data['status'], 'completed')
+        self.assertEqual(status_response.data['result']['file_info']['file_id'], 'file-1')
+        self.assertEqual(len(status_response.data['result']['agent_communications']), 5)
+        self.record_analysis.assert_called_once()
+        self.assertEqual(
+            ResumeAnalysisJobStatusView.as_view()(RequestFactory().get('/'), job_id='unknown').status_code, 404
+        )
+
+    def test_full_queue_answers_429(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        self.queue.submit(lambda job: release.wait(timeout=5))
+        self.assertEqual(self.submit().status_code, 429)
+
+
+class AnalysisCacheBackendTests(TempDirMixin, SimpleTestCase):
+    def make_caches(self, **params):
+        return [
+            LRUCache(**params),
+            FileCache(os.path.join(self.tmp_dir, 'analysis_cache'), **params),
+            SQLiteCache(os.path.join(self.tmp_dir, 'analysis_cache.sqlite3'), **params),
+        ]
+
+    def test_least_recently_used_entry_is_evicted(self):
+        for cache in self.make_caches(max_size=2):
+            with self.subTest(cache=type(cache).__name__):
+                cache.set('a', {'score': 1})
+                time.sleep(0.01)  # File and SQLite order entries by access time
+                cache.set('b', {'score': 2})
+                time.sleep(0.01)
+                self.assertEqual(cache.get('a'), {'score': 1})
+                time.sleep(0.01)
+                cache.set('c', {'score': 3})
+
+                self.assertIsNone(cache.get('b'))
+                self.assertEqual(cache.get('c'), {'score': 3})
+                self.assertEqual(len(cache), 2)
+                self.assertEqual(cache.stats()['evictions'], 1)
+                self.assertEqual(cache.stats()['hit_rate'], round(2 / 3, 4))
+
+    def test_expired_entries_are_misses(self):
+        for cache in self.make_caches(ttl_seconds=0.05):
+            with self.subTest(cache=type(cache).__name__):
+                cache.set('a', {'score': 1})
+                time.sleep(0.1)
+                self.assertEqual(cache.get('a', 'missing'), 'missing')
+                self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_shared_backends_are_visible_to_other_processes(self):
+        _, file_cache, sqlite_cache = self.make_caches()
+        _, other_file_cache, other_sqlite_cache = self.make_caches()
+        for cache, other in [(file_cache, other_file_cache), (sqlite_cache, other_sqlite_cache)]:
+            with self.subTest(cache=type(cache).__name__):
+                cache.set('analysis', {'matches': [1, 2]})
+                self.assertEqual(other.get('analysis'), {'matches': [1, 2]})
+                other.clear()
+                self.assertIsNone(cache.get('analysis'))
+
+
+class AnalysisCacheHitTests(AnalysisViewTestMixin, SimpleTestCase):
+    def analyse(self, user_id='student-1', file_id='file-1'):
+        events = parse_events(ResumeAnalysisStreamView().stream_events(analysis_state(), file_id, user_id))
+        return events[-1][1]
+
+    def test_identical_resubmission_is_served_from_cache_and_recorded(self):
+        first = self.analyse()
+        with mock.patch.object(self.workflow, 'stream') as stream:
+            second = self.analyse(user_id='student-2', file_id='file-2')
+        stream.assert_not_called()
+
+        self.assertTrue(second['served_from_cache'])
+        self.assertEqual(second['file_info']['file_id'], 'file-2')
+        self.assertEqual(second['student_profile'], first['student_profile'])
+        self.assertEqual(self.record_analysis.call_count, 2)
+        final_state, response_data, user_id = self.record_analysis.call_args.args
+        self.assertEqual(user_id, 'student-2')
+        self.assertTrue(response_data['served_from_cache'])
+        self.assertEqual(final_state['best_fit_internships'], first['internship_recommendations'])
+
+    def test_cache_hits_are_recorded_by_every_analysis_view(self):
+        self.analyse()
+        with mock.patch.object(Agent.ResumeAnalysisView, 'prepare_analysis',
+                               return_value=(analysis_state(), 'file-2')):
+            response = Agent.ResumeAnalysisView.as_view()(RequestFactory().post('/', {'user_id': 'student-2'}))
+        self.assertTrue(response.data['served_from_cache'])
+        result = ResumeAnalysisJobView().run_job(mock.Mock(), analysis_state(), 'file-3', 'student-3')
+        self.assertTrue(result['served_from_cache'])
+
+        self.assertEqual([call.args[2] for call in self.record_analysis.call_args_list],
+                         ['student-1', 'student-2', 'student-3'])
+
+    def test_changing_a_served_response_leaves_the_cache_intact(self):
+        self.analyse()
+        view = Agent.ResumeAnalysisView()
+        served = view.cached_response('key:Python developer with Django projects', 'file-2')
+        served['agent_communications'].append({'agent': 'mongodb'})
+        served['file_info']['chars_extracted'] = 0
+
+        again = view.cached_response('key:Python developer with Django projects', 'file-3')
+        self.assertEqual(len(again['agent_communications']), 5)
+        self.assertGreater(again['file_info']['chars_extracted'], 0)
+        self.assertFalse(self.cache.get('key:Python developer with Django projects')['served_from_cache'])
@@ -1,6 +1,6 @@
 from django.urls import path
 from . import views, scrap
-from .Agent import ResumeAnalysisView
+from .Agent import ResumeAnalysisView, ResumeAnalysisStreamView, ResumeAnalysisJobView, ResumeAnalysisJobStatusView
 
 urlpatterns = [
     # Authentication endpoints
@@ -12,6 +12,9 @@ urlpatterns = [
     
     # Resume analysis endpoints
     path('analyze/resume/', ResumeAnalysisView.as_view(), name='analyze_resume'),
+    path('analyze/resume/stream/', ResumeAnalysisStreamView.as_view(), name='analyze_resume_stream'),
+    path('analyze/resume/jobs/', ResumeAnalysisJobView.as_view(), name='submit_resume_analysis_job'),
+    path('analyze/resume/jobs/<str:job_id>/', ResumeAnalysisJobStatusView.as_view(), name='get_resume_analysis_job'),
     
     # Internships endpoints
     path('internships/', views.get_internships, name='get_internships'),
@@ -862,9 +862,6 @@ def get_internships(request):
         # Refresh data if needed
         refresh_performed = internship_rag.refresh_data()
         
-        # Get all internships from RAG system
-        internships = internship_rag.get_all_internships()
-        
         # Apply filters if provided
         domain = request.GET.get('domain', 'all')
         experience = request.GET.get('experience', 'all')
@@ -872,17 +869,17 @@ def get_internships(request):
         sort_by = request.GET.get('sort_by', 'scraped_at')
         limit = int(request.GET.get('limit', 50))
         
-        # Search filter using RAG if available
+        # Domain and experience filters are lookups in the RAG attribute index
+        criteria = {
+            'domain': domain if domain != 'all' else None,
+            'experience_level': experience if experience != 'all' else None
+        }
+        
+        # Search filter using RAG, scoring only listings that pass the filters
         if search:
-            internships = internship_rag.search_internships(search, limit=limit)
+            internships = internship_rag.search_internships(search, limit=limit, **criteria)
         else:
-            # Filter by domain
-            if domain != 'all':
-                internships = [i for i in internships if domain.lower() in i.get('domain', '').lower()]
-            
-            # Filter by experience level
-            if experience != 'all':
-                internships = [i for i in internships if experience.lower() == i.get('experience_level', '').lower()]
+            internships = internship_rag.filter_by_criteria(**criteria)
         
         # Sort internships
         if sort_by == 'scraped_at':
@@ -1827,46 +1824,22 @@ def scrape_with_user_preferences(request):
         # Import scraper from the scraping module
         from . import scrap
         
-        # Run scraping synchronously
-        async def scrape_with_prefs():
-            all_internships = []
-            scraper = scrap.InternshipScraper()
-
-            for platform in enabled_platforms:
-                try:
-                    if platform == 'indeed':
-                        results = await scraper.scrape_indeed(keyword, location, max_pages)
-                    elif platform == 'linkedin':
-                        results = await scraper.scrape_linkedin(keyword, location, max_pages)
-                    elif platform == 'naukri':
-                        results = await scraper.scrape_naukri(keyword, location, max_pages)
-                    elif platform == 'internshala':
-                        results = await scraper.scrape_internshala(keyword, location, max_pages)
-                    elif platform == 'letsintern':
-                        results = await scraper.scrape_letsintern(keyword, location, max_pages)
-                    else:
-                        continue
-                    
-                    all_internships.extend(results)
-                    logger.info(f"{platform.title()} scraped: {len(results)} jobs")
-                except Exception as e:
-                    logger.error(f"{platform.title()} scraping failed: {e}")
-
-            # Save scraped internships
-            saved_count = scraper.save_internships(all_internships)
-
-            return {
-                'success': True,
-                'internships_scraped': len(all_internships),
-                'internships_saved': saved_count,
-                'platforms_used': enabled_platforms,
-                'keyword': keyword,
-                'location': location
-            }
-
-        # Run async function
-        import asyncio
-        result = asyncio.run(scrape_with_prefs())
+        # Scrape the enabled platforms concurrently
+        scrape_result = scrap.scraping_orchestrator.run(enabled_platforms, keyword, location, max_pages)
+        all_internships = scrape_result['internships']
+        
+        # Save scraped internships
+        saved_count = scrap.scraper.save_internships(all_internships)
+        
+        result = {
+            'success': True,
+            'internships_scraped': len(all_internships),
+            'internships_saved': saved_count,
+            'platforms_used': enabled_platforms,
+            'source_results': scrape_result['sources'],
+            'keyword': keyword,
+            'location': location
+        }
         return Response(result)
 
     except Exception as e:
@@ -1882,66 +1855,21 @@ def get_platform_statistics(request):
     """Get statistics about scraping performance by platform"""
     try:
         from . import scrap
-        scraper = scrap.InternshipScraper()
         
-        # Load internship data
-        data = scraper.load_existing_internships()
-        internships = data.get("internships", [])
+        # Per-source aggregates come from the listing store (one grouped query with the SQLite backend)
+        store = scrap.scraper.listing_store
+        total_internships = store.count()
+        platform_stats = store.source_statistics(datetime.now() - timedelta(days=1))
         
-        # Calculate platform statistics
-        platform_stats = {}
-        total_internships = len(internships)
-        current_date = datetime.now()
-        
-        for internship in internships:
-            source = internship.get('source', 'Unknown')
-            
-            if source not in platform_stats:
-                platform_stats[source] = {
-                    'total_internships': 0,
-                    'recent_24h': 0,
-                    'avg_quality_score': 0,
-                    'unique_companies': set(),
-                    'unique_domains': set(),
-                    'with_valid_links': 0
-                }
-            
-            stats = platform_stats[source]
-            stats['total_internships'] += 1
-            
-            # Count recent scrapes
-            scraped_at = internship.get('scraped_at')
-            if scraped_at:
-                try:
-                    scraped_date = datetime.strptime(scraped_at, '%Y-%m-%d %H:%M:%S')
-                    if (current_date - scraped_date).days < 1:
-                        stats['recent_24h'] += 1
-                except ValueError:
-                    pass
-            
-            # Track unique companies and domains
-            company = internship.get('company')
-            if company and company != 'N/A':
-                stats['unique_companies'].add(company)
-            
-            domain = internship.get('domain')
-            if domain and domain != 'N/A':
-                stats['unique_domains'].add(domain)
-            
-            # Count valid links
-            link = internship.get('link')
-            if link and link not in ['N/A', '', None]:
-                stats['with_valid_links'] += 1
-        
-        # Convert sets to counts and calculate percentages
+        # Calculate percentages
         formatted_stats = {}
         for source, stats in platform_stats.items():
             total = stats['total_internships']
             formatted_stats[source] = {
                 'total_internships': total,
                 'recent_24h': stats['recent_24h'],
-                'unique_companies': len(stats['unique_companies']),
-                'unique_domains': len(stats['unique_domains']),
+                'unique_companies': stats['unique_companies'],
+                'unique_domains': stats['unique_domains'],
                 'with_valid_links': stats['with_valid_links'],
                 'link_percentage': round((stats['with_valid_links'] / total * 100) if total > 0 else 0, 1),
                 'market_share': round((total / total_internships * 100) if total_internships > 0 else 0, 1)
@@ -1974,10 +1902,10 @@ def get_platform_statistics(request):
 def test_scraping(request):
     """Test endpoint to scrape a few internships and check Gemini integration"""
     try:
-        # Import scraper here to avoid circular imports
-        from api.scrap import InternshipScraper
+        # Import scraper here to avoid circular imports; the shared instance owns the browser pool and executor
+        from . import scrap
         
-        scraper = InternshipScraper()
+        scraper = scrap.scraper
         
         # Scrape just a few internships for testing
         logger.info("Starting test scraping...")
@@ -0,0 +1,260 @@
+import copy
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('queued', 'running')
+JOB_FIELDS = ('id', 'status', 'submitted_at', 'started_at', 'finished_at', 'expires_at',
+              'current_step', 'step_progress', 'result', 'error')
+TIMESTAMP_FIELDS = ('submitted_at', 'started_at', 'finished_at', 'expires_at')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    submitted_at REAL,
+    started_at REAL,
+    finished_at REAL,
+    expires_at REAL,
+    current_step TEXT,
+    step_progress INTEGER,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_finished_at ON analysis_jobs(finished_at);
+"""
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobTimeout(Exception):
+    pass
+
+
+class InMemoryJobStore:
+    """Job records in this process only; status polls must reach the process that accepted the job"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict):
+        with self._lock:
+            self._jobs[job['id']] = dict(job)
+
+    def update(self, job_id: str, **fields) -> bool:
+        """Update a job that is still queued or running; finished jobs are never overwritten"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] not in ACTIVE_STATUSES:
+                return False
+            job.update(fields)
+            return True
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return copy.deepcopy(job) if job else None
+
+    def purge(self, finished_before: float):
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job.get('finished_at') and job['finished_at'] < finished_before]:
+                del self._jobs[job_id]
+
+
+class SQLiteJobStore:
+    """Job records in a shared SQLite file, so any worker process can answer status polls"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def create(self, job: Dict):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                f"INSERT INTO analysis_jobs({', '.join(JOB_FIELDS)}) VALUES ({', '.join('?' for _ in JOB_FIELDS)})",
+                [job.get(field) for field in JOB_FIELDS]
+            )
+
+    def update(self, job_id: str, **fields) -> bool:
+        if 'result' in fields:
+            fields['result'] = json.dumps(fields['result'], default=str)
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                f"UPDATE analysis_jobs SET {', '.join(f'{field} = ?' for field in fields)} "
+                f"WHERE id = ? AND status IN ({', '.join('?' for _ in ACTIVE_STATUSES)})",
+                list(fields.values()) + [job_id] + list(ACTIVE_STATUSES)
+            )
+        return cursor.rowcount > 0
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        row = self._connection().execute('SELECT * FROM analysis_jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        if job['result'] is not None:
+            job['result'] = json.loads(job['result'])
+        return job
+
+    def purge(self, finished_before: float):
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM analysis_jobs WHERE finished_at < ?', (finished_before,))
+
+
+class JobContext:
+    """Handed to a running job so it can report progress and stop once its time is up"""
+
+    def __init__(self, store, job_id: str, expires_at: float):
+        self.store = store
+        self.job_id = job_id
+        self.expires_at = expires_at
+
+    def progress(self, current_step: str, step_progress: int):
+        self.store.update(self.job_id, current_step=current_step, step_progress=step_progress)
+
+    def check_timeout(self):
+        if time.time() > self.expires_at:
+            raise JobTimeout('Job exceeded its time limit')
+
+
+class AnalysisJobQueue:
+    """Bounded worker pool for long analyses: submit returns a job id at once and callers poll status.
+
+    At most workers + max_queue_depth jobs are accepted at a time; submit raises JobQueueFull beyond that.
+    A job's timeout counts from submission. Threads cannot be interrupted, so jobs call check_timeout between
+    steps, and a status poll marks an overdue job timed out even if its worker is still busy.
+    """
+
+    def __init__(self, store, workers: int = 2, max_queue_depth: int = 8, job_timeout: float = 300,
+                 result_ttl: float = 3600):
+        self.store = store
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth
+        self.job_timeout = job_timeout
+        self.result_ttl = result_ttl
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analysis-job')
+        self._slots = threading.BoundedSemaphore(workers + max_queue_depth)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable, *args) -> str:
+        """Queue func(context, *args); its return value becomes the job result"""
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFull(f"Analysis queue is full ({self.workers + self.max_queue_depth} jobs in flight)")
+        try:
+            now = time.time()
+            self.store.purge(now - self.result_ttl)
+            job_id = uuid.uuid4().hex
+            self.store.create({
+                'id': job_id,
+                'status': 'queued',
+                'submitted_at': now,
+                'expires_at': now + self.job_timeout,
+                'current_step': 'Queued for analysis...',
+                'step_progress': 0
+            })
+            with self._lock:
+                self._in_flight += 1
+            self.executor.submit(self._run, job_id, now + self.job_timeout, func, args)
+        except Exception:
+            self._slots.release()
+            raise
+        return job_id
+
+    def _run(self, job_id: str, expires_at: float, func: Callable, args):
+        try:
+            context = JobContext(self.store, job_id, expires_at)
+            context.check_timeout()  # Waited in the queue for too long
+            if not self.store.update(job_id, status='running', started_at=time.time()):
+                return  # Already timed out by a status poll
+            result = func(context, *args)
+            self.store.update(job_id, status='completed', finished_at=time.time(), result=result,
+                              current_step='Analysis completed successfully!', step_progress=100)
+        except JobTimeout as e:
+            logger.warning(f"Analysis job {job_id} timed out")
+            self.store.update(job_id, status='timed_out', finished_at=time.time(), error=str(e))
+        except Exception as e:
+            logger.error(f"Analysis job {job_id} failed: {e}")
+            self.store.update(job_id, status='failed', finished_at=time.time(), error=str(e))
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """Job record with ISO timestamps, or None for unknown (or purged) jobs"""
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        if job['status'] in ACTIVE_STATUSES and time.time() > job['expires_at']:
+            # Also covers jobs whose worker process died
+            self.store.update(job_id, status='timed_out', finished_at=time.time(),
+                              error='Job exceeded its time limit')
+            job = self.store.get(job_id)
+        for field in TIMESTAMP_FIELDS:
+            if job.get(field):
+                job[field] = datetime.fromtimestamp(job[field]).isoformat()
+        job['job_id'] = job.pop('id')
+        return job
+
+    def stats(self) -> Dict:
+        return {
+            'workers': self.workers,
+            'max_queue_depth': self.max_queue_depth,
+            'in_flight': self._in_flight,
+            'job_timeout': self.job_timeout
+        }
+
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+def default_analysis_job_queue() -> AnalysisJobQueue:
+    """Process-wide analysis job queue configured from Django settings"""
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            from django.conf import settings
+
+            if getattr(settings, 'ANALYSIS_JOB_BACKEND', 'memory') == 'sqlite':
+                store = SQLiteJobStore(getattr(settings, 'ANALYSIS_JOB_SQLITE_PATH',
+                                               os.path.join(settings.BASE_DIR, 'data', 'analysis_jobs.sqlite3')))
+            else:
+                store = InMemoryJobStore()
+            _default_queue = AnalysisJobQueue(
+                store,
+                workers=getattr(settings, 'ANALYSIS_JOB_WORKERS', 2),
+                max_queue_depth=getattr(settings, 'ANALYSIS_JOB_MAX_QUEUE_DEPTH', 8),
+                job_timeout=getattr(settings, 'ANALYSIS_JOB_TIMEOUT', 300),
+                result_ttl=getattr(settings, 'ANALYSIS_JOB_RESULT_TTL', 3600)
+            )
+        return _default_queue
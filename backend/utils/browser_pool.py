@@ -0,0 +1,154 @@
+import asyncio
+import itertools
+import logging
+import random
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from playwright.async_api import async_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+    async_playwright = None
+
+DEFAULT_USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+]
+LAUNCH_ARGS = ['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
+
+
+class _ContextSlot:
+    """One browser context with its pages and navigation count"""
+
+    def __init__(self, context, user_agent: str, generation: int):
+        self.context = context
+        self.user_agent = user_agent
+        self.generation = generation
+        self.pages = []
+        self.navigations = 0
+        self.parked = 0
+        self.retiring = False
+
+
+class BrowserPool:
+    """One long-lived headless Chromium whose context pages are leased to scrape jobs.
+
+    Each context gets the next user agent in the rotation and is replaced after max_navigations leases,
+    so cookies and fingerprints do not accumulate. Playwright objects belong to one event loop, so the pool
+    only serves the loop it is bound to; leases from any other loop fall back to a throwaway browser.
+    """
+
+    def __init__(self, contexts: int = 3, pages_per_context: int = 2, max_navigations: int = 50,
+                 user_agents: Optional[List[str]] = None):
+        self.contexts = contexts
+        self.pages_per_context = pages_per_context
+        self.max_navigations = max_navigations
+        self.user_agents = list(user_agents or DEFAULT_USER_AGENTS)
+        self._rotation = itertools.cycle(random.sample(self.user_agents, len(self.user_agents)))
+
+        self._loop = None
+        self._start_lock = None
+        self._playwright = None
+        self._browser = None
+        self._idle = None
+        self._generation = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Serve leases on this long-lived loop"""
+        self._loop = loop
+
+    async def _ensure_started(self):
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            if self._browser is not None:
+                logger.warning("Pooled browser disconnected, relaunching")
+            await self._launch()
+
+    async def _launch(self):
+        """Launch (or relaunch) the browser and open every context; leases of an older generation are dropped"""
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+        self._generation += 1
+        self._idle = asyncio.Queue()
+        for _ in range(self.contexts):
+            await self._open_slot()
+        logger.info(f"Browser pool ready with {self.contexts} contexts x {self.pages_per_context} pages")
+
+    async def _open_slot(self):
+        user_agent = next(self._rotation)
+        context = await self._browser.new_context(user_agent=user_agent)
+        slot = _ContextSlot(context, user_agent, self._generation)
+        for _ in range(self.pages_per_context):
+            page = await context.new_page()
+            slot.pages.append(page)
+            self._idle.put_nowait((slot, page))
+
+    async def _park(self, slot: _ContextSlot):
+        """Take a page of a retiring context out of circulation, replacing the context once all are back"""
+        slot.parked += 1
+        if slot.parked < len(slot.pages):
+            return
+        try:
+            await slot.context.close()
+        except Exception as e:
+            logger.debug(f"Error closing recycled browser context: {e}")
+        if slot.generation == self._generation and self._browser.is_connected():
+            await self._open_slot()
+
+    async def _acquire(self):
+        while True:
+            slot, page = await self._idle.get()
+            if slot.retiring:
+                await self._park(slot)
+                continue
+            return slot, page
+
+    @asynccontextmanager
+    async def page(self):
+        """Lease a page; it goes back to the pool (or its context is recycled) when the block exits"""
+        if self._loop is not asyncio.get_running_loop():
+            async with self._standalone_page() as page:
+                yield page
+            return
+
+        await self._ensure_started()
+        slot, page = await self._acquire()
+        try:
+            yield page
+        finally:
+            slot.navigations += 1
+            if slot.generation != self._generation:
+                pass  # The browser was relaunched while this page was leased
+            elif slot.retiring or page.is_closed() or slot.navigations >= self.max_navigations:
+                slot.retiring = True
+                await self._park(slot)
+            else:
+                self._idle.put_nowait((slot, page))
+
+    @asynccontextmanager
+    async def _standalone_page(self):
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True, args=LAUNCH_ARGS)
+            try:
+                context = await browser.new_context(user_agent=random.choice(self.user_agents))
+                yield await context.new_page()
+            finally:
+                await browser.close()
+
+    async def close(self):
+        """Close the browser and the Playwright driver; the next lease relaunches them"""
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
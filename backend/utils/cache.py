@@ -0,0 +1,248 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed_at ON cache_entries(accessed_at);
+"""
+
+
+class CacheCounters:
+    """Size limits, TTL and hit/miss/eviction counters shared by the cache backends"""
+
+    def __init__(self, max_size: int, ttl_seconds: Optional[float]):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expires_at(self, now: float) -> Optional[float]:
+        return now + self.ttl_seconds if self.ttl_seconds else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters suitable for stats endpoints"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class LRUCache(CacheCounters):
+    """Thread-safe in-process cache with least-recently-used eviction, per-entry TTL and hit/miss counters"""
+
+    def __init__(self, max_size: int = 512, ttl_seconds: Optional[float] = 3600):
+        super().__init__(max_size, ttl_seconds)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, counting a miss when it is absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry when full"""
+        expires_at = self._expires_at(time.monotonic())
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry, keeping the counters"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class FileCache(CacheCounters):
+    """JSON-serialisable values stored one file per key, shared by every worker process using the directory.
+
+    A hit touches its file, so eviction removes the files with the oldest modification times.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = 512, ttl_seconds: Optional[float] = 3600):
+        super().__init__(max_size, ttl_seconds)
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: Hashable) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(str(key).encode('utf-8')).hexdigest() + '.json')
+
+    def _entry_paths(self):
+        return [entry.path for entry in os.scandir(self.cache_dir) if entry.name.endswith('.json')]
+
+    def _discard(self, path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False  # Already removed by another worker
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if entry['expires_at'] is None or entry['expires_at'] > time.time():
+                os.utime(path)
+                self.hits += 1
+                return entry['value']
+            self._discard(path)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            self._discard(path)
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        """Write the entry atomically, then remove the least recently used files beyond max_size"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'expires_at': self._expires_at(time.time()), 'value': value}, f, default=str)
+        os.replace(tmp_path, path)
+
+        paths = self._entry_paths()
+        if len(paths) > self.max_size:
+            mtimes = {}
+            for entry_path in paths:
+                try:
+                    mtimes[entry_path] = os.path.getmtime(entry_path)
+                except FileNotFoundError:
+                    pass
+            for entry_path in sorted(mtimes, key=mtimes.get)[:len(mtimes) - self.max_size]:
+                if self._discard(entry_path):
+                    self.evictions += 1
+
+    def clear(self):
+        for entry_path in self._entry_paths():
+            self._discard(entry_path)
+
+    def __len__(self) -> int:
+        return len(self._entry_paths())
+
+
+class SQLiteCache(CacheCounters):
+    """JSON-serialisable values in a SQLite table shared by every worker process, evicted by last access time"""
+
+    def __init__(self, db_path: str, max_size: int = 512, ttl_seconds: Optional[float] = 3600):
+        super().__init__(max_size, ttl_seconds)
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SQLITE_SCHEMA)
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute('SELECT value, expires_at FROM cache_entries WHERE key = ?', (str(key),)).fetchone()
+        if row is not None:
+            value, expires_at = row
+            with conn:
+                if expires_at is None or expires_at > now:
+                    conn.execute('UPDATE cache_entries SET accessed_at = ? WHERE key = ?', (now, str(key)))
+                    self.hits += 1
+                    return json.loads(value)
+                conn.execute('DELETE FROM cache_entries WHERE key = ?', (str(key),))
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        """Store the entry, then delete the least recently accessed rows beyond max_size"""
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entries(key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (str(key), json.dumps(value, default=str), self._expires_at(now), now)
+            )
+            cursor = conn.execute(
+                'DELETE FROM cache_entries WHERE key IN '
+                '(SELECT key FROM cache_entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_size,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+
+    def clear(self):
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM cache_entries')
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+
+
+_default_analysis_cache = None
+_default_analysis_cache_lock = threading.Lock()
+
+
+def default_analysis_cache() -> CacheCounters:
+    """Process-wide cache of whole resume analyses configured from Django settings"""
+    global _default_analysis_cache
+    with _default_analysis_cache_lock:
+        if _default_analysis_cache is None:
+            from django.conf import settings
+
+            backend = getattr(settings, 'ANALYSIS_CACHE_BACKEND', 'memory')
+            max_size = getattr(settings, 'ANALYSIS_CACHE_SIZE', 256)
+            ttl_seconds = getattr(settings, 'ANALYSIS_CACHE_TTL', 86400)
+            if backend == 'file':
+                _default_analysis_cache = FileCache(
+                    getattr(settings, 'ANALYSIS_CACHE_DIR', os.path.join(settings.BASE_DIR, 'data', 'analysis_cache')),
+                    max_size=max_size, ttl_seconds=ttl_seconds
+                )
+            elif backend == 'sqlite':
+                _default_analysis_cache = SQLiteCache(
+                    getattr(settings, 'ANALYSIS_CACHE_SQLITE_PATH',
+                            os.path.join(settings.BASE_DIR, 'data', 'analysis_cache.sqlite3')),
+                    max_size=max_size, ttl_seconds=ttl_seconds
+                )
+            else:
+                _default_analysis_cache = LRUCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        return _default_analysis_cache
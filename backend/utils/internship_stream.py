@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+from typing import Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+    ijson = None
+
+READ_CHUNK_SIZE = 1 << 20  # Characters read from disk per refill
+WHITESPACE = ' \t\n\r'
+
+
+class _StreamReader:
+    """Character buffer over a text file that refills from disk as the decoder consumes it"""
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Drop consumed text and read another chunk, returning False at end of file"""
+        if self.eof:
+            return False
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at character {self.pos} of the current buffer")
+        self.pos += 1
+
+    def decode(self, decoder: json.JSONDecoder):
+        """Decode one JSON value, reading more of the file while the value is incomplete"""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+                # A number at the buffer edge may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+
+def _iter_array_items(f, key: str, chunk_size: int) -> Iterator[Dict]:
+    """Yield the items of the top-level array under key using the stdlib decoder on a sliding buffer"""
+    reader = _StreamReader(f, chunk_size)
+    decoder = json.JSONDecoder()
+
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        name = reader.decode(decoder)
+        reader.expect(':')
+        if name != key:
+            reader.decode(decoder)  # Skip values of other top-level keys
+        else:
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.decode(decoder)
+                    if reader.peek() == ',':
+                        reader.pos += 1
+                        continue
+                    reader.expect(']')
+                    break
+        if reader.peek() != ',':
+            return
+        reader.pos += 1
+
+
+def iter_internships(path: str, key: str = 'internships', chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Dict]:
+    """Yield the listings in an internships.json file one at a time, keeping memory bounded by one chunk"""
+    if not os.path.exists(path):
+        return
+    if IJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, f'{key}.item', use_float=True)
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from _iter_array_items(f, key, chunk_size)
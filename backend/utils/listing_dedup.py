@@ -0,0 +1,319 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from utils.listing_store import FCNTL_AVAILABLE, fcntl
+
+logger = logging.getLogger(__name__)
+
+MINHASH_PRIME = (1 << 31) - 1  # Mersenne prime, keeps (a * x + b) inside uint64
+MINHASH_SEED = 20240601  # Fixed so persisted signatures stay comparable across processes and restarts
+SHINGLE_SIZE = 4
+SIGNATURE_VERSION = 2  # Bumped when what a signature covers changes; older log entries are re-indexed
+
+# Words that vary between sites for the same employer ("Acme Pvt Ltd" vs "Acme")
+COMPANY_SUFFIXES = {'pvt', 'private', 'ltd', 'limited', 'inc', 'llc', 'llp', 'corp', 'corporation', 'co', 'company'}
+
+
+def normalize_text(text) -> str:
+    """Lowercase alphanumeric words separated by single spaces"""
+    if not isinstance(text, str) or text == 'N/A':
+        return ''
+    return ' '.join(re.findall(r'[a-z0-9]+', text.lower()))
+
+
+def normalize_company(company) -> str:
+    return ' '.join(word for word in normalize_text(company).split() if word not in COMPANY_SUFFIXES)
+
+
+def content_key(internship: Dict) -> str:
+    """Normalized title, company and location, the fields that identify a posting across scrapes"""
+    return '|'.join([
+        normalize_text(internship.get('title')),
+        normalize_company(internship.get('company')),
+        normalize_text(internship.get('location'))
+    ])
+
+
+def content_hash(internship: Dict) -> str:
+    """Deterministic digest of the posting content, so rescraping a posting reproduces its id"""
+    return hashlib.sha1(content_key(internship).encode('utf-8')).hexdigest()
+
+
+def near_duplicate_group(internship: Dict) -> str:
+    """Digest of what near duplicates must share exactly: company, location and the numbers in the title"""
+    title_numbers = sorted(re.findall(r'[0-9]+', normalize_text(internship.get('title'))))
+    group = '|'.join([
+        normalize_company(internship.get('company')),
+        normalize_text(internship.get('location')),
+        ' '.join(title_numbers)
+    ])
+    return hashlib.sha1(group.encode('utf-8')).hexdigest()
+
+
+class NearDuplicateIndex:
+    """MinHash signatures of listing titles with an LSH band index, persisted as an append-only JSONL log.
+
+    Exact duplicates are matched by content hash. A listing only counts as a near duplicate when it has the same
+    company, location and title numbers as an indexed one and their titles are nearly identical, so different
+    roles at one employer ("Frontend" vs "Backend Developer Intern") are kept.
+    """
+
+    def __init__(self, path: str, num_perm: int = 64, bands: int = 16, threshold: float = 0.9):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.path = path
+        self.lock_path = path + '.lock'
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.threshold = threshold
+
+        rng = np.random.RandomState(MINHASH_SEED)
+        self._a = rng.randint(1, MINHASH_PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, MINHASH_PRIME, size=num_perm).astype(np.uint64)
+
+        self._thread_lock = threading.RLock()
+        self._reset()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def _reset(self):
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.keys: Dict[str, str] = {}  # content hash -> listing id
+        self._key_by_id: Dict[str, str] = {}
+        self._group_by_id: Dict[str, str] = {}
+        self.buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(self.bands)]
+        self._offset = 0
+        self._inode = None
+        self._log_rows = 0
+        self._stale_rows = 0
+
+    @contextmanager
+    def _locked(self):
+        """Serialise log writes across threads and, where flock exists, across worker processes"""
+        with self._thread_lock:
+            with open(self.lock_path, 'a') as lock_file:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if FCNTL_AVAILABLE:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def signature(self, internship: Dict) -> np.ndarray:
+        """MinHash of the character shingles of the posting's title"""
+        text = normalize_text(internship.get('title'))
+        if len(text) <= SHINGLE_SIZE:
+            shingles = {text}
+        else:
+            shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) % MINHASH_PRIME for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        return ((np.outer(hashes, self._a) + self._b) % MINHASH_PRIME).min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [band.tobytes() for band in signature.reshape(self.bands, self.rows_per_band)]
+
+    def _add(self, listing_id: str, key: str, group: str, signature: np.ndarray):
+        self._remove(listing_id)
+        self.signatures[listing_id] = signature
+        self.keys[key] = listing_id
+        self._key_by_id[listing_id] = key
+        self._group_by_id[listing_id] = group
+        for buckets, band_key in zip(self.buckets, self._band_keys(signature)):
+            buckets.setdefault(band_key, set()).add(listing_id)
+
+    def _remove(self, listing_id: str):
+        signature = self.signatures.pop(listing_id, None)
+        if signature is None:
+            return
+        for buckets, band_key in zip(self.buckets, self._band_keys(signature)):
+            bucket = buckets.get(band_key)
+            if bucket:
+                bucket.discard(listing_id)
+                if not bucket:
+                    del buckets[band_key]
+        self._group_by_id.pop(listing_id, None)
+        key = self._key_by_id.pop(listing_id, None)
+        if self.keys.get(key) == listing_id:
+            del self.keys[key]
+
+    def _apply(self, record: Dict):
+        if record.get('removed'):
+            self._remove(record['id'])
+        elif record.get('version') != SIGNATURE_VERSION or record.get('num_perm') != self.num_perm:
+            self._stale_rows += 1
+        else:
+            self._add(record['id'], record['key'], record['group'], np.asarray(record['sig'], dtype=np.uint32))
+
+    def _refresh(self):
+        """Replay log lines appended by other processes since the last read, or reload after a rewrite"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._reset()
+            self._inode = stat.st_ino
+        if stat.st_size == self._offset:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Partial write from a crashed worker; skipped until completed
+                self._offset += len(line)
+                self._log_rows += 1
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError) as e:
+                    logger.warning(f"Skipping unreadable near-duplicate index entry: {e}")
+
+    def _write(self, records: List[Dict]):
+        if not records:
+            return
+        with open(self.path, 'ab') as f:
+            for record in records:
+                f.write((json.dumps(record) + '\n').encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+            self._inode = os.fstat(f.fileno()).st_ino
+        # Our own lines were applied directly, so skip past them on the next refresh
+        self._offset = os.path.getsize(self.path)
+        self._log_rows += len(records)
+
+    def _record(self, listing_id: str, key: str, group: str, signature: np.ndarray) -> Dict:
+        return {'id': listing_id, 'key': key, 'group': group, 'version': SIGNATURE_VERSION,
+                'num_perm': self.num_perm, 'sig': signature.tolist()}
+
+    def bootstrap(self, listings: Callable[[], Iterable[Dict]]):
+        """Index the existing listings the first time the log is created, or when it holds outdated signatures"""
+        with self._locked():
+            if os.path.exists(self.path):
+                self._refresh()
+                if not self._stale_rows:
+                    return
+                logger.info(f"Re-indexing near-duplicate log with {self._stale_rows} outdated entries")
+            self._reset()
+            for listing in listings():
+                if listing.get('id'):
+                    self._add(listing['id'], content_hash(listing), near_duplicate_group(listing),
+                              self.signature(listing))
+            # Written even when empty so other workers do not bootstrap again
+            self._rewrite()
+        logger.info(f"Indexed {len(self.signatures)} existing internships for near-duplicate detection")
+
+    def find_duplicate(self, internship: Dict, signature: Optional[np.ndarray] = None) -> Optional[str]:
+        """Id of an indexed listing with the same id, the same content, or the same group and a near-identical title"""
+        if internship.get('id') in self.signatures:
+            return internship['id']
+        exact = self.keys.get(content_hash(internship))
+        if exact:
+            return exact
+
+        signature = self.signature(internship) if signature is None else signature
+        group = near_duplicate_group(internship)
+        candidates = set()
+        for buckets, band_key in zip(self.buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(band_key, ()))
+        best_id, best_similarity = None, self.threshold
+        for candidate in candidates:
+            if self._group_by_id.get(candidate) != group:
+                continue
+            similarity = float(np.mean(self.signatures[candidate] == signature))
+            if similarity >= best_similarity:
+                best_id, best_similarity = candidate, similarity
+        return best_id
+
+    def add_unique(self, listings: List[Dict], assign_id: Callable[[Dict], str]) -> Tuple[List[Dict], int]:
+        """Index listings that duplicate neither the index nor each other; returns (new listings, duplicates)"""
+        with self._locked():
+            self._refresh()
+            fresh, records, duplicates = [], [], 0
+            for listing in listings:
+                signature = self.signature(listing)
+                duplicate_of = self.find_duplicate(listing, signature)
+                if duplicate_of:
+                    duplicates += 1
+                    logger.debug(f"Skipping duplicate of {duplicate_of}: {listing.get('title', 'Unknown')}")
+                    continue
+                if not listing.get('id'):
+                    listing['id'] = assign_id(listing)
+                key, group = content_hash(listing), near_duplicate_group(listing)
+                self._add(listing['id'], key, group, signature)
+                records.append(self._record(listing['id'], key, group, signature))
+                fresh.append(listing)
+            self._write(records)
+        return fresh, duplicates
+
+    def remove(self, listing_ids: Iterable[str]):
+        """Drop removed listings from the index so re-posted listings are accepted again"""
+        with self._locked():
+            self._refresh()
+            records = []
+            for listing_id in listing_ids:
+                if listing_id in self.signatures:
+                    self._remove(listing_id)
+                    records.append({'id': listing_id, 'removed': True})
+            self._write(records)
+            if self._log_rows > 2 * max(len(self.signatures), 1000):
+                self._rewrite()
+
+    def _rewrite(self):
+        """Replace the log with one line per live listing; called with the lock held"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            for listing_id, signature in self.signatures.items():
+                record = self._record(listing_id, self._key_by_id.get(listing_id, ''),
+                                      self._group_by_id.get(listing_id, ''), signature)
+                f.write((json.dumps(record) + '\n').encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        stat = os.stat(self.path)
+        self._inode, self._offset, self._log_rows = stat.st_ino, stat.st_size, len(self.signatures)
+        self._stale_rows = 0
+
+    def stats(self) -> Dict:
+        return {
+            'indexed': len(self.signatures),
+            'buckets': sum(len(buckets) for buckets in self.buckets),
+            'log_rows': self._log_rows,
+            'threshold': self.threshold
+        }
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def default_near_duplicate_index() -> NearDuplicateIndex:
+    """Process-wide near-duplicate index stored next to the listing store, bootstrapped from it once"""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            from django.conf import settings
+            from utils.listing_store import default_listing_store
+
+            index = NearDuplicateIndex(
+                getattr(settings, 'NEAR_DUPLICATE_INDEX_PATH',
+                        os.path.join(settings.BASE_DIR, 'data', 'near_duplicates.jsonl')),
+                num_perm=getattr(settings, 'NEAR_DUPLICATE_NUM_PERM', 64),
+                bands=getattr(settings, 'NEAR_DUPLICATE_BANDS', 16),
+                threshold=getattr(settings, 'NEAR_DUPLICATE_THRESHOLD', 0.9)
+            )
+            index.bootstrap(lambda: default_listing_store().iter_listings())
+            _default_index = index
+        return _default_index
@@ -0,0 +1,241 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from utils.listing_store import SCRAPED_AT_FORMAT, ListingQueries
+
+logger = logging.getLogger(__name__)
+
+# Listing fields copied into columns for indexing; the full listing is kept as JSON in `data`
+COLUMNS = ('id', 'title', 'company', 'source', 'domain', 'experience_level', 'location', 'link',
+           'application_deadline', 'scraped_at', 'description', 'skills')
+GROUPABLE_FIELDS = ('source', 'domain', 'experience_level', 'location', 'company')
+FTS_COLUMNS = ('title', 'company', 'domain', 'description', 'skills')
+
+DATE_FORMATS = {'application_deadline': '%Y-%m-%d', 'scraped_at': SCRAPED_AT_FORMAT}
+DEADLINE_GLOB ='[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'
+SCRAPED_AT_GLOB = DEADLINE_GLOB + ' [0-9][0-9]:[0-9][0-9]:[0-9][0-9]'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT UNIQUE,
+    title TEXT,
+    company TEXT,
+    source TEXT,
+    domain TEXT,
+    experience_level TEXT,
+    location TEXT,
+    link TEXT,
+    application_deadline TEXT,
+    scraped_at TEXT,
+    description TEXT,
+    skills TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_listings_deadline ON listings(application_deadline);
+CREATE INDEX IF NOT EXISTS idx_listings_source ON listings(source);
+CREATE INDEX IF NOT EXISTS idx_listings_domain ON listings(domain);
+CREATE INDEX IF NOT EXISTS idx_listings_scraped_at ON listings(scraped_at);
+CREATE INDEX IF NOT EXISTS idx_listings_title_company ON listings(lower(title), lower(company));
+CREATE TABLE IF NOT EXISTS listing_meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+FTS_SCHEMA = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS listings_fts USING fts5(
+    {', '.join(FTS_COLUMNS)}, content='listings', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS listings_fts_insert AFTER INSERT ON listings BEGIN
+    INSERT INTO listings_fts(rowid, {', '.join(FTS_COLUMNS)})
+    VALUES (new.rowid, {', '.join('new.' + column for column in FTS_COLUMNS)});
+END;
+CREATE TRIGGER IF NOT EXISTS listings_fts_delete AFTER DELETE ON listings BEGIN
+    INSERT INTO listings_fts(listings_fts, rowid, {', '.join(FTS_COLUMNS)})
+    VALUES ('delete', old.rowid, {', '.join('old.' + column for column in FTS_COLUMNS)});
+END;
+"""
+
+
+def _column_value(listing: Dict, column: str) -> Optional[str]:
+    if column == 'skills':
+        skills = (listing.get('requirements') or []) + (listing.get('preferred_skills') or [])
+        return ' '.join(str(skill) for skill in skills)
+    value = listing.get(column)
+    if column in DATE_FORMATS and isinstance(value, str):
+        # Zero-pad dates strptime accepts (e.g. '2025-1-5') so they compare correctly as text
+        try:
+            return datetime.strptime(value, DATE_FORMATS[column]).strftime(DATE_FORMATS[column])
+        except ValueError:
+            return value
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+class SQLiteListingRepository(ListingQueries):
+    """Listings in an embedded SQLite database (WAL, FTS5) so expiry, dedup and aggregation are indexed SQL"""
+
+    def __init__(self, db_path: str, seed_listings: Optional[Callable[[], Iterable[Dict]]] = None):
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        try:
+            conn.executescript(FTS_SCHEMA)
+            self.fts_available = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite FTS5 unavailable, text search falls back to scanning: {e}")
+            self.fts_available = False
+        conn.commit()
+
+        if seed_listings is not None:
+            self._seed(seed_listings)
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run alongside the single writer"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _seed(self, seed_listings: Callable[[], Iterable[Dict]]):
+        """Import existing listings once, the first time the database is opened"""
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            if conn.execute("SELECT 1 FROM listing_meta WHERE key = 'seeded'").fetchone():
+                return
+            count = self._insert(conn, seed_listings())
+            conn.execute("INSERT INTO listing_meta(key, value) VALUES ('seeded', ?)", (datetime.now().isoformat(),))
+        if count:
+            logger.info(f"Imported {count} existing internships into {self.db_path}")
+
+    def _insert(self, conn: sqlite3.Connection, listings: Iterable[Dict]) -> int:
+        """Insert listings, replacing any stored listing with the same id"""
+        placeholders = ', '.join('?' for _ in range(len(COLUMNS) + 1))
+        count = 0
+        for listing in listings:
+            if listing.get('id'):
+                # Delete then insert (rather than REPLACE) so the FTS delete trigger fires
+                conn.execute('DELETE FROM listings WHERE id = ?', (listing['id'],))
+            conn.execute(
+                f"INSERT INTO listings({', '.join(COLUMNS)}, data) VALUES ({placeholders})",
+                [_column_value(listing, column) for column in COLUMNS] + [json.dumps(listing, ensure_ascii=False)]
+            )
+            count += 1
+        return count
+
+    def append(self, listings: Iterable[Dict]) -> int:
+        conn = self._connection()
+        with conn:
+            return self._insert(conn, listings)
+
+    def tombstone(self, listing_ids: Iterable[str]) -> int:
+        """Delete listings by id"""
+        listing_ids = [(listing_id,) for listing_id in listing_ids if listing_id]
+        if not listing_ids:
+            return 0
+        conn = self._connection()
+        with conn:
+            conn.executemany('DELETE FROM listings WHERE id = ?', listing_ids)
+        return len(listing_ids)
+
+    def iter_listings(self) -> Iterator[Dict]:
+        for (data,) in self._connection().execute('SELECT data FROM listings ORDER BY rowid'):
+            yield json.loads(data)
+
+    def count(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM listings').fetchone()[0]
+
+    def stats(self) -> Dict:
+        return {
+            'backend': 'sqlite',
+            'stored_rows': self.count(),
+            'fts': self.fts_available,
+            'path': self.db_path
+        }
+
+    def expired_ids(self, current_date: datetime) -> List[str]:
+        # A 'YYYY-MM-DD' deadline (midnight) is before current_date exactly when it sorts before this day
+        bound = ((current_date - timedelta(microseconds=1)).date() + timedelta(days=1)).isoformat()
+        rows = self._connection().execute(
+            'SELECT id FROM listings WHERE application_deadline < ? AND application_deadline GLOB ? '
+            'AND id IS NOT NULL',
+            (bound, DEADLINE_GLOB)
+        )
+        return [listing_id for (listing_id,) in rows]
+
+    def new_listings(self, listings: List[Dict]) -> List[Dict]:
+        conn = self._connection()
+        fresh = []
+        for listing in listings:
+            if listing.get('id') and conn.execute(
+                    'SELECT 1 FROM listings WHERE id = ?', (listing['id'],)).fetchone():
+                continue
+            if conn.execute(
+                    'SELECT 1 FROM listings WHERE lower(title) = ? AND lower(company) = ? LIMIT 1',
+                    ((listing.get('title') or '').lower(), (listing.get('company') or '').lower())).fetchone():
+                continue
+            fresh.append(listing)
+        return fresh
+
+    def count_by(self, field: str) -> Dict[str, int]:
+        if field not in GROUPABLE_FIELDS:
+            return super().count_by(field)
+        rows = self._connection().execute(
+            f"SELECT COALESCE({field}, 'Unknown'), COUNT(*) FROM listings GROUP BY 1"
+        )
+        return dict(rows.fetchall())
+
+    def count_scraped_since(self, since: datetime) -> int:
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM listings WHERE scraped_at > ? AND scraped_at GLOB ?',
+            (since.strftime(SCRAPED_AT_FORMAT), SCRAPED_AT_GLOB)
+        ).fetchone()[0]
+
+    def source_statistics(self, since: datetime) -> Dict[str, Dict]:
+        rows = self._connection().execute(
+            """
+            SELECT COALESCE(source, 'Unknown'),
+                   COUNT(*),
+                   SUM(CASE WHEN scraped_at > ? AND scraped_at GLOB ? THEN 1 ELSE 0 END),
+                   COUNT(DISTINCT CASE WHEN company NOT IN ('', 'N/A') THEN company END),
+                   COUNT(DISTINCT CASE WHEN domain NOT IN ('', 'N/A') THEN domain END),
+                   SUM(CASE WHEN link NOT IN ('', 'N/A') THEN 1 ELSE 0 END)
+            FROM listings GROUP BY 1
+            """,
+            (since.strftime(SCRAPED_AT_FORMAT), SCRAPED_AT_GLOB)
+        )
+        return {
+            source: {
+                'total_internships': total,
+                'recent_24h': recent,
+                'unique_companies': companies,
+                'unique_domains': domains,
+                'with_valid_links': links
+            }
+            for source, total, recent, companies, domains, links in rows
+        }
+
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """Full-text search ranked by FTS5 bm25"""
+        words = re.findall(r'\w+', query.lower())
+        if not self.fts_available or not words:
+            return super().search(query, limit)
+        match = ' '.join(f'"{word}"' for word in words)
+        rows = self._connection().execute(
+            'SELECT listings.data FROM listings_fts JOIN listings ON listings.rowid = listings_fts.rowid '
+            'WHERE listings_fts MATCH ? ORDER BY bm25(listings_fts) LIMIT ?',
+            (match, limit)
+        )
+        return [json.loads(data) for (data,) in rows]
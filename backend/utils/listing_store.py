@@ -0,0 +1,455 @@
+import abc
+import json
+import logging
+import mmap
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from utils.internship_stream import iter_internships
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+    fcntl = None
+
+STORE_FORMAT_VERSION = 1
+
+SCRAPED_AT_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def parse_deadline(internship: Dict) -> Optional[datetime]:
+    """Application deadline as a datetime, or None when it is missing or invalid"""
+    deadline_str = internship.get('application_deadline')
+    if not deadline_str:
+        return None
+    try:
+        return datetime.strptime(deadline_str, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        return None
+
+
+def deadline_passed(internship: Dict, current_date: datetime) -> bool:
+    """Whether the application deadline is before current_date; missing or invalid deadlines never expire"""
+    deadline = parse_deadline(internship)
+    return deadline is not None and deadline < current_date
+
+
+def _has_value(value) -> bool:
+    return bool(value) and value != 'N/A'
+
+
+class ListingQueries(abc.ABC):
+    """Queries over stored listings, answered by a full scan; indexed backends override them"""
+
+    @abc.abstractmethod
+    def iter_listings(self) -> Iterator[Dict]:
+        """Yield every live listing"""
+
+    @abc.abstractmethod
+    def tombstone(self, listing_ids: Iterable[str]) -> int:
+        """Remove listings by id"""
+
+    def count(self) -> int:
+        return sum(1 for _ in self.iter_listings())
+
+    def expired_ids(self, current_date: datetime) -> List[str]:
+        """Ids of listings whose application deadline is before current_date"""
+        return [
+            listing['id'] for listing in self.iter_listings()
+            if listing.get('id') and deadline_passed(listing, current_date)
+        ]
+
+    def expire(self, current_date: datetime) -> List[str]:
+        """Remove listings whose application deadline is before current_date, returning their ids"""
+        expired_ids = self.expired_ids(current_date)
+        self.tombstone(expired_ids)
+        return expired_ids
+
+    def new_listings(self, listings: List[Dict]) -> List[Dict]:
+        """Listings whose id and lowercase (title, company) are not stored yet"""
+        ids = set()
+        titles_companies = set()
+        for listing in self.iter_listings():
+            if listing.get('id'):
+                ids.add(listing['id'])
+            titles_companies.add((listing.get('title', '').lower(), listing.get('company', '').lower()))
+        return [
+            listing for listing in listings
+            if listing.get('id') not in ids
+            and (listing.get('title', '').lower(), listing.get('company', '').lower()) not in titles_companies
+        ]
+
+    def count_by(self, field: str) -> Dict[str, int]:
+        """Listing counts grouped by a field, with missing values counted as 'Unknown'"""
+        counts = {}
+        for listing in self.iter_listings():
+            value = listing.get(field, 'Unknown')
+            counts[value] = counts.get(value, 0) + 1
+        return counts
+
+    def count_scraped_since(self, since: datetime) -> int:
+        """Listings scraped after since"""
+        count = 0
+        for listing in self.iter_listings():
+            try:
+                if datetime.strptime(listing.get('scraped_at') or '', SCRAPED_AT_FORMAT) > since:
+                    count += 1
+            except ValueError:
+                pass
+        return count
+
+    def source_statistics(self, since: datetime) -> Dict[str, Dict]:
+        """Per-source totals, recent scrapes, distinct companies and domains, and listings with links"""
+        sources = {}
+        for listing in self.iter_listings():
+            stats = sources.setdefault(listing.get('source', 'Unknown'), {
+                'total_internships': 0, 'recent_24h': 0, 'companies': set(), 'domains': set(), 'with_valid_links': 0
+            })
+            stats['total_internships'] += 1
+            try:
+                if datetime.strptime(listing.get('scraped_at') or '', SCRAPED_AT_FORMAT) > since:
+                    stats['recent_24h'] += 1
+            except ValueError:
+                pass
+            if _has_value(listing.get('company')):
+                stats['companies'].add(listing['company'])
+            if _has_value(listing.get('domain')):
+                stats['domains'].add(listing['domain'])
+            if _has_value(listing.get('link')):
+                stats['with_valid_links'] += 1
+        return {
+            source: {
+                'total_internships': stats['total_internships'],
+                'recent_24h': stats['recent_24h'],
+                'unique_companies': len(stats['companies']),
+                'unique_domains': len(stats['domains']),
+                'with_valid_links': stats['with_valid_links']
+            }
+            for source, stats in sources.items()
+        }
+
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """Listings containing every query word in their title, company, domain or description"""
+        words = query.lower().split()
+        matches = []
+        for listing in self.iter_listings():
+            text = ' '.join(
+                str(listing.get(field) or '') for field in ('title', 'company', 'domain', 'description')
+            ).lower()
+            if all(word in text for word in words):
+                matches.append(listing)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+
+class ListingStore(ListingQueries):
+    """Append-only JSONL segments plus a manifest of live segments and tombstoned listing ids.
+
+    Each segment entry keeps next_expiry, the earliest deadline among its live rows that had not passed when it
+    was last checked, so expire() only reads segments with a deadline due.
+    """
+
+    def __init__(self, store_dir: str, legacy_path: Optional[str] = None,
+                 max_segments: int = 8, tombstone_ratio: float = 0.2):
+        self.store_dir = store_dir
+        self.legacy_path = legacy_path
+        self.max_segments = max_segments
+        self.tombstone_ratio = tombstone_ratio
+        self.manifest_path = os.path.join(store_dir, 'manifest.json')
+        self.lock_path = os.path.join(store_dir, '.lock')
+        self._thread_lock = threading.RLock()
+        self._compaction_thread = None
+        os.makedirs(store_dir, exist_ok=True)
+        self._import_legacy_file()
+
+    @contextmanager
+    def _locked(self):
+        """Serialise manifest updates across threads and, where flock exists, across worker processes"""
+        with self._thread_lock:
+            with open(self.lock_path, 'a') as lock_file:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if FCNTL_AVAILABLE:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read_manifest(self) -> Dict:
+        """Current manifest, or an empty store"""
+        try:
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                if manifest.get('format_version') == STORE_FORMAT_VERSION:
+                    return manifest
+        except Exception as e:
+            logger.warning(f"Could not read listing store manifest: {e}")
+        return {'format_version': STORE_FORMAT_VERSION, 'segments': [], 'tombstones': {}, 'retired': [], 'next_seq': 1}
+
+    def _write_manifest(self, manifest: Dict):
+        manifest['updated_at'] = datetime.now().isoformat()
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _import_legacy_file(self):
+        """Seed an empty store from the old monolithic internships.json"""
+        if os.path.exists(self.manifest_path) or not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        try:
+            with self._locked():
+                # Another worker may have imported it while we waited for the lock
+                if os.path.exists(self.manifest_path):
+                    return
+                count = self._append_segment(self.read_manifest(), iter_internships(self.legacy_path))
+            logger.info(f"Imported {count} internships from {self.legacy_path} into the listing store")
+        except Exception as e:
+            logger.error(f"Failed to import legacy internships file: {e}")
+
+    def _write_segment(self, name: str, listings: Iterable[Dict]) -> Dict:
+        """Write listings as JSON lines to a temp file and rename it into place; returns its manifest fields"""
+        path = os.path.join(self.store_dir, name)
+        tmp_path = f"{path}.tmp"
+        rows = 0
+        next_expiry = None
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for listing in listings:
+                f.write(json.dumps(listing, ensure_ascii=False))
+                f.write('\n')
+                rows += 1
+                deadline = parse_deadline(listing)
+                if deadline is not None and (next_expiry is None or deadline < next_expiry):
+                    next_expiry = deadline
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return {'rows': rows, 'next_expiry': next_expiry.strftime('%Y-%m-%d') if next_expiry else None}
+
+    def append(self, listings: Iterable[Dict]) -> int:
+        """Write listings as a new segment and publish it in the manifest"""
+        with self._locked():
+            rows = self._append_segment(self.read_manifest(), listings)
+        self.maybe_compact()
+        return rows
+
+    def _append_segment(self, manifest: Dict, listings: Iterable[Dict]) -> int:
+        """Write the next segment and publish it; the caller holds the store lock"""
+        seq = manifest['next_seq']
+        name = f"segment-{seq:06d}.jsonl"
+        written = self._write_segment(name, listings)
+        if not written['rows']:
+            os.remove(os.path.join(self.store_dir, name))
+            return 0
+        manifest['segments'].append(dict(written, name=name, seq=seq))
+        manifest['next_seq'] = seq + 1
+        self._write_manifest(manifest)
+        return written['rows']
+
+    def tombstone(self, listing_ids: Iterable[str]) -> int:
+        """Hide listings from every segment written so far, without rewriting them"""
+        listing_ids = [listing_id for listing_id in listing_ids if listing_id]
+        if not listing_ids:
+            return 0
+        with self._locked():
+            manifest = self.read_manifest()
+            # Later re-appends of the same id stay visible
+            last_seq = manifest['next_seq'] - 1
+            for listing_id in listing_ids:
+                manifest['tombstones'][listing_id] = last_seq
+            self._write_manifest(manifest)
+        self.maybe_compact()
+        return len(listing_ids)
+
+    def expire(self, current_date: datetime) -> List[str]:
+        """Tombstone listings whose deadline passed, reading only the segments whose next_expiry is due"""
+        manifest = self.read_manifest()
+        tombstones = manifest['tombstones']
+        expired_ids = []
+        next_expiries = {}
+        for segment in manifest['segments']:
+            # Segments written before next_expiry was recorded are checked once
+            if 'next_expiry' in segment and (
+                    segment['next_expiry'] is None
+                    or datetime.strptime(segment['next_expiry'], '%Y-%m-%d') >= current_date):
+                continue
+            next_expiry = None
+            for listing in self.iter_listings({'segments': [segment], 'tombstones': tombstones}):
+                deadline = parse_deadline(listing)
+                if deadline is None:
+                    continue
+                if deadline < current_date:
+                    if listing.get('id'):
+                        expired_ids.append(listing['id'])
+                elif next_expiry is None or deadline < next_expiry:
+                    next_expiry = deadline
+            next_expiries[segment['name']] = next_expiry.strftime('%Y-%m-%d') if next_expiry else None
+
+        if not next_expiries:
+            return []
+        with self._locked():
+            manifest = self.read_manifest()
+            last_seq = manifest['next_seq'] - 1
+            for listing_id in expired_ids:
+                manifest['tombstones'][listing_id] = last_seq
+            for segment in manifest['segments']:
+                if segment['name'] in next_expiries:
+                    segment['next_expiry'] = next_expiries[segment['name']]
+            self._write_manifest(manifest)
+        if expired_ids:
+            self.maybe_compact()
+        return expired_ids
+
+    def _iter_segment(self, name: str) -> Iterator[Dict]:
+        """Decode a segment line by line from a read-only memory map"""
+        path = os.path.join(self.store_dir, name)
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for line in iter(mapped.readline, b''):
+                    if line.strip():
+                        yield json.loads(line)
+
+    def iter_listings(self, manifest: Optional[Dict] = None) -> Iterator[Dict]:
+        """Yield live listings in append order"""
+        manifest = manifest or self.read_manifest()
+        tombstones = manifest['tombstones']
+        for segment in manifest['segments']:
+            for listing in self._iter_segment(segment['name']):
+                hidden_through = tombstones.get(listing.get('id'))
+                if hidden_through is None or segment['seq'] > hidden_through:
+                    yield listing
+
+    def stats(self) -> Dict:
+        manifest = self.read_manifest()
+        return {
+            'backend': 'segments',
+            'segments': len(manifest['segments']),
+            'stored_rows': sum(segment['rows'] for segment in manifest['segments']),
+            'tombstones': len(manifest['tombstones']),
+            'updated_at': manifest.get('updated_at')
+        }
+
+    def needs_compaction(self, manifest: Optional[Dict] = None) -> bool:
+        manifest = manifest or self.read_manifest()
+        stored_rows = sum(segment['rows'] for segment in manifest['segments'])
+        return (len(manifest['segments']) > self.max_segments
+                or (stored_rows and len(manifest['tombstones']) > self.tombstone_ratio * stored_rows))
+
+    def maybe_compact(self) -> bool:
+        """Start a background compaction when there are too many segments or tombstones"""
+        if not self.needs_compaction():
+            return False
+        with self._thread_lock:
+            if self._compaction_thread and self._compaction_thread.is_alive():
+                return False
+            self._compaction_thread = threading.Thread(
+                target=self.compact, name="listing-store-compaction", daemon=True
+            )
+            self._compaction_thread.start()
+        return True
+
+    def compact(self) -> bool:
+        """Merge the current segments into one without tombstoned or superseded rows"""
+        try:
+            with self._locked():
+                manifest = self.read_manifest()
+                if not manifest['segments']:
+                    return False
+                merged = manifest['segments']
+                applied = dict(manifest['tombstones'])
+                seq = max(segment['seq'] for segment in merged)
+                name = f"segment-{seq:06d}-compacted-{manifest['next_seq']}.jsonl"
+                manifest['next_seq'] += 1
+                self._write_manifest(manifest)
+
+            # The slow rewrite runs unlocked; appends and tombstones made meanwhile are merged in below.
+            # Two passes keep only ids in memory: find each id's last row, then write those rows.
+            live = {'segments': merged, 'tombstones': applied}
+            last_row = {}
+            for row, listing in enumerate(self.iter_listings(live)):
+                last_row[listing.get('id') or row] = row
+            keep_rows = set(last_row.values())
+            last_row = None
+            written = self._write_segment(
+                name, (listing for row, listing in enumerate(self.iter_listings(live)) if row in keep_rows)
+            )
+            rows = written['rows']
+
+            with self._locked():
+                manifest = self.read_manifest()
+                merged_names = [segment['name'] for segment in merged]
+                current_names = {segment['name'] for segment in manifest['segments']}
+                if not set(merged_names) <= current_names:
+                    # Another process compacted the same segments first
+                    os.remove(os.path.join(self.store_dir, name))
+                    return False
+                remaining = [segment for segment in manifest['segments'] if segment['name'] not in merged_names]
+                manifest['segments'] = [dict(written, name=name, seq=seq)] + remaining
+                manifest['tombstones'] = {
+                    listing_id: hidden_through for listing_id, hidden_through in manifest['tombstones'].items()
+                    if applied.get(listing_id) != hidden_through
+                }
+                # Segments retired by the previous compaction are deleted now, so in-flight readers
+                # that picked up the old manifest can still finish
+                expired = manifest.get('retired', [])
+                manifest['retired'] = merged_names
+                self._write_manifest(manifest)
+
+            for segment_name in expired:
+                try:
+                    os.remove(os.path.join(self.store_dir, segment_name))
+                except FileNotFoundError:
+                    pass
+            logger.info(f"Compacted {len(merged)} listing segments into {name} ({rows} rows)")
+            return True
+
+        except Exception as e:
+            logger.error(f"Listing store compaction failed: {e}")
+            return False
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def default_listing_store() -> ListingQueries:
+    """Process-wide listing store configured from Django settings, seeded from data/internships.json"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            from django.conf import settings
+            store_dir = getattr(settings, 'LISTING_STORE_DIR', os.path.join(settings.BASE_DIR, 'data', 'listings'))
+            legacy_path = os.path.join(settings.BASE_DIR, 'data', 'internships.json')
+            
+            if getattr(settings, 'LISTING_BACKEND', 'segments') == 'sqlite':
+                from utils.listing_repository import SQLiteListingRepository
+                
+                def seed_listings():
+                    # Carry over listings from the segment store when switching backends
+                    if os.path.exists(os.path.join(store_dir, 'manifest.json')):
+                        return ListingStore(store_dir).iter_listings()
+                    return iter_internships(legacy_path)
+                
+                _default_store = SQLiteListingRepository(
+                    getattr(settings, 'LISTING_SQLITE_PATH', os.path.join(settings.BASE_DIR, 'data', 'listings.sqlite3')),
+                    seed_listings=seed_listings
+                )
+            else:
+                _default_store = ListingStore(
+                    store_dir,
+                    legacy_path=legacy_path,
+                    max_segments=getattr(settings, 'LISTING_STORE_MAX_SEGMENTS', 8),
+                    tombstone_ratio=getattr(settings, 'LISTING_STORE_TOMBSTONE_RATIO', 0.2)
+                )
+        return _default_store
@@ -223,7 +223,8 @@ class MongoDBService:
                 "overall_readiness_score": self._calculate_overall_score(analysis_data),
                 "total_internships_matched": len(analysis_data.get("internship_recommendations", [])),
                 "total_gaps_detected": len(analysis_data.get("portfolio_gaps", [])),
-                "analysis_summary": self._generate_analysis_summary(analysis_data)
+                "analysis_summary": self._generate_analysis_summary(analysis_data),
+                "served_from_cache": analysis_data.get("served_from_cache", False)
             }
             
             # Insert document
@@ -318,6 +319,7 @@ class MongoDBService:
                     "total_internships_matched": doc.get("total_internships_matched", 0),
                     "total_gaps_detected": doc.get("total_gaps_detected", 0),
                     "analysis_summary": doc.get("analysis_summary", ""),
+                    "served_from_cache": doc.get("served_from_cache", False),
                     "github_username": github_analysis.get("username"),
                     "primary_skills": student_profile.get("skills", [])[:5],
                     "domains": student_profile.get("domains", []),
@@ -0,0 +1,98 @@
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Listing fields that get an inverted index
+ATTRIBUTE_FIELDS = ('domain', 'experience_level', 'location', 'source', 'company')
+
+
+class AttributeIndex:
+    """Inverted indexes from structured listing attributes to sorted row numbers"""
+
+    def __init__(self, fields: Iterable[str] = ATTRIBUTE_FIELDS):
+        self.fields = tuple(fields)
+        self._rows: Dict[str, Dict[str, List[int]]] = {field: {} for field in self.fields}
+        self._postings: Dict[str, Dict[str, np.ndarray]] = {field: {} for field in self.fields}
+        self._lock = threading.Lock()
+        self.indexed_rows = 0
+
+    @classmethod
+    def build(cls, listings: Iterable[Dict], fields: Iterable[str] = ATTRIBUTE_FIELDS) -> 'AttributeIndex':
+        """Index every listing, in row order"""
+        index = cls(fields)
+        index.append(listings, 0)
+        return index
+
+    def append(self, listings: Iterable[Dict], start_row: int):
+        """Index listings appended at start_row onwards"""
+        with self._lock:
+            end_row = start_row
+            for row, listing in enumerate(listings, start=start_row):
+                for field in self.fields:
+                    value = listing.get(field) or ''
+                    self._rows[field].setdefault(str(value), []).append(row)
+                end_row = row + 1
+            self.indexed_rows = max(self.indexed_rows, end_row)
+            # Posting arrays are rebuilt lazily from the row lists on the next lookup
+            self._postings = {field: {} for field in self.fields}
+
+    def copy(self) -> 'AttributeIndex':
+        """Independent copy to append to while lookups keep using this one"""
+        index = AttributeIndex(self.fields)
+        with self._lock:
+            index._rows = {field: {value: list(rows) for value, rows in values.items()}
+                           for field, values in self._rows.items()}
+            index.indexed_rows = self.indexed_rows
+        return index
+
+    def values(self, field: str) -> List[str]:
+        """Distinct values seen for a field"""
+        return [value for value in self._rows[field] if value]
+
+    def _posting(self, field: str, value: str) -> np.ndarray:
+        postings = self._postings[field]
+        posting = postings.get(value)
+        if posting is None:
+            posting = np.asarray(self._rows[field].get(value, []), dtype=np.int64)
+            postings[value] = posting
+        return posting
+
+    def match(self, field: str, value: str, lookup: str = 'iexact') -> np.ndarray:
+        """Rows whose field matches value with an 'exact', 'iexact' or 'icontains' lookup"""
+        with self._lock:
+            if lookup == 'exact':
+                return self._posting(field, value)
+
+            needle = value.lower()
+            if lookup == 'iexact':
+                keys = [key for key in self._rows[field] if key.lower() == needle]
+            elif lookup == 'icontains':
+                keys = [key for key in self._rows[field] if needle in key.lower()]
+            else:
+                raise ValueError(f"Unsupported lookup: {lookup}")
+
+            # Distinct values are few, so matching runs over keys rather than rows
+            if not keys:
+                return np.zeros(0, dtype=np.int64)
+            if len(keys) == 1:
+                return self._posting(field, keys[0])
+            return np.unique(np.concatenate([self._posting(field, key) for key in keys]))
+
+    def filter(self, criteria: Dict[str, tuple], active_mask: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Intersect the postings for {field: (value, lookup)} criteria, or None when nothing filters"""
+        rows = None
+        for field, (value, lookup) in criteria.items():
+            if not value:
+                continue
+            matched = self.match(field, value, lookup)
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+            if not len(rows):
+                break
+
+        if rows is None:
+            return None
+        if active_mask is not None:
+            rows = rows[rows < len(active_mask)]
+            rows = rows[active_mask[rows]]
+        return rows
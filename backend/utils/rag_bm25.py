@@ -0,0 +1,136 @@
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+
+from utils.rag_retrieval import top_k_indices
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of a term occurrence in each listing field
+DEFAULT_FIELD_WEIGHTS = {
+    'title': 3.0,
+    'skills': 2.5,
+    'domain': 2.0,
+    'tags': 1.5,
+    'company': 1.0,
+    'description': 1.0,
+    'responsibilities': 0.8,
+    'experience_level': 0.5,
+}
+
+
+def listing_fields(internship: Dict) -> Dict[str, str]:
+    """Split a listing into the text fields BM25F weights separately"""
+    return {
+        'title': internship.get('title', '') or '',
+        'skills': ' '.join((internship.get('requirements') or []) + (internship.get('preferred_skills') or [])),
+        'domain': internship.get('domain', '') or '',
+        'tags': ' '.join(tag.replace('_', ' ') for tag in (internship.get('tags') or [])),
+        'company': internship.get('company', '') or '',
+        'description': internship.get('description', '') or '',
+        'responsibilities': ' '.join(internship.get('responsibilities') or []),
+        'experience_level': internship.get('experience_level', '') or '',
+    }
+
+
+class BM25FIndex:
+    """Field-weighted BM25 over term posting lists, so queries only touch the rows containing their terms"""
+
+    def __init__(self, field_weights: Optional[Dict[str, float]] = None, k1: float = 1.2, b: float = 0.75):
+        self.field_weights = field_weights or DEFAULT_FIELD_WEIGHTS
+        self.k1 = k1
+        self.b = b
+        self.counter = None
+        self.avg_lengths: Dict[str, float] = {}
+        self.postings = None  # Rows x terms CSC, so each column is a term's posting list of weighted frequencies
+        self._lock = threading.Lock()
+
+    def build(self, listings: List[Dict]):
+        """Fit the vocabulary and precompute weighted term frequencies for every row"""
+        fields = [listing_fields(listing) for listing in listings]
+        self.counter = CountVectorizer(stop_words='english')
+        self.counter.fit(' '.join(field.values()) for field in fields)
+
+        counts = {name: self.counter.transform([field[name] for field in fields]) for name in self.field_weights}
+        self.avg_lengths = {
+            name: max(float(matrix.sum()) / max(matrix.shape[0], 1), 1.0) for name, matrix in counts.items()
+        }
+        self.postings = self._weighted_frequencies(counts).tocsc()
+        logger.info(f"Built BM25F index with {len(self.counter.vocabulary_)} terms over {len(listings)} rows")
+
+    def copy(self) -> 'BM25FIndex':
+        """Copy sharing the fitted vocabulary and postings; append replaces the postings rather than editing them"""
+        index = BM25FIndex(self.field_weights, self.k1, self.b)
+        index.counter = self.counter
+        index.avg_lengths = self.avg_lengths
+        with self._lock:
+            index.postings = self.postings
+        return index
+
+    def append(self, listings: List[Dict]):
+        """Add rows using the frozen vocabulary and average field lengths"""
+        if self.counter is None or not listings:
+            return
+
+        fields = [listing_fields(listing) for listing in listings]
+        counts = {name: self.counter.transform([field[name] for field in fields]) for name in self.field_weights}
+        new_rows = self._weighted_frequencies(counts)
+        with self._lock:
+            self.postings = sp.vstack([self.postings.tocsr(), new_rows], format='csr').tocsc()
+
+    def _weighted_frequencies(self, counts: Dict[str, sp.csr_matrix]) -> sp.csr_matrix:
+        """Sum of per-field term counts, each length-normalised and scaled by its field weight"""
+        total = None
+        for name, matrix in counts.items():
+            lengths = np.asarray(matrix.sum(axis=1)).ravel()
+            norm = 1.0 - self.b + self.b * lengths / self.avg_lengths[name]
+            weighted = sp.diags(self.field_weights[name] / norm) @ matrix.astype(np.float32)
+            total = weighted if total is None else total + weighted
+        return sp.csr_matrix(total, dtype=np.float32)
+
+    @property
+    def rows(self) -> int:
+        return self.postings.shape[0] if self.postings is not None else 0
+
+    def search(self, query: str, k: int, active_mask: np.ndarray, candidate_rows: Optional[np.ndarray] = None,
+               min_score: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Top k rows for the query, with scores normalised to [0, 1) by the query's total IDF"""
+        empty = np.zeros(0, dtype=np.int64), np.zeros(0)
+        if self.counter is None:
+            return empty
+
+        vocabulary = self.counter.vocabulary_
+        term_ids = sorted({vocabulary[token] for token in self.counter.build_analyzer()(query) if token in vocabulary})
+        if not term_ids:
+            return empty
+
+        postings = self.postings
+        n_rows = postings.shape[0]
+        indptr, indices, data = postings.indptr, postings.indices, postings.data
+
+        row_chunks, score_chunks = [], []
+        idf_total = 0.0
+        for term_id in term_ids:
+            start, end = indptr[term_id], indptr[term_id + 1]
+            doc_freq = end - start
+            idf = np.log(1.0 + (n_rows - doc_freq + 0.5) / (doc_freq + 0.5))
+            idf_total += idf
+            frequencies = data[start:end]
+            row_chunks.append(indices[start:end])
+            score_chunks.append(idf * frequencies / (self.k1 + frequencies))
+
+        rows, inverse = np.unique(np.concatenate(row_chunks), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_chunks)) / idf_total
+
+        eligible = np.zeros(len(rows), dtype=bool)
+        in_mask = rows < len(active_mask)
+        eligible[in_mask] = active_mask[rows[in_mask]]
+        if candidate_rows is not None:
+            eligible &= np.isin(rows, candidate_rows, assume_unique=True)
+
+        order = top_k_indices(scores, k, mask=eligible, min_score=min_score)
+        return rows[order], scores[order]
@@ -0,0 +1,175 @@
+import glob
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.metrics.pairwise import cosine_similarity
+
+from utils.rag_retrieval import top_k_indices
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class DenseVectors:
+    """Read-only float16 embedding rows: a shared memory-mapped base plus rows appended in this process"""
+
+    def __init__(self, base: np.ndarray, appended: Optional[np.ndarray] = None):
+        self.base = base
+        self.appended = appended if appended is not None else np.zeros((0, base.shape[1]), dtype=np.float16)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.base.shape[0] + self.appended.shape[0], self.base.shape[1]
+
+    def append(self, embeddings: np.ndarray) -> 'DenseVectors':
+        """Return a new view with extra rows, leaving this one untouched for concurrent readers"""
+        appended = np.concatenate([self.appended, embeddings.astype(np.float16)])
+        return DenseVectors(self.base, appended)
+
+    def rows(self, row_numbers: np.ndarray) -> np.ndarray:
+        """Materialise the given rows as float16"""
+        base_rows = self.base.shape[0]
+        result = np.empty((len(row_numbers), self.shape[1]), dtype=np.float16)
+        in_base = row_numbers < base_rows
+        result[in_base] = self.base[row_numbers[in_base]]
+        result[~in_base] = self.appended[row_numbers[~in_base] - base_rows]
+        return result
+
+    def scores(self, query_embeddings: np.ndarray, chunk_rows: int = 16384) -> np.ndarray:
+        """Cosine scores of every row against every (normalised) query, as a queries x rows matrix"""
+        queries = query_embeddings.astype(np.float32).T
+        base_rows = self.base.shape[0]
+        scores = np.empty((queries.shape[1], self.shape[0]), dtype=np.float32)
+
+        # float16 has no BLAS path, so upcast the mapped rows a chunk at a time
+        for start in range(0, base_rows, chunk_rows):
+            block = np.asarray(self.base[start:start + chunk_rows], dtype=np.float32)
+            scores[:, start:start + len(block)] = (block @ queries).T
+        if len(self.appended):
+            scores[:, base_rows:] = (self.appended.astype(np.float32) @ queries).T
+        return scores
+
+
+class DenseEmbeddingStore:
+    """Local sentence-embedding model plus an on-disk float16 matrix that worker processes memory-map"""
+
+    def __init__(self, store_dir: str, model_name: str, batch_size: int = 64):
+        self.store_dir = store_dir
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.meta_path = os.path.join(store_dir, 'embeddings.json')
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return SENTENCE_TRANSFORMERS_AVAILABLE
+
+    def _get_model(self):
+        """Load the embedding model on first use, pinned to the CPU"""
+        with self._model_lock:
+            if self._model is None:
+                self._model = SentenceTransformer(self.model_name, device='cpu')
+                logger.info(f"Loaded sentence embedding model {self.model_name}")
+            return self._model
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """L2-normalised float32 embeddings for the texts"""
+        return self._get_model().encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        ).astype(np.float32)
+
+    def load(self, content_hash: str) -> Optional[DenseVectors]:
+        """Memory-map the stored embeddings if they were built from the same content and model"""
+        try:
+            if not os.path.exists(self.meta_path):
+                return None
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('content_hash') != content_hash or meta.get('model') != self.model_name:
+                return None
+
+            base = np.memmap(
+                os.path.join(self.store_dir, meta['file']), dtype=np.float16, mode='r', shape=tuple(meta['shape'])
+            )
+            return DenseVectors(base)
+
+        except Exception as e:
+            logger.warning(f"Failed to load dense embeddings: {e}")
+            return None
+
+    def build(self, content_hash: str, texts: List[str]) -> DenseVectors:
+        """Encode all texts and persist them, reusing the stored matrix when it is current"""
+        vectors = self.load(content_hash)
+        if vectors is not None:
+            return vectors
+
+        return self.save(content_hash, self.encode(texts))
+
+    def save(self, content_hash: str, embeddings: np.ndarray) -> DenseVectors:
+        """Write embeddings to a per-version file and point the metadata at it"""
+        os.makedirs(self.store_dir, exist_ok=True)
+        file_name = f"embeddings-{content_hash[:16]}.f16"
+        path = os.path.join(self.store_dir, file_name)
+
+        # Each version gets its own file, so workers still mapping an old version are unaffected
+        tmp_path = f"{path}.tmp"
+        matrix = np.memmap(tmp_path, dtype=np.float16, mode='w+', shape=embeddings.shape)
+        matrix[:] = embeddings.astype(np.float16)
+        matrix.flush()
+        del matrix
+        os.replace(tmp_path, path)
+
+        meta = {
+            'content_hash': content_hash,
+            'model': self.model_name,
+            'file': file_name,
+            'shape': list(embeddings.shape),
+            'created_at': datetime.now().isoformat()
+        }
+        tmp_meta_path = f"{self.meta_path}.tmp"
+        with open(tmp_meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta_path, self.meta_path)
+
+        # Unlinking is safe while other processes still have the old file mapped
+        for old_path in glob.glob(os.path.join(self.store_dir, 'embeddings-*.f16')):
+            if os.path.basename(old_path) != file_name:
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+
+        logger.info(f"Saved {embeddings.shape[0]} dense embeddings ({content_hash[:12]})")
+        return self.load(content_hash)
+
+
+def hybrid_search_batch(query_vectors: sp.spmatrix, query_embeddings: np.ndarray, matrix: sp.spmatrix,
+                        dense_vectors: DenseVectors, active_mask: np.ndarray, k: int, dense_weight: float,
+                        min_score: Optional[float] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Blend TF-IDF and dense cosine scores for every query and select the top k active rows"""
+    sparse_scores = cosine_similarity(query_vectors, matrix)
+    dense_scores = dense_vectors.scores(query_embeddings)
+    rows = min(sparse_scores.shape[1], dense_scores.shape[1])
+    scores = (1.0 - dense_weight) * sparse_scores[:, :rows] + dense_weight * dense_scores[:, :rows]
+
+    results = []
+    for query_scores in scores:
+        top_rows = top_k_indices(query_scores, k, mask=active_mask, min_score=min_score)
+        results.append((top_rows, query_scores[top_rows]))
+    return results
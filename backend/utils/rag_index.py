@@ -0,0 +1,288 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the on-disk layout changes so stale snapshots are ignored
+SNAPSHOT_FORMAT_VERSION = 2
+
+DIGEST_SIZE = hashlib.sha256().digest_size
+
+
+class ListingTable:
+    """Read-only sequence of listings stored as JSON lines in a memory-mapped blob, decoded on access"""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray, appended: Optional[List[Dict]] = None):
+        self.blob = blob
+        self.offsets = offsets
+        self.appended = appended or []
+
+    @classmethod
+    def write(cls, listings: List[Dict], blob_path: str, offsets_path: str):
+        """Serialise listings into a blob file plus an offsets array"""
+        offsets = np.zeros(len(listings) + 1, dtype=np.int64)
+        with open(blob_path, 'wb') as f:
+            for row, listing in enumerate(listings):
+                encoded = json.dumps(listing, ensure_ascii=False).encode('utf-8')
+                f.write(encoded)
+                offsets[row + 1] = offsets[row] + len(encoded)
+        np.save(offsets_path, offsets)
+
+    @classmethod
+    def open(cls, blob_path: str, offsets_path: str) -> 'ListingTable':
+        """Memory-map a table written by write()"""
+        offsets = np.load(offsets_path, mmap_mode='r')
+        if offsets[-1] == 0:
+            blob = np.zeros(0, dtype=np.uint8)
+        else:
+            blob = np.memmap(blob_path, dtype=np.uint8, mode='r')
+        return cls(blob, offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1 + len(self.appended)
+
+    def __getitem__(self, row: int) -> Dict:
+        stored_rows = len(self.offsets) - 1
+        if row < 0:
+            row += len(self)
+        if row >= stored_rows:
+            return self.appended[row - stored_rows]
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return json.loads(self.blob[start:end].tobytes().decode('utf-8'))
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+    def __add__(self, listings: List[Dict]) -> 'ListingTable':
+        """New table sharing the mapped rows with extra in-memory listings appended"""
+        return ListingTable(self.blob, self.offsets, self.appended + list(listings))
+
+    def copy(self) -> List[Dict]:
+        return list(self)
+
+
+class IndexSnapshot:
+    """Everything needed to serve a snapshot: fitted vectorizer, CSR matrix, listings and per-row digests"""
+
+    def __init__(self, content_hash: str, vectorizer: TfidfVectorizer, matrix: sp.csr_matrix,
+                 listings: ListingTable, digests: np.ndarray, ids: List[str], created_at: Optional[str],
+                 retrieval: Optional[Dict] = None):
+        self.content_hash = content_hash
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.listings = listings
+        self.digests = digests
+        self.ids = ids
+        self.created_at = created_at
+        self.retrieval = retrieval  # Retriever structures from export(), so workers need not rebuild them
+
+
+class TfidfIndexSnapshot:
+    """Versioned on-disk snapshot of a fitted TF-IDF index that worker processes share through mmap"""
+
+    def __init__(self, index_dir: str, vectorizer_params: Dict):
+        self.index_dir = index_dir
+        self.vectorizer_params = vectorizer_params
+        self.manifest_path = os.path.join(index_dir, 'manifest.json')
+
+    def new_vectorizer(self) -> TfidfVectorizer:
+        """Create an unfitted vectorizer with the snapshot parameters"""
+        params = dict(self.vectorizer_params)
+        if 'ngram_range' in params:
+            params['ngram_range'] = tuple(params['ngram_range'])
+        return TfidfVectorizer(**params)
+    
+    def fit_transform_chunked(self, texts: List[str], chunk_size: int = 5000):
+        """Fit the vectorizer on a stream of texts, then transform them in chunks of chunk_size.
+
+        Fitting is left to TfidfVectorizer so every parameter (min_df, max_df, max_features ties, sublinear_tf,
+        ...) behaves exactly as in fit_transform; only the transform is split to bound its intermediate matrices.
+        """
+        vectorizer = self.new_vectorizer()
+        vectorizer.fit(iter(texts))
+        chunks = [vectorizer.transform(texts[start:start + chunk_size]) for start in range(0, len(texts), chunk_size)]
+        matrix = sp.vstack(chunks, format='csr') if chunks else sp.csr_matrix((0, len(vectorizer.vocabulary_)))
+        return vectorizer, matrix
+
+    @staticmethod
+    def text_digest(text: str) -> bytes:
+        """Digest of a single listing text, cached per row so hashes can be recomputed cheaply"""
+        return hashlib.sha256(text.encode('utf-8')).digest()
+
+    @staticmethod
+    def digest_array(digests: Iterable[bytes]) -> np.ndarray:
+        """Pack row digests into a compact rows x DIGEST_SIZE byte array"""
+        return np.frombuffer(b''.join(digests), dtype=np.uint8).reshape(-1, DIGEST_SIZE)
+
+    def compute_content_hash(self, digests: np.ndarray) -> str:
+        """Hash the ordered listing digests together with the vectorizer parameters"""
+        hasher = hashlib.sha256()
+        hasher.update(f"v{SNAPSHOT_FORMAT_VERSION}".encode('utf-8'))
+        hasher.update(json.dumps(self.vectorizer_params, sort_keys=True).encode('utf-8'))
+        hasher.update(np.ascontiguousarray(digests, dtype=np.uint8).tobytes())
+        return hasher.hexdigest()
+
+    def read_manifest(self) -> Optional[Dict]:
+        """Read the snapshot manifest if one exists"""
+        try:
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read TF-IDF snapshot manifest: {e}")
+        return None
+
+    def current_hash(self) -> Optional[str]:
+        """Content hash of the snapshot the manifest currently points at"""
+        manifest = self.read_manifest()
+        if manifest and manifest.get('format_version') == SNAPSHOT_FORMAT_VERSION:
+            return manifest.get('content_hash')
+        return None
+
+    def load(self, content_hash: Optional[str] = None) -> Optional[IndexSnapshot]:
+        """Memory-map the current snapshot, optionally only if it was built from the given content"""
+        manifest = self.read_manifest()
+        if not manifest or manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+            return None
+        if content_hash is not None and manifest.get('content_hash') != content_hash:
+            return None
+
+        try:
+            segment_dir = os.path.join(self.index_dir, manifest['segment'])
+
+            with open(os.path.join(segment_dir, 'vocabulary.json'), 'r', encoding='utf-8') as f:
+                vocabulary_data = json.load(f)
+            with open(os.path.join(segment_dir, 'ids.json'), 'r', encoding='utf-8') as f:
+                ids = json.load(f)
+
+            # Loaded read-only with mmap_mode, so every worker shares the page cache copy
+            data = np.load(os.path.join(segment_dir, 'data.npy'), mmap_mode='r')
+            indices = np.load(os.path.join(segment_dir, 'indices.npy'), mmap_mode='r')
+            indptr = np.load(os.path.join(segment_dir, 'indptr.npy'), mmap_mode='r')
+            matrix = sp.csr_matrix((data, indices, indptr), shape=tuple(manifest['shape']), copy=False)
+            if matrix.nnz != manifest.get('nnz'):
+                logger.warning("TF-IDF snapshot matrix does not match manifest, ignoring snapshot")
+                return None
+
+            listings = ListingTable.open(
+                os.path.join(segment_dir, 'listings.jsonl'), os.path.join(segment_dir, 'listing_offsets.npy')
+            )
+            digests = np.load(os.path.join(segment_dir, 'digests.npy'), mmap_mode='r')
+            if len(listings) != matrix.shape[0] or len(digests) != matrix.shape[0] or len(ids) != matrix.shape[0]:
+                logger.warning("TF-IDF snapshot listings do not match manifest, ignoring snapshot")
+                return None
+
+            vectorizer = self.new_vectorizer()
+            vectorizer.vocabulary_ = {term: int(index) for term, index in vocabulary_data['vocabulary'].items()}
+            vectorizer.idf_ = np.asarray(vocabulary_data['idf'], dtype=np.float64)
+
+            return IndexSnapshot(
+                manifest['content_hash'], vectorizer, matrix, listings, digests, ids, manifest.get('created_at'),
+                self._load_retrieval(segment_dir)
+            )
+
+        except Exception as e:
+            logger.warning(f"Failed to load TF-IDF snapshot: {e}")
+            return None
+
+    def _load_retrieval(self, segment_dir: str) -> Optional[Dict]:
+        """Memory-map the retriever arrays stored with a segment, if any"""
+        meta_path = os.path.join(segment_dir, 'retrieval.json')
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                retrieval = json.load(f)
+            retrieval['arrays'] = {
+                name: np.load(os.path.join(segment_dir, f'retrieval-{name}.npy'), mmap_mode='r')
+                for name in retrieval.pop('array_names')
+            }
+            return retrieval
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable retrieval structures in snapshot: {e}")
+            return None
+
+    def save(self, content_hash: str, vectorizer: TfidfVectorizer, matrix: sp.spmatrix,
+             listings: List[Dict], digests: np.ndarray, retrieval: Optional[Dict] = None) -> bool:
+        """Write a complete segment directory, rename it into place, then repoint the manifest"""
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            matrix = sp.csr_matrix(matrix)
+
+            segment = f"segment-{content_hash[:16]}-{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+            segment_dir = os.path.join(self.index_dir, segment)
+            tmp_dir = f"{segment_dir}.tmp"
+            os.makedirs(tmp_dir)
+
+            vocabulary_data = {
+                'content_hash': content_hash,
+                'vocabulary': {term: int(index) for term, index in vectorizer.vocabulary_.items()},
+                'idf': vectorizer.idf_.tolist()
+            }
+            with open(os.path.join(tmp_dir, 'vocabulary.json'), 'w', encoding='utf-8') as f:
+                json.dump(vocabulary_data, f, ensure_ascii=False)
+            with open(os.path.join(tmp_dir, 'ids.json'), 'w', encoding='utf-8') as f:
+                json.dump([listing.get('id') for listing in listings], f, ensure_ascii=False)
+
+            np.save(os.path.join(tmp_dir, 'data.npy'), matrix.data)
+            np.save(os.path.join(tmp_dir, 'indices.npy'), matrix.indices)
+            np.save(os.path.join(tmp_dir, 'indptr.npy'), matrix.indptr)
+            np.save(os.path.join(tmp_dir, 'digests.npy'), np.ascontiguousarray(digests, dtype=np.uint8))
+            ListingTable.write(
+                listings, os.path.join(tmp_dir, 'listings.jsonl'), os.path.join(tmp_dir, 'listing_offsets.npy')
+            )
+            if retrieval:
+                arrays = retrieval['arrays']
+                for name, array in arrays.items():
+                    np.save(os.path.join(tmp_dir, f'retrieval-{name}.npy'), array)
+                meta = {key: value for key, value in retrieval.items() if key != 'arrays'}
+                meta['array_names'] = list(arrays)
+                with open(os.path.join(tmp_dir, 'retrieval.json'), 'w', encoding='utf-8') as f:
+                    json.dump(meta, f)
+            os.replace(tmp_dir, segment_dir)
+
+            manifest = {
+                'format_version': SNAPSHOT_FORMAT_VERSION,
+                'content_hash': content_hash,
+                'segment': segment,
+                'vectorizer_params': self.vectorizer_params,
+                'shape': list(matrix.shape),
+                'nnz': int(matrix.nnz),
+                'created_at': datetime.now().isoformat()
+            }
+            previous = self.read_manifest() or {}
+            self._atomic_write_json(self.manifest_path, manifest)
+            self._remove_old_segments(keep={segment, previous.get('segment')})
+
+            logger.info(f"Saved TF-IDF snapshot {content_hash[:12]} ({matrix.shape[0]} documents)")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to save TF-IDF snapshot: {e}")
+            return False
+
+    def _remove_old_segments(self, keep: set):
+        """Delete superseded segments, keeping the previous one for workers that are still opening it"""
+        for name in os.listdir(self.index_dir):
+            path = os.path.join(self.index_dir, name)
+            if (name.startswith('segment-') and not name.endswith('.tmp') and name not in keep
+                    and os.path.isdir(path)):
+                # Files stay readable to processes that already mapped them
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _atomic_write_json(self, path: str, data: Dict):
+        """Write JSON to a temp file and rename it into place"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
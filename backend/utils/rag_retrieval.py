@@ -0,0 +1,242 @@
+import copy
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics.pairwise import cosine_similarity
+
+logger = logging.getLogger(__name__)
+
+
+def top_k_indices(scores: np.ndarray, k: int, mask: Optional[np.ndarray] = None,
+                  min_score: Optional[float] = None) -> np.ndarray:
+    """Indices of the k highest scores, best first, breaking ties by lower index, in O(n + k log k)"""
+    eligible = np.ones(len(scores), dtype=bool) if mask is None else mask[:len(scores)].copy()
+    if min_score is not None:
+        eligible &= scores > min_score
+    eligible = np.flatnonzero(eligible)
+
+    k = min(k, len(eligible))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    values = scores[eligible]
+    if k < len(values):
+        # argpartition picks arbitrarily among scores tied with the k-th best, so resolve those by index
+        kth_score = values[np.argpartition(-values, k - 1)[k - 1]]
+        above = np.flatnonzero(values > kth_score)
+        tied = np.flatnonzero(values == kth_score)[:k - len(above)]
+        selected = np.concatenate([above, tied])
+        eligible, values = eligible[selected], values[selected]
+
+    return eligible[np.lexsort((eligible, -values))]
+
+
+class ExactRetriever:
+    """Brute-force cosine similarity against every indexed row"""
+
+    name = 'exact'
+
+    def build(self, matrix: sp.spmatrix):
+        """Nothing to precompute for exact search"""
+        pass
+
+    def export(self, rows: Optional[np.ndarray] = None) -> Optional[Dict]:
+        """Built structures to store in a snapshot segment; exact search has none"""
+        return None
+
+    def restore(self, retrieval: Optional[Dict], n_rows: int) -> bool:
+        """Adopt structures stored by export(), returning False when build() is needed instead"""
+        return False
+
+    def append(self, matrix: sp.spmatrix, start_row: int):
+        """Nothing to precompute for exact search"""
+        pass
+
+    def copy(self) -> 'ExactRetriever':
+        """Copy that rows can be appended to while searches keep using this one"""
+        return copy.copy(self)
+
+    def search(self, query_vector: sp.spmatrix, matrix: sp.spmatrix, active_mask: np.ndarray,
+               k: int, min_score: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the top k active rows scoring above min_score, best first"""
+        similarities = cosine_similarity(query_vector, matrix).flatten()
+        top_rows = top_k_indices(similarities, k, mask=active_mask, min_score=min_score)
+        return top_rows, similarities[top_rows]
+
+    def search_batch(self, query_matrix: sp.spmatrix, matrix: sp.spmatrix, active_mask: np.ndarray,
+                     k: int, min_score: Optional[float] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Top k rows for every query row from a single queries x rows similarity product"""
+        similarities = cosine_similarity(query_matrix, matrix)
+        results = []
+        for query_scores in similarities:
+            top_rows = top_k_indices(query_scores, k, mask=active_mask, min_score=min_score)
+            results.append((top_rows, query_scores[top_rows]))
+        return results
+
+
+class IVFRetriever(ExactRetriever):
+    """Inverted-file index: spherical k-means lists over the TF-IDF rows with exact re-ranking of probed lists"""
+
+    name = 'ivf'
+
+    def __init__(self, n_lists: Optional[int] = None, n_probe: int = 24, min_candidates: int = 200,
+                 exact_below: int = 5000, train_size: int = 20000, seed: int = 42):
+        self.n_lists = n_lists
+        self.train_size = train_size
+        self.n_probe = n_probe
+        self.min_candidates = min_candidates
+        self.exact_below = exact_below
+        self.seed = seed
+        self.centroids = None
+        self.lists: List[np.ndarray] = []
+        self.indexed_rows = 0
+
+    def build_params(self) -> Dict:
+        """Parameters the clustering depends on; stored lists built with other values are not reused"""
+        return {'n_lists': self.n_lists, 'train_size': self.train_size, 'exact_below': self.exact_below,
+                'seed': self.seed}
+
+    def export(self, rows: Optional[np.ndarray] = None) -> Optional[Dict]:
+        """Centroids and inverted lists as flat arrays, renumbered to the given rows when only those are kept"""
+        if self.centroids is None:
+            return None
+
+        lists = self.lists
+        n_rows = self.indexed_rows
+        if rows is not None:
+            renumber = np.full(max(self.indexed_rows, int(rows[-1]) + 1 if len(rows) else 0), -1, dtype=np.int64)
+            renumber[rows] = np.arange(len(rows))
+            lists = [renumber[rows_in_list] for rows_in_list in lists]
+            lists = [rows_in_list[rows_in_list >= 0] for rows_in_list in lists]
+            n_rows = len(rows)
+
+        list_offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        list_offsets[1:] = np.cumsum([len(rows_in_list) for rows_in_list in lists])
+        return {
+            'backend': self.name,
+            'params': self.build_params(),
+            'rows': n_rows,
+            'arrays': {
+                'centroids': np.asarray(self.centroids),
+                'list_offsets': list_offsets,
+                'list_rows': np.concatenate(lists).astype(np.int64) if lists else np.zeros(0, dtype=np.int64)
+            }
+        }
+
+    def restore(self, retrieval: Optional[Dict], n_rows: int) -> bool:
+        """Serve the stored lists as views of the (memory-mapped) arrays instead of re-running k-means"""
+        if (not retrieval or retrieval.get('backend') != self.name or retrieval.get('params') != self.build_params()
+                or retrieval.get('rows') != n_rows):
+            return False
+
+        arrays = retrieval['arrays']
+        list_offsets, list_rows = arrays['list_offsets'], arrays['list_rows']
+        self.centroids = arrays['centroids']
+        self.lists = [list_rows[list_offsets[i]:list_offsets[i + 1]] for i in range(len(list_offsets) - 1)]
+        self.indexed_rows = n_rows
+        logger.info(f"Restored IVF retrieval index with {len(self.lists)} lists over {n_rows} rows")
+        return True
+
+    def build(self, matrix: sp.spmatrix):
+        """Cluster the rows and file each one under its nearest centroid"""
+        self.centroids = None
+        self.lists = []
+        self.indexed_rows = 0
+        if matrix.shape[0] < self.exact_below:
+            return
+
+        n_lists = self.n_lists or int(np.sqrt(matrix.shape[0]))
+
+        # Train on a sample; fancy indexing also gives k-means a writable copy of a memory-mapped matrix
+        rng = np.random.default_rng(self.seed)
+        train_rows = np.sort(rng.choice(matrix.shape[0], min(matrix.shape[0], self.train_size), replace=False))
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=self.seed, n_init=1, batch_size=4096)
+        kmeans.fit(matrix[train_rows])
+
+        # TF-IDF rows are L2-normalised, so normalised centroids make the dot product a cosine
+        centroids = kmeans.cluster_centers_
+        self.centroids = centroids / np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        labels = self._nearest_centroids(matrix)
+
+        order = np.argsort(labels, kind='stable')
+        boundaries = np.searchsorted(labels[order], np.arange(n_lists + 1))
+        self.lists = [order[boundaries[i]:boundaries[i + 1]] for i in range(n_lists)]
+        self.indexed_rows = matrix.shape[0]
+        logger.info(f"Built IVF retrieval index with {n_lists} lists over {matrix.shape[0]} rows")
+
+    def append(self, matrix: sp.spmatrix, start_row: int):
+        """File rows appended after the last build under their nearest existing centroid"""
+        if self.centroids is None or matrix.shape[0] == 0:
+            return
+
+        labels = self._nearest_centroids(matrix)
+        rows = np.arange(start_row, start_row + matrix.shape[0])
+        for label in np.unique(labels):
+            self.lists[label] = np.concatenate([self.lists[label], rows[labels == label]])
+        self.indexed_rows = max(self.indexed_rows, start_row + matrix.shape[0])
+
+    def copy(self) -> 'IVFRetriever':
+        """Copy sharing the centroids and list arrays; append replaces list arrays rather than growing them"""
+        retriever = super().copy()
+        retriever.lists = list(self.lists)
+        return retriever
+
+    def _nearest_centroids(self, matrix: sp.spmatrix, chunk_rows: int = 8192) -> np.ndarray:
+        """List number for every row, computed in chunks to bound the dense score buffer"""
+        labels = np.empty(matrix.shape[0], dtype=np.int64)
+        for start in range(0, matrix.shape[0], chunk_rows):
+            block = matrix[start:start + chunk_rows]
+            labels[start:start + block.shape[0]] = np.asarray(block @ self.centroids.T).argmax(axis=1)
+        return labels
+
+    def search(self, query_vector: sp.spmatrix, matrix: sp.spmatrix, active_mask: np.ndarray,
+               k: int, min_score: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Re-rank the rows in the lists nearest the query, falling back to exact search when too few"""
+        total_rows = matrix.shape[0]
+        if self.centroids is None or self.indexed_rows < total_rows or query_vector.nnz == 0:
+            return super().search(query_vector, matrix, active_mask, k, min_score)
+
+        centroid_scores = np.asarray(query_vector @ self.centroids.T).ravel()
+        probed = top_k_indices(centroid_scores, self.n_probe)
+
+        candidates = np.concatenate([self.lists[label] for label in probed])
+        candidates = candidates[candidates < total_rows]
+        candidates = candidates[active_mask[candidates]]
+        if len(candidates) < max(k, self.min_candidates):
+            return super().search(query_vector, matrix, active_mask, k, min_score)
+
+        # Sorting keeps the tie-break on row number consistent with exact search
+        candidates = np.sort(candidates)
+        scores = cosine_similarity(query_vector, matrix[candidates]).flatten()
+        order = top_k_indices(scores, k, min_score=min_score)
+        return candidates[order], scores[order]
+
+    def search_batch(self, query_matrix: sp.spmatrix, matrix: sp.spmatrix, active_mask: np.ndarray,
+                     k: int, min_score: Optional[float] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Probe lists per query, since each query re-ranks a different candidate set"""
+        if self.centroids is None or self.indexed_rows < matrix.shape[0]:
+            return super().search_batch(query_matrix, matrix, active_mask, k, min_score)
+        return [
+            self.search(query_matrix[row], matrix, active_mask, k, min_score)
+            for row in range(query_matrix.shape[0])
+        ]
+
+
+RETRIEVAL_BACKENDS = {
+    ExactRetriever.name: ExactRetriever,
+    IVFRetriever.name: IVFRetriever,
+}
+
+
+def create_retriever(backend: str = 'ivf', **params) -> ExactRetriever:
+    """Instantiate a retrieval backend by name, defaulting to exact search for unknown names"""
+    retriever_class = RETRIEVAL_BACKENDS.get(backend)
+    if retriever_class is None:
+        logger.warning(f"Unknown RAG retrieval backend '{backend}', using exact search")
+        retriever_class = ExactRetriever
+    if retriever_class is ExactRetriever:
+        return retriever_class()
+    return retriever_class(**params)
@@ -0,0 +1,126 @@
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import scipy.sparse as sp
+
+from utils.skill_ontology import skill_ontology
+
+
+def normalize_skill(skill) -> str:
+    """Canonical lookup form of a skill name, so aliases such as "js" and "JavaScript" share an id"""
+    return skill_ontology.key(skill)
+
+
+class SkillIncidence:
+    """Listings x skills incidence matrices over integer skill ids, for batched overlap with a profile"""
+
+    def __init__(self):
+        self.skill_ids: Dict[str, int] = {}
+        self.skills: List[str] = []
+        self.required = sp.csr_matrix((0, 0), dtype=np.int8)
+        self.preferred = sp.csr_matrix((0, 0), dtype=np.int8)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, listings: Iterable[Dict]) -> 'SkillIncidence':
+        """Assign skill ids and encode every listing, in row order"""
+        incidence = cls()
+        incidence.append(listings)
+        return incidence
+
+    @property
+    def rows(self) -> int:
+        return self.required.shape[0]
+
+    def _skill_id(self, skill: str) -> int:
+        skill_id = self.skill_ids.get(skill)
+        if skill_id is None:
+            skill_id = len(self.skills)
+            self.skill_ids[skill] = skill_id
+            self.skills.append(skill)
+        return skill_id
+
+    def _encode(self, skill_lists: List[List[str]]) -> sp.csr_matrix:
+        indptr = [0]
+        indices = []
+        for skills in skill_lists:
+            row_ids = sorted({self._skill_id(skill) for skill in map(normalize_skill, skills or []) if skill})
+            indices.extend(row_ids)
+            indptr.append(len(indices))
+        return sp.csr_matrix(
+            (np.ones(len(indices), dtype=np.int8), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(skill_lists), len(self.skills))
+        )
+
+    @staticmethod
+    def _widen(matrix: sp.csr_matrix, columns: int) -> sp.csr_matrix:
+        return sp.csr_matrix((matrix.data, matrix.indices, matrix.indptr), shape=(matrix.shape[0], columns))
+
+    def copy(self) -> 'SkillIncidence':
+        """Independent copy to append to while overlaps keep using this one"""
+        incidence = SkillIncidence()
+        with self._lock:
+            incidence.skill_ids = dict(self.skill_ids)
+            incidence.skills = list(self.skills)
+            incidence.required, incidence.preferred = self.required, self.preferred
+        return incidence
+
+    def append(self, listings: Iterable[Dict]):
+        """Encode listings appended after the current rows, growing the skill vocabulary as needed"""
+        listings = list(listings)
+        if not listings:
+            return
+        with self._lock:
+            required = self._encode([listing.get('requirements', []) for listing in listings])
+            preferred = self._encode([listing.get('preferred_skills', []) for listing in listings])
+            columns = len(self.skills)
+            self.required = sp.vstack(
+                [self._widen(self.required, columns), self._widen(required, columns)], format='csr'
+            )
+            self.preferred = sp.vstack(
+                [self._widen(self.preferred, columns), self._widen(preferred, columns)], format='csr'
+            )
+
+    def overlap(self, student_skills: List[str], rows: Optional[np.ndarray] = None) -> List[Dict]:
+        """Matched and missing required/preferred skills plus match percentages for each requested row"""
+        with self._lock:
+            required, preferred, skills = self.required, self.preferred, self.skills
+        rows = np.arange(required.shape[0]) if rows is None else np.asarray(rows, dtype=np.int64)
+        n_rows = len(rows)
+
+        student = np.zeros(len(skills), dtype=np.int8)
+        student_ids = [self.skill_ids.get(skill) for skill in map(normalize_skill, student_skills or [])]
+        student[[skill_id for skill_id in student_ids if skill_id is not None and skill_id < len(skills)]] = 1
+
+        # Required rows stacked over preferred rows, masked by the profile in a single sparse product
+        candidates = sp.vstack([required[rows], preferred[rows]], format='csr')
+        hits = (candidates @ sp.diags(student, dtype=np.int8)).tocsr()
+        hits.eliminate_zeros()
+        hits.sort_indices()
+        missing = (candidates - hits).tocsr()
+        missing.eliminate_zeros()
+        missing.sort_indices()
+        totals = np.diff(candidates.indptr)
+        matched = np.diff(hits.indptr)
+
+        def names(matrix: sp.csr_matrix, row: int) -> List[str]:
+            return [skills[skill_id] for skill_id in matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]]
+
+        results = []
+        for position in range(n_rows):
+            preferred_position = n_rows + position
+            required_total, preferred_total = totals[position], totals[preferred_position]
+            results.append({
+                'skill_matches': names(hits, position),
+                'preferred_matches': names(hits, preferred_position),
+                'missing_required_skills': names(missing, position),
+                'missing_preferred_skills': names(missing, preferred_position),
+                'required_match_percentage': (
+                    float(matched[position] / required_total * 100) if required_total else 100
+                ),
+                'preferred_match_percentage': (
+                    float(matched[preferred_position] / preferred_total * 100) if preferred_total else 0
+                ),
+            })
+        return results
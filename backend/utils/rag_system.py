@@ -1,7 +1,9 @@
+import hashlib
 import json
 import os
 import asyncio
-from typing import List, Dict, Any
+import atexit
+from typing import List, Dict, Any, NamedTuple, Optional, Sequence
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
@@ -11,6 +13,8 @@ from datetime import datetime, timedelta
 import requests
 import random
 import time
+import threading
+import scipy.sparse as sp
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -18,49 +22,474 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from utils.rag_index import DIGEST_SIZE, IndexSnapshot, TfidfIndexSnapshot
+from utils.rag_retrieval import ExactRetriever, create_retriever, top_k_indices
+from utils.rag_embeddings import DenseEmbeddingStore, DenseVectors, hybrid_search_batch
+from utils.cache import LRUCache
+from utils.rag_attributes import AttributeIndex
+from utils.rag_bm25 import BM25FIndex
+from utils.rag_skills import SkillIncidence
+from utils.listing_store import default_listing_store
 
 logger = logging.getLogger(__name__)
 
+
+class IndexState(NamedTuple):
+    """One generation of the served index. It is never modified: writers build a new state and publish it
+    with a single assignment, and each query reads that reference once, so everything it uses belongs together."""
+    version: Optional[str]
+    vectorizer: TfidfVectorizer
+    vectors: Optional[sp.csr_matrix]
+    internships: Sequence[Dict]
+    active_mask: np.ndarray  # False marks tombstoned rows
+    digests: np.ndarray
+    row_by_id: Dict[str, int]
+    retriever: ExactRetriever
+    attribute_index: AttributeIndex
+    skill_index: SkillIncidence
+    bm25_index: Optional[BM25FIndex]
+    dense_vectors: Optional[DenseVectors]
+    baseline_oov_rate: float = 0.0
+    appended_rows: int = 0  # Listings appended since the vectorizer was fitted
+    appended_oov_rate: float = 0.0
+
+    @property
+    def active_rows(self) -> np.ndarray:
+        """Row numbers of listings that have not been tombstoned"""
+        return np.flatnonzero(self.active_mask)
+
+
 class InternshipRAG:
-    def __init__(self):
-        self.internships = []
-        self.vectorizer = TfidfVectorizer(
-            stop_words='english',
-            ngram_range=(1, 2),
-            max_features=1000
+    def __init__(self, warm_start: bool = None, embedding_mode: str = None):
+        self.index_snapshot = TfidfIndexSnapshot(
+            getattr(settings, 'RAG_INDEX_DIR', os.path.join(settings.BASE_DIR, 'data', 'rag_index')),
+            vectorizer_params={
+                'stop_words': 'english',
+                'ngram_range': [1, 2],
+                'max_features': 1000
+            }
         )
-        self.internship_vectors = None
+        self.build_chunk_size = getattr(settings, 'RAG_BUILD_CHUNK_SIZE', 5000)
+        self.retrieval_backend = getattr(settings, 'RAG_RETRIEVAL_BACKEND', 'ivf')
+        self.retrieval_params = getattr(settings, 'RAG_RETRIEVAL_PARAMS', {})
+        self.dense_store = None
+        self.dense_weight = getattr(settings, 'RAG_DENSE_WEIGHT', 0.5)
+        if (embedding_mode or getattr(settings, 'RAG_EMBEDDING_MODE', 'tfidf')) == 'hybrid':
+            self.dense_store = DenseEmbeddingStore(
+                os.path.join(self.index_snapshot.index_dir, 'dense'),
+                getattr(settings, 'RAG_EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+            )
+            if not self.dense_store.available:
+                logger.warning("sentence-transformers not installed, falling back to TF-IDF only retrieval")
+                self.dense_store = None
+        self.match_cache = LRUCache(
+            max_size=getattr(settings, 'RAG_MATCH_CACHE_SIZE', 512),
+            ttl_seconds=getattr(settings, 'RAG_MATCH_CACHE_TTL', 3600)
+        )
+        self.search_scorer = getattr(settings, 'RAG_SEARCH_SCORER', 'tfidf')
+        self._state = IndexState(
+            version=None,
+            vectorizer=self.index_snapshot.new_vectorizer(),
+            vectors=None,
+            internships=[],
+            active_mask=np.zeros(0, dtype=bool),
+            digests=np.zeros((0, DIGEST_SIZE), dtype=np.uint8),
+            row_by_id={},
+            retriever=create_retriever(self.retrieval_backend, **self.retrieval_params),
+            attribute_index=AttributeIndex(),
+            skill_index=SkillIncidence(),
+            bm25_index=None,
+            dense_vectors=None
+        )
+        self.vocab_drift_threshold = getattr(settings, 'RAG_VOCAB_DRIFT_THRESHOLD', 0.05)
+        self.persist_delay = getattr(settings, 'RAG_PERSIST_DELAY', 30)
+        self._persist_timer = None
+        atexit.register(self.flush_index)  # Write updates still waiting for their scheduled snapshot
+        self._index_lock = threading.RLock()
+        self._refresh_thread = None
+        self.background_refresh = getattr(settings, 'RAG_BACKGROUND_REFRESH', True)
         self.last_refresh = None
         self.cache_duration = timedelta(hours=6)  # Refresh every 6 hours
-        self.load_or_generate_internships()
         
-    def load_or_generate_internships(self):
-        """Load internships from real-time sources or generate sample data"""
+        if warm_start is None:
+            warm_start = getattr(settings, 'RAG_WARM_START', True)
+        if warm_start:
+            self.warm_start()
+        else:
+            self.load_or_generate_internships()
+    
+    # Read-only views of the served state; code that reads several of them must take self._state once instead
+    @property
+    def internships(self) -> Sequence[Dict]:
+        return self._state.internships
+    
+    @property
+    def vectorizer(self) -> TfidfVectorizer:
+        return self._state.vectorizer
+    
+    @property
+    def internship_vectors(self) -> Optional[sp.csr_matrix]:
+        return self._state.vectors
+    
+    @property
+    def index_version(self) -> Optional[str]:
+        return self._state.version
+    
+    @property
+    def active_mask(self) -> np.ndarray:
+        return self._state.active_mask
+    
+    @property
+    def retriever(self) -> ExactRetriever:
+        return self._state.retriever
+    
+    @property
+    def attribute_index(self) -> AttributeIndex:
+        return self._state.attribute_index
+    
+    @property
+    def skill_index(self) -> SkillIncidence:
+        return self._state.skill_index
+    
+    @property
+    def bm25_index(self) -> Optional[BM25FIndex]:
+        return self._state.bm25_index
+    
+    @property
+    def dense_vectors(self) -> Optional[DenseVectors]:
+        return self._state.dense_vectors
+    
+    def warm_start(self):
+        """Load the last persisted corpus without scraping, leaving live refreshes to the background"""
         try:
-            # Check if we need to refresh data
-            if (self.last_refresh is None or 
-                datetime.now() - self.last_refresh > self.cache_duration or 
-                not self.internships):
+            if self._adopt_published_snapshot():
+                logger.info(f"Warm-started RAG with {len(self.internships)} internships from index snapshot")
+                return
+            
+            internships = self._load_persisted_internships()
+            if internships:
+                self._build_index(internships)
+                logger.info(f"Warm-started RAG with {len(internships)} internships from the listing store")
+            else:
+                logger.info("No persisted internships found, waiting for background refresh")
                 
-                self.internships = self._generate_real_time_internships()
+        except Exception as e:
+            logger.error(f"Warm start failed: {str(e)}")
+    
+    def _adopt_published_snapshot(self) -> bool:
+        """Switch to the snapshot on disk if it differs from the one being served, e.g. after another worker refreshed"""
+        if self._persist_timer is not None:
+            return False  # Updates waiting to be written are newer than anything published
+        
+        current_hash = self.index_snapshot.current_hash()
+        if not current_hash or current_hash == self.index_version:
+            return False
+        
+        snapshot = self.index_snapshot.load(current_hash)
+        if not snapshot:
+            return False
+        
+        self._install_snapshot(snapshot)
+        try:
+            self.last_refresh = datetime.fromisoformat(snapshot.created_at)
+        except (TypeError, ValueError):
+            self.last_refresh = None
+        return True
+    
+    def _load_persisted_internships(self) -> List[Dict]:
+        """Read the scraper's persisted listings from the listing store"""
+        try:
+            # Streamed from the store segments so the raw text is never held alongside the parsed listings
+            return list(default_listing_store().iter_listings())
+        except Exception as e:
+            logger.error(f"Failed to read persisted internships: {str(e)}")
+        return []
+        
+    def load_or_generate_internships(self):
+        """Load persisted internships plus a live scrape and rebuild the index"""
+        try:
+            internships = self._load_persisted_internships()
+            known_ids = {internship.get('id') for internship in internships}
+            
+            # Scraped listings carry fresh ids, so only add ones not already persisted
+            for internship in self._generate_real_time_internships():
+                if internship.get('id') not in known_ids:
+                    internships.append(internship)
+            
+            if internships:
+                self._build_index(internships)
                 self.last_refresh = datetime.now()
-                
-            # Create text representations for vectorization
-            internship_texts = []
-            for internship in self.internships:
-                text = self._create_searchable_text(internship)
-                internship_texts.append(text)
-            
-            # Vectorize internships
-            if internship_texts:
-                self.internship_vectors = self.vectorizer.fit_transform(internship_texts)
-                logger.info(f"Loaded {len(self.internships)} internships successfully")
+                logger.info(f"Loaded {len(internships)} internships successfully")
             else:
                 logger.error("No internships found to vectorize")
                 
         except Exception as e:
             logger.error(f"Failed to load internships: {str(e)}")
-            self.internships = []
+    
+    def start_background_refresh(self) -> bool:
+        """Run load_or_generate_internships on a daemon thread unless one is already running"""
+        with self._index_lock:
+            if self._refresh_thread and self._refresh_thread.is_alive():
+                return False
+            self._refresh_thread = threading.Thread(
+                target=self.load_or_generate_internships,
+                name="internship-rag-refresh",
+                daemon=True
+            )
+            self._refresh_thread.start()
+        logger.info("Started background internship refresh")
+        return True
+            
+    def _build_index(self, internships: List[Dict]):
+        """Load the TF-IDF index from its snapshot, refitting only when the listings changed"""
+        internship_texts = [self._create_searchable_text(internship) for internship in internships]
+        digests = self.index_snapshot.digest_array(self.index_snapshot.text_digest(text) for text in internship_texts)
+        content_hash = self.index_snapshot.compute_content_hash(digests)
+        
+        state = self._state
+        if content_hash == state.version and state.vectors is not None and state.active_mask.all():
+            return
+        
+        # Fit outside the lock so searches keep serving the previous index meanwhile
+        snapshot = self.index_snapshot.load(content_hash)
+        if snapshot:
+            logger.info(f"Loaded TF-IDF index snapshot {content_hash[:12]}")
+        else:
+            vectorizer, vectors = self.index_snapshot.fit_transform_chunked(
+                internship_texts, self.build_chunk_size
+            )
+            retriever = create_retriever(self.retrieval_backend, **self.retrieval_params)
+            retriever.build(vectors)
+            retrieval = retriever.export()
+            
+            # Serve from the published files so this worker shares pages with the others
+            if self.index_snapshot.save(content_hash, vectorizer, vectors, internships, digests, retrieval):
+                snapshot = self.index_snapshot.load(content_hash)
+            if not snapshot:
+                snapshot = IndexSnapshot(
+                    content_hash, vectorizer, vectors, list(internships), digests,
+                    [internship.get('id') for internship in internships], None, retrieval
+                )
+        
+        self._install_snapshot(snapshot, internship_texts)
+    
+    def _install_snapshot(self, snapshot: IndexSnapshot, internship_texts: List[str] = None):
+        """Build the retrieval structures for a snapshot and swap it in as the served index"""
+        if internship_texts is None:
+            sample_texts = [
+                self._create_searchable_text(snapshot.listings[row]) for row in range(min(200, len(snapshot.listings)))
+            ]
+        else:
+            sample_texts = internship_texts[:200]
+        baseline_oov_rate = self._measure_oov_rate(sample_texts, snapshot.vectorizer)
+        
+        retriever = create_retriever(self.retrieval_backend, **self.retrieval_params)
+        if not retriever.restore(snapshot.retrieval, snapshot.matrix.shape[0]):
+            retriever.build(snapshot.matrix)
+        listings = list(snapshot.listings)
+        attribute_index = AttributeIndex.build(listings)
+        skill_index = SkillIncidence.build(listings)
+        bm25_index = None
+        if self.search_scorer == 'bm25f':
+            bm25_index = BM25FIndex(getattr(settings, 'RAG_BM25_FIELD_WEIGHTS', None))
+            bm25_index.build(listings)
+        
+        dense_vectors = None
+        if self.dense_store:
+            try:
+                dense_vectors = self.dense_store.load(snapshot.content_hash)
+                if dense_vectors is None:
+                    if internship_texts is None:
+                        internship_texts = [self._create_searchable_text(listing) for listing in snapshot.listings]
+                    dense_vectors = self.dense_store.build(snapshot.content_hash, internship_texts)
+            except Exception as e:
+                logger.error(f"Failed to build dense embeddings, using TF-IDF only: {str(e)}")
+        
+        state = IndexState(
+            version=snapshot.content_hash,
+            vectorizer=snapshot.vectorizer,
+            vectors=snapshot.matrix,
+            internships=snapshot.listings,
+            active_mask=np.ones(len(snapshot.listings), dtype=bool),
+            digests=snapshot.digests,
+            row_by_id={internship_id: row for row, internship_id in enumerate(snapshot.ids) if internship_id},
+            retriever=retriever,
+            attribute_index=attribute_index,
+            skill_index=skill_index,
+            bm25_index=bm25_index,
+            dense_vectors=dense_vectors,
+            baseline_oov_rate=baseline_oov_rate
+        )
+        with self._index_lock:
+            self._cancel_persist()  # The snapshot supersedes any update waiting to be written
+            self._state = state
+    
+    def _measure_oov_rate(self, texts: List[str], vectorizer: TfidfVectorizer) -> float:
+        """Fraction of analyzed tokens that fall outside the fitted vocabulary"""
+        analyzer = vectorizer.build_analyzer()
+        vocabulary = vectorizer.vocabulary_
+        total_tokens = 0
+        oov_tokens = 0
+        for text in texts:
+            tokens = analyzer(text)
+            total_tokens += len(tokens)
+            oov_tokens += sum(1 for token in tokens if token not in vocabulary)
+        return oov_tokens / total_tokens if total_tokens else 0.0
+    
+    def vocabulary_drift(self, state: IndexState = None) -> float:
+        """Excess out-of-vocabulary rate of appended listings, weighted by their share of the index"""
+        state = state or self._state
+        active_rows = int(state.active_mask.sum())
+        if not active_rows or not state.appended_rows:
+            return 0.0
+        excess_oov = max(0.0, state.appended_oov_rate - state.baseline_oov_rate)
+        return excess_oov * min(1.0, state.appended_rows / active_rows)
+    
+    def apply_listing_updates(self, added: List[Dict] = None, removed_ids: List[str] = None) -> bool:
+        """Append vectors for new listings and tombstone removed ones without a full refit"""
+        if self.internship_vectors is None:
+            return False
+        
+        try:
+            with self._index_lock:
+                state = self._state
+                mask, row_by_id = state.active_mask, state.row_by_id
+                changed = False
+                
+                # Tombstone expired or removed listings
+                if removed_ids:
+                    mask, row_by_id = mask.copy(), dict(row_by_id)
+                    for internship_id in removed_ids:
+                        row = row_by_id.pop(internship_id, None)
+                        if row is not None and mask[row]:
+                            mask[row] = False
+                            changed = True
+                state = state._replace(active_mask=mask, row_by_id=row_by_id)
+                
+                # Append new listings using the frozen vocabulary and IDF weights
+                new_internships = [
+                    internship for internship in (added or [])
+                    if internship.get('id') and internship.get('id') not in row_by_id
+                ]
+                if new_internships:
+                    state = self._append_rows(state, new_internships)
+                    changed = True
+                
+                if not changed:
+                    return False
+                
+                drift = self.vocabulary_drift(state)
+                if drift > self.vocab_drift_threshold:
+                    logger.info(f"Vocabulary drift {drift:.3f} exceeds {self.vocab_drift_threshold}, refitting index")
+                    self._compact_and_refit(state)
+                else:
+                    self._state = state._replace(
+                        version=self.index_snapshot.compute_content_hash(state.digests[state.active_rows])
+                    )
+                    self._schedule_persist()
+                    logger.info(
+                        f"Incrementally indexed {len(new_internships)} new and {len(removed_ids or [])} removed "
+                        f"internships (drift {drift:.3f})"
+                    )
+                return True
+                
+        except Exception as e:
+            logger.error(f"Incremental index update failed: {str(e)}")
+            return False
+    
+    def _append_rows(self, state: IndexState, new_internships: List[Dict]) -> IndexState:
+        """New state with listings appended after the existing rows; the sub-indexes of state are left untouched"""
+        new_texts = [self._create_searchable_text(internship) for internship in new_internships]
+        new_vectors = state.vectorizer.transform(new_texts)
+        
+        start_row = len(state.internships)
+        retriever = state.retriever.copy()
+        retriever.append(new_vectors, start_row)
+        attribute_index = state.attribute_index.copy()
+        attribute_index.append(new_internships, start_row)
+        skill_index = state.skill_index.copy()
+        skill_index.append(new_internships)
+        bm25_index = state.bm25_index
+        if bm25_index is not None:
+            bm25_index = bm25_index.copy()
+            bm25_index.append(new_internships)
+        dense_vectors = state.dense_vectors
+        if dense_vectors is not None:
+            dense_vectors = dense_vectors.append(self.dense_store.encode(new_texts))
+        
+        row_by_id = dict(state.row_by_id)
+        for offset, internship in enumerate(new_internships):
+            row_by_id[internship['id']] = start_row + offset
+        
+        # Running average of the out-of-vocabulary rate across appended listings
+        batch_oov_rate = self._measure_oov_rate(new_texts, state.vectorizer)
+        appended_rows = state.appended_rows + len(new_internships)
+        appended_oov_rate = (
+            state.appended_oov_rate * state.appended_rows + batch_oov_rate * len(new_internships)
+        ) / appended_rows
+        
+        return state._replace(
+            vectors=sp.vstack([state.vectors, new_vectors], format='csr'),
+            internships=state.internships + new_internships,
+            active_mask=np.concatenate([state.active_mask, np.ones(len(new_internships), dtype=bool)]),
+            digests=np.concatenate([
+                state.digests,
+                self.index_snapshot.digest_array(self.index_snapshot.text_digest(text) for text in new_texts)
+            ]),
+            row_by_id=row_by_id,
+            retriever=retriever,
+            attribute_index=attribute_index,
+            skill_index=skill_index,
+            bm25_index=bm25_index,
+            dense_vectors=dense_vectors,
+            appended_rows=appended_rows,
+            appended_oov_rate=appended_oov_rate
+        )
+    
+    def _compact_and_refit(self, state: IndexState):
+        """Drop tombstoned rows and refit the vectorizer on the remaining listings"""
+        self._build_index([state.internships[row] for row in state.active_rows])
+    
+    def _schedule_persist(self):
+        """Write the served state persist_delay seconds after the first unwritten update, so a burst of
+        updates costs one snapshot rather than one per update"""
+        if self.persist_delay <= 0:
+            self._persist_incremental_index(self._state)
+            return
+        with self._index_lock:
+            if self._persist_timer is None:
+                self._persist_timer = threading.Timer(self.persist_delay, self.flush_index)
+                self._persist_timer.name = "internship-rag-persist"
+                self._persist_timer.daemon = True
+                self._persist_timer.start()
+    
+    def _cancel_persist(self) -> bool:
+        """Drop the scheduled write, returning whether one was pending"""
+        with self._index_lock:
+            timer, self._persist_timer = self._persist_timer, None
+        if timer is None:
+            return False
+        timer.cancel()
+        return True
+    
+    def flush_index(self) -> bool:
+        """Write incremental updates that are still waiting for their scheduled snapshot"""
+        with self._index_lock:
+            if not self._cancel_persist():
+                return False
+            self._persist_incremental_index(self._state)
+            return True
+    
+    def _persist_incremental_index(self, state: IndexState):
+        """Snapshot the active rows so restarts and other workers pick up the incrementally updated index"""
+        active_rows = state.active_rows
+        self.index_snapshot.save(
+            state.version, state.vectorizer, state.vectors[active_rows],
+            [state.internships[row] for row in active_rows], state.digests[active_rows],
+            state.retriever.export(active_rows)
+        )
+        if state.dense_vectors is not None:
+            self.dense_store.save(state.version, state.dense_vectors.rows(active_rows))
             
     def _generate_real_time_internships(self):
         """Scrape real internships from LinkedIn and other sources - NO MOCK DATA"""
@@ -496,7 +925,8 @@ class InternshipRAG:
         top_k: int = 5
     ) -> List[Dict]:
         """Find matching internships using RAG"""
-        if not self.internships or self.internship_vectors is None:
+        state = self._state
+        if not state.internships or state.vectors is None:
             logger.warning("No internships loaded, returning empty results")
             return []
         
@@ -504,47 +934,182 @@ class InternshipRAG:
             # Create profile text
             profile_text = self._create_profile_text(profile, preferences)
             
-            # Vectorize profile
-            profile_vector = self.vectorizer.transform([profile_text])
-            
-            # Calculate similarities
-            similarities = cosine_similarity(profile_vector, self.internship_vectors).flatten()
-            
-            # Get top matches
-            top_indices = np.argsort(similarities)[::-1][:top_k]
-            
-            matched_internships = []
-            for idx in top_indices:
-                internship = self.internships[idx].copy()
-                internship['matching_score'] = float(similarities[idx])
-                internship['justification'] = self._generate_justification(
-                    profile, preferences, internship, similarities[idx]
-                )
-                matched_internships.append(internship)
+            # Retrieve the top active matches
+            top_indices, scores = self._retrieve(state, [profile_text], top_k)[0]
             
-            return matched_internships
+            return self._build_matches(state, profile, preferences, top_indices, scores)
             
         except Exception as e:
             logger.error(f"Error in RAG matching: {str(e)}")
             return []
     
+    def find_matching_internships_batch(
+        self,
+        profiles: List[Dict],
+        preferences_list: List[List[str]],
+        top_k: int = 5
+    ) -> List[List[Dict]]:
+        """Find matching internships for many profiles with one vectorizer call and one similarity product"""
+        state = self._state
+        if not state.internships or state.vectors is None:
+            logger.warning("No internships loaded, returning empty results")
+            return [[] for _ in profiles]
+        
+        try:
+            profile_texts = [
+                self._create_profile_text(profile, preferences)
+                for profile, preferences in zip(profiles, preferences_list)
+            ]
+            batch_results = self._retrieve(state, profile_texts, top_k)
+            
+            return [
+                self._build_matches(state, profile, preferences, top_indices, scores)
+                for profile, preferences, (top_indices, scores) in zip(profiles, preferences_list, batch_results)
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error in batch RAG matching: {str(e)}")
+            return [[] for _ in profiles]
+    
+    def _query_fingerprint(self, text: str, min_score: float, index_version: str, filter_key: str = '') -> str:
+        """Cache key for a query text ranked against one index version"""
+        return hashlib.sha256(f"{index_version}\0{min_score}\0{filter_key}\0{text}".encode('utf-8')).hexdigest()
+    
+    def _retrieve(self, state: IndexState, texts: List[str], k: int, min_score: float = None,
+                  criteria: Dict[str, tuple] = None) -> List[tuple]:
+        """Top k (rows, scores) per text, reusing cached vectors and rankings for this index version"""
+        index_version = state.version
+        candidate_rows = state.attribute_index.filter(criteria, state.active_mask) if criteria else None
+        filter_key = json.dumps(criteria, sort_keys=True) if candidate_rows is not None else ''
+        fingerprints = [self._query_fingerprint(text, min_score, index_version, filter_key) for text in texts]
+        results = [None] * len(texts)
+        pending = []
+        
+        for position, fingerprint in enumerate(fingerprints):
+            cached = self.match_cache.get(fingerprint)
+            if cached and cached['k'] >= k:
+                results[position] = (cached['rows'][:k], cached['scores'][:k])
+            else:
+                pending.append((position, cached))
+        
+        if pending:
+            # Rankings cached for a smaller k still carry the query vectors
+            to_encode = [position for position, cached in pending if not cached]
+            encoded = dict(zip(to_encode, state.vectorizer.transform([texts[p] for p in to_encode]))) if to_encode else {}
+            query_vectors = sp.vstack(
+                [cached['vector'] if cached else encoded[position] for position, cached in pending], format='csr'
+            )
+            
+            dense_vectors = state.dense_vectors
+            query_embeddings = None
+            if dense_vectors is not None:
+                query_embeddings = self.dense_store.encode([texts[position] for position, _ in pending])
+            
+            if candidate_rows is not None:
+                ranked = self._rank_candidates(
+                    state, query_vectors, query_embeddings, candidate_rows, k, min_score
+                )
+            elif dense_vectors is not None:
+                ranked = hybrid_search_batch(
+                    query_vectors, query_embeddings, state.vectors, dense_vectors,
+                    state.active_mask, k, self.dense_weight, min_score=min_score
+                )
+            elif len(pending) == 1:
+                ranked = [state.retriever.search(query_vectors, state.vectors, state.active_mask, k, min_score)]
+            else:
+                ranked = state.retriever.search_batch(
+                    query_vectors, state.vectors, state.active_mask, k, min_score
+                )
+            
+            for row, ((position, _), (top_rows, scores)) in enumerate(zip(pending, ranked)):
+                results[position] = (top_rows, scores)
+                self.match_cache.set(fingerprints[position], {
+                    'k': k,
+                    'vector': query_vectors[row],
+                    'rows': top_rows,
+                    'scores': scores
+                })
+        
+        return results
+    
+    def _rank_candidates(self, state: IndexState, query_vectors, query_embeddings: np.ndarray,
+                         candidate_rows: np.ndarray, k: int, min_score: float = None) -> List[tuple]:
+        """Exact scoring restricted to the rows that passed the attribute filters"""
+        if not len(candidate_rows):
+            empty = np.zeros(0, dtype=np.int64)
+            return [(empty, np.zeros(0)) for _ in range(query_vectors.shape[0])]
+        
+        scores = cosine_similarity(query_vectors, state.vectors[candidate_rows])
+        if query_embeddings is not None:
+            dense_scores = state.dense_vectors.rows(candidate_rows).astype(np.float32) @ query_embeddings.T
+            scores = (1.0 - self.dense_weight) * scores + self.dense_weight * dense_scores.T
+        
+        ranked = []
+        for query_scores in scores:
+            order = top_k_indices(query_scores, k, min_score=min_score)
+            ranked.append((candidate_rows[order], query_scores[order]))
+        return ranked
+    
+    def _build_matches(
+        self,
+        state: IndexState,
+        profile: Dict,
+        preferences: List[str],
+        top_indices: np.ndarray,
+        scores: np.ndarray
+    ) -> List[Dict]:
+        """Copy the retrieved listings and attach their scores and justifications"""
+        matched = [state.internships[idx].copy() for idx in top_indices]
+        
+        # Skill overlap for every ranked row from one product against the corpus incidence matrix
+        skill_index = state.skill_index
+        if len(top_indices) and int(np.max(top_indices)) >= skill_index.rows:
+            skill_index, top_indices = SkillIncidence.build(matched), None
+        overlaps = skill_index.overlap(profile.get('skills', []), top_indices)
+        
+        matched_internships = []
+        for internship, score, overlap in zip(matched, scores, overlaps):
+            internship['matching_score'] = float(score)
+            internship['justification'] = self._generate_justification(
+                profile, preferences, internship, score, overlap['skill_matches']
+            )
+            matched_internships.append(internship)
+        return matched_internships
+    
+    def skill_overlaps(self, internships: List[Dict], student_skills: List[str]) -> List[Dict]:
+        """SkillIncidence.overlap for each listing, reading indexed listings from the served skill index and
+        encoding only the listings it does not hold"""
+        state = self._state
+        rows = [state.row_by_id.get(internship.get('id')) for internship in internships]
+        indexed = [position for position, row in enumerate(rows) if row is not None and row < state.skill_index.rows]
+        overlaps = [None] * len(internships)
+        
+        if indexed:
+            indexed_rows = np.asarray([rows[position] for position in indexed], dtype=np.int64)
+            for position, overlap in zip(indexed, state.skill_index.overlap(student_skills, indexed_rows)):
+                overlaps[position] = overlap
+        
+        unindexed = [position for position, overlap in enumerate(overlaps) if overlap is None]
+        if unindexed:
+            incidence = SkillIncidence.build([internships[position] for position in unindexed])
+            for position, overlap in zip(unindexed, incidence.overlap(student_skills)):
+                overlaps[position] = overlap
+        return overlaps
+    
     def _generate_justification(
         self, 
         profile: Dict, 
         preferences: List[str], 
         internship: Dict, 
-        score: float
+        score: float,
+        skill_matches: List[str]
     ) -> str:
         """Generate justification for the match"""
         justifications = []
         
         # Check skill matches
-        student_skills = set([skill.lower() for skill in profile.get('skills', [])])
-        required_skills = set([skill.lower() for skill in internship.get('requirements', [])])
-        skill_matches = student_skills.intersection(required_skills)
-        
         if skill_matches:
-            justifications.append(f"Strong skill match: {', '.join(list(skill_matches)[:3])}")
+            justifications.append(f"Strong skill match: {', '.join(skill_matches[:3])}")
         
         # Check domain preferences
         student_domains = set([domain.lower() for domain in preferences])
@@ -569,36 +1134,58 @@ class InternshipRAG:
     
     def get_internship_by_id(self, internship_id: str) -> Dict:
         """Get specific internship by ID"""
-        for internship in self.internships:
-            if internship.get('id') == internship_id:
-                return internship
+        state = self._state
+        row = state.row_by_id.get(internship_id)
+        if row is not None and state.active_mask[row]:
+            return state.internships[row]
         return {}
     
+    def _filter_criteria(
+        self,
+        domain: str = None,
+        experience_level: str = None,
+        location: str = None,
+        source: str = None,
+        company: str = None
+    ) -> Dict[str, tuple]:
+        """Map filter arguments to attribute index lookups"""
+        return {
+            'domain': (domain, 'icontains'),
+            'experience_level': (experience_level, 'iexact'),
+            'location': (location, 'icontains'),
+            'source': (source, 'iexact'),
+            'company': (company, 'icontains')
+        }
+    
     def filter_by_criteria(
         self, 
         domain: str = None, 
         experience_level: str = None,
-        location: str = None
+        location: str = None,
+        source: str = None,
+        company: str = None
     ) -> List[Dict]:
-        """Filter internships by specific criteria"""
-        filtered = self.internships
-        
-        if domain:
-            filtered = [i for i in filtered if domain.lower() in i.get('domain', '').lower()]
-        
-        if experience_level:
-            filtered = [i for i in filtered if i.get('experience_level') == experience_level]
-        
-        if location:
-            filtered = [i for i in filtered if location.lower() in i.get('location', '').lower()]
-        
-        return filtered
+        """Filter internships by specific criteria using the attribute index"""
+        state = self._state
+        rows = state.attribute_index.filter(
+            self._filter_criteria(domain, experience_level, location, source, company), state.active_mask
+        )
+        if rows is None:
+            return self._active_internships(state)
+        return [state.internships[row] for row in rows]
     
     def refresh_data(self):
-        """Force refresh of internship data"""
+        """Schedule a background refresh of internship data when it is stale"""
         try:
+            # Another worker may already have published a fresher index
+            if self._adopt_published_snapshot():
+                logger.info(f"Adopted published index snapshot {self.index_version[:12]}")
+                return True
+            
             if (datetime.now() - (self.last_refresh or datetime.min)) > timedelta(hours=1):
                 logger.info("Refreshing internship data...")
+                if self.background_refresh:
+                    return self.start_background_refresh()
                 self.load_or_generate_internships()
                 return True
             return False
@@ -609,30 +1196,42 @@ class InternshipRAG:
     def get_all_internships(self):
         """Get all available internships"""
         if not self.internships:
-            self.load_or_generate_internships()
-        return self.internships.copy()
+            self.refresh_data()
+        return self._active_internships()
+    
+    def _active_internships(self, state: IndexState = None) -> List[Dict]:
+        """Listings that have not been tombstoned"""
+        state = state or self._state
+        return [state.internships[row] for row in state.active_rows]
         
-    def search_internships(self, query: str, limit: int = 20) -> List[Dict]:
-        """Search internships using text similarity"""
-        if not self.internships or self.internship_vectors is None:
+    def search_internships(self, query: str, limit: int = 20, **criteria) -> List[Dict]:
+        """Search internships using text similarity, optionally within filter_by_criteria filters"""
+        state = self._state
+        if not state.internships or state.vectors is None:
             return []
             
         try:
-            # Vectorize search query
-            query_vector = self.vectorizer.transform([query])
-            
-            # Calculate similarities
-            similarities = cosine_similarity(query_vector, self.internship_vectors).flatten()
-            
-            # Get top matches
-            top_indices = np.argsort(similarities)[::-1][:limit]
+            # Retrieve the top active matches
+            filter_criteria = self._filter_criteria(**criteria) if criteria else None
+            if state.bm25_index is not None:
+                # Field-weighted lexical ranking over the posting lists of the query terms only
+                candidate_rows = state.attribute_index.filter(filter_criteria) if filter_criteria else None
+                top_indices, scores = state.bm25_index.search(
+                    query, limit, state.active_mask, candidate_rows,
+                    min_score=0.1  # Minimum share of the query's IDF matched
+                )
+            else:
+                top_indices, scores = self._retrieve(
+                    state, [query], limit,
+                    min_score=0.1,  # Minimum similarity threshold
+                    criteria=filter_criteria
+                )[0]
             
             results = []
-            for idx in top_indices:
-                if similarities[idx] > 0.1:  # Minimum similarity threshold
-                    internship = self.internships[idx].copy()
-                    internship['matching_score'] = float(similarities[idx])
-                    results.append(internship)
+            for idx, score in zip(top_indices, scores):
+                internship = state.internships[idx].copy()
+                internship['matching_score'] = float(score)
+                results.append(internship)
             
             return results
             
@@ -642,25 +1241,34 @@ class InternshipRAG:
             
     def get_stats(self):
         """Get statistics about available internships"""
-        if not self.internships:
+        state = self._state
+        if not state.internships:
             return {
                 'total_internships': 0,
                 'domains': [],
                 'companies': [],
                 'locations': [],
-                'last_updated': None
+                'last_updated': None,
+                'index_version': None
             }
             
-        domains = list(set([i.get('domain', '') for i in self.internships]))
-        companies = list(set([i.get('company', '') for i in self.internships]))
-        locations = list(set([i.get('location', '') for i in self.internships]))
+        internships = self._active_internships(state)
+        domains = list(set([i.get('domain', '') for i in internships]))
+        companies = list(set([i.get('company', '') for i in internships]))
+        locations = list(set([i.get('location', '') for i in internships]))
         
         return {
-            'total_internships': len(self.internships),
+            'total_internships': len(internships),
             'domains': domains,
             'companies': companies,
             'locations': locations,
-            'last_updated': self.last_refresh.isoformat() if self.last_refresh else None
+            'last_updated': self.last_refresh.isoformat() if self.last_refresh else None,
+            'index_version': state.version,
+            'retrieval_backend': state.retriever.name,
+            'embedding_mode': 'hybrid' if state.dense_vectors is not None else 'tfidf',
+            'search_scorer': 'bm25f' if state.bm25_index is not None else 'tfidf',
+            'match_cache': self.match_cache.stats(),
+            'vocabulary_drift': round(self.vocabulary_drift(state), 4)
         }
     
     def _scrape_indeed_internships(self):
@@ -0,0 +1,198 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Canonical skill name -> (category, aliases). Canonical names match on their own, aliases are extra spellings.
+SKILL_DEFINITIONS: Dict[str, Tuple[str, List[str]]] = {
+    # Languages
+    'Python': ('language', ['py', 'python3']),
+    'JavaScript': ('language', ['js', 'ecmascript', 'es6']),
+    'TypeScript': ('language', []),
+    'Java': ('language', []),
+    'C++': ('language', ['cpp']),
+    'C#': ('language', ['csharp', 'c sharp']),
+    'C': ('language', []),
+    'Go': ('language', ['golang']),
+    'Rust': ('language', []),
+    'Ruby': ('language', []),
+    'PHP': ('language', []),
+    'Swift': ('language', []),
+    'Kotlin': ('language', []),
+    'Dart': ('language', []),
+    'Scala': ('language', []),
+    'R': ('language', []),
+    'SQL': ('language', []),
+    'HTML': ('language', ['html5']),
+    'CSS': ('language', ['css3']),
+    'Bash': ('language', ['shell scripting']),
+    # Frameworks and libraries
+    'React': ('framework', ['react.js', 'reactjs']),
+    'React Native': ('framework', ['react-native']),
+    'Angular': ('framework', ['angularjs', 'angular.js']),
+    'Vue.js': ('framework', ['vue', 'vuejs']),
+    'Next.js': ('framework', ['nextjs']),
+    'Node.js': ('framework', ['node', 'nodejs']),
+    'Express.js': ('framework', ['express', 'expressjs']),
+    'Django': ('framework', []),
+    'Flask': ('framework', []),
+    'FastAPI': ('framework', []),
+    'Spring': ('framework', ['spring boot', 'springboot']),
+    'Flutter': ('framework', []),
+    # Databases
+    'MySQL': ('database', []),
+    'PostgreSQL': ('database', ['postgres']),
+    'MongoDB': ('database', ['mongo']),
+    'SQLite': ('database', []),
+    'Redis': ('database', []),
+    'Elasticsearch': ('database', ['elastic search']),
+    'Firebase': ('database', []),
+    # Cloud and DevOps
+    'AWS': ('cloud', ['amazon web services']),
+    'Azure': ('cloud', ['microsoft azure']),
+    'Google Cloud': ('cloud', ['gcp', 'google cloud platform']),
+    'Docker': ('devops', []),
+    'Kubernetes': ('devops', ['k8s']),
+    'Jenkins': ('devops', []),
+    'Terraform': ('devops', []),
+    'CI/CD': ('devops', ['cicd', 'continuous integration']),
+    'Git': ('devops', []),
+    'Linux': ('devops', []),
+    'Unix': ('devops', []),
+    'DevOps': ('devops', []),
+    'MLOps': ('devops', []),
+    # Data and machine learning
+    'TensorFlow': ('data', []),
+    'PyTorch': ('data', []),
+    'Scikit-learn': ('data', ['sklearn', 'scikit', 'scikit learn']),
+    'Pandas': ('data', []),
+    'NumPy': ('data', []),
+    'Matplotlib': ('data', []),
+    'Tableau': ('data', []),
+    'Machine Learning': ('data', ['ml']),
+    'Deep Learning': ('data', ['dl']),
+    'NLP': ('data', ['natural language processing']),
+    'Computer Vision': ('data', []),
+    'Statistics': ('data', []),
+    'Big Data': ('data', []),
+    # Concepts
+    'REST APIs': ('concept', ['rest', 'rest api', 'restful', 'restful api', 'restful apis']),
+    'GraphQL': ('concept', []),
+    'API': ('concept', ['apis']),
+    'Microservices': ('concept', []),
+    'Algorithms': ('concept', ['data structures and algorithms', 'dsa']),
+    'Network Security': ('concept', []),
+    'Encryption': ('concept', []),
+    'Penetration Testing': ('concept', ['pentesting']),
+    # Platforms and design
+    'iOS': ('mobile', []),
+    'Android': ('mobile', []),
+    'Figma': ('design', []),
+    'Adobe XD': ('design', []),
+    'User Research': ('design', []),
+    'Prototyping': ('design', []),
+}
+
+# Spellings that are also ordinary words, so free text only matches them when capitalised ("Go", "Swift", "R")
+AMBIGUOUS_ALIASES = {'c', 'r', 'go', 'dl', 'py', 'rest', 'express', 'node', 'spring', 'swift'}
+
+
+class SkillOntology:
+    """Canonical skill names with aliases, compiled into an Aho-Corasick automaton for single-pass extraction"""
+
+    def __init__(self, definitions: Dict[str, Tuple[str, List[str]]] = SKILL_DEFINITIONS,
+                 ambiguous_aliases: Iterable[str] = AMBIGUOUS_ALIASES):
+        self.categories: Dict[str, str] = {}
+        self._canonical_by_alias: Dict[str, str] = {}
+        for canonical, (category, aliases) in definitions.items():
+            self.categories[canonical] = category
+            for alias in [canonical] + aliases:
+                self._canonical_by_alias[alias.lower()] = canonical
+
+        self._build_automaton(self._canonical_by_alias, {alias.lower() for alias in ambiguous_aliases})
+
+    def _build_automaton(self, patterns: Dict[str, str], ambiguous: set):
+        """Trie of the patterns with failure links, each state listing the (length, canonical, ambiguous)
+        matches ending there"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._outputs: List[List[Tuple[int, str, bool]]] = [[]]
+        for pattern, canonical in patterns.items():
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._outputs.append([])
+                state = next_state
+            self._outputs[state].append((len(pattern), canonical, pattern in ambiguous))
+
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+                queue.append(next_state)
+
+    def canonical(self, skill: str) -> str:
+        """Canonical name for a skill or alias, or the trimmed input when it is not in the ontology"""
+        if not isinstance(skill, str):
+            return ''
+        skill = skill.strip()
+        return self._canonical_by_alias.get(skill.lower(), skill)
+
+    def key(self, skill: str) -> str:
+        """Case-folded canonical name, for comparing skills"""
+        return self.canonical(skill).lower()
+
+    def category(self, skill: str) -> Optional[str]:
+        return self.categories.get(self.canonical(skill))
+
+    def extract(self, text: str, categories: Optional[Iterable[str]] = None,
+                match_ambiguous: bool = False) -> List[str]:
+        """Canonical skills mentioned in text, in order of first mention, from one pass over the text.
+
+        Ambiguous spellings only count when capitalised, unless match_ambiguous says the text is known to list
+        technologies (e.g. repository names), where "go" or "express" is not an ordinary word.
+        """
+        if not text:
+            return []
+        original = text
+        text = text.lower()
+        if len(text) != len(original):
+            original = text  # Lowercasing changed offsets, so no case information is usable
+        allowed = set(categories) if categories else None
+
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, canonical, ambiguous in self._outputs[state]:
+                start, end = position - length + 1, position + 1
+                if ambiguous and not match_ambiguous and not original[start].isupper():
+                    continue
+                # Only whole-word mentions count, so "java" does not match inside "javascript"
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    matches.append((start, end, canonical))
+
+        # Keep the leftmost-longest mention, so "react native" is not also reported as "react"
+        matches.sort(key=lambda match: (match[0], -match[1]))
+        found = []
+        covered_until = 0
+        for start, end, canonical in matches:
+            if start < covered_until:
+                continue
+            covered_until = end
+            if canonical not in found and (allowed is None or self.categories[canonical] in allowed):
+                found.append(canonical)
+        return found
+
+
+# Global ontology instance
+skill_ontology = SkillOntology()
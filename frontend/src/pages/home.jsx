@@ -312,50 +312,55 @@ const Home = () => {
     if (githubLink.trim()) {
       formData.append('github_link', githubLink.trim());
     }
-    const steps = [
-      'Uploading resume and GitHub profile...',
-      'Student Profile Analyzer → Extracting skills and domains...',
-      'Internship Matcher → Finding best-fit internships...',
-      'Portfolio Gap Detector → Flagging missing skills...',
-      'RAG-Powered Requirement Aligner → Retrieving real expectations...',
-      'Readiness Evaluator → Calculating readiness scores...',
-      'Generating personalized preparation plan...'
-    ];
-    let stepIndex = 0;
-    const stepInterval = setInterval(() => {
-      if (stepIndex < steps.length) {
-        setAnalysisStep(steps[stepIndex]);
-        setProgress((stepIndex / steps.length) * 90);
-        stepIndex++;
-      }
-    }, 3000);
+    setAnalysisStep('Uploading resume and GitHub profile...');
+    const controller = new AbortController();
+    const timeoutId = setTimeout(() => controller.abort(), 180000);
     try {
-      const response = await axios.post(
-        'http://127.0.0.1:8000/api/analyze/resume/',
-        formData,
-        {
-          headers: { 'Content-Type': 'multipart/form-data' },
-          timeout: 180000,
-          onUploadProgress: (progressEvent) => {
-            const percentCompleted = Math.round((progressEvent.loaded * 100) / progressEvent.total);
-            if (percentCompleted < 100) {
-              setProgress(Math.min(15, percentCompleted / 10));
-              setAnalysisStep(`Uploading... ${percentCompleted}%`);
-            }
-          }
-        }
-      );
-      clearInterval(stepInterval);
-      await processAnalysisResults(response.data);
+      const response = await fetch('http://127.0.0.1:8000/api/analyze/resume/stream/', {
+        method: 'POST',
+        body: formData,
+        signal: controller.signal
+      });
+      if (!response.ok) {
+        const data = await response.json().catch(() => ({}));
+        throw Object.assign(new Error(data.error || 'Analysis failed'), {
+          response: { status: response.status, data }
+        });
+      }
+      const results = await readAnalysisStream(response);
+      await processAnalysisResults(results);
     } catch (err) {
-      clearInterval(stepInterval);
-      handleAnalysisError(err);
+      handleAnalysisError(err.name === 'AbortError' ? { code: 'ECONNABORTED' } : err);
     } finally {
+      clearTimeout(timeoutId);
       setIsAnalyzing(false);
       setTimeout(() => setAnalysisStep(''), 3000);
     }
   };
 
+  // Server-sent events: progress after every agent, then the full results
+  const readAnalysisStream = async (response) => {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const events = buffer.split('\n\n');
+      buffer = events.pop();
+      for (const rawEvent of events) {
+        const event = rawEvent.match(/^event: (.*)$/m)?.[1];
+        const data = JSON.parse(rawEvent.match(/^data: (.*)$/m)?.[1] || '{}');
+        if (event === 'complete') return data;
+        if (event === 'error') throw new Error(data.error);
+        if (data.current_step) setAnalysisStep(data.current_step);
+        setProgress(Math.min(data.step_progress || 0, 95));
+      }
+    }
+    throw new Error('Analysis stream ended before the results arrived');
+  };
+
   const processAnalysisResults = async (data) => {
     if (data.error) {
       throw new Error(data.error);